@@ -1,11 +1,29 @@
 from django.contrib import admin
 
-from .models import Article
+from .models import Article, ArticleChange
+from .search import is_postgres, search_articles
 
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
-    list_display = ("source", "published_at", "title", "is_public")
+    list_display = ("source", "published_at", "title", "is_public", "canonical")
+    raw_id_fields = ("canonical",)
     list_filter = ("source", "is_public")
     search_fields = ("title", "body", "url")
     ordering = ("-published_at",)
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = (search_term or "").strip()
+        if not search_term or not is_postgres():
+            return super().get_search_results(request, queryset, search_term)
+        if search_term.startswith(("http://", "https://")):
+            return queryset.filter(url=search_term), False
+        return queryset.filter(pk__in=search_articles(Article.objects.all(), search_term).values("pk")), False
+
+
+@admin.register(ArticleChange)
+class ArticleChangeAdmin(admin.ModelAdmin):
+    list_display = ("seq", "kind", "article_id", "url", "created_at")
+    list_filter = ("kind",)
+    search_fields = ("url",)
+    ordering = ("-seq",)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Union
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Exists, Max, OuterRef
+
+from articles.models import Article, ArticleChange
+from core.streaming import Pause
+
+# Serializes position assignment across processes on PostgreSQL.
+PUBLISH_LOCK_ID = 0x4E4E4348
+
+
+def change_kind(article: Article, created: bool) -> str:
+    if created:
+        return ArticleChange.KIND_CREATED
+    if not article.is_public:
+        return ArticleChange.KIND_UNPUBLISHED
+    return ArticleChange.KIND_UPDATED
+
+
+def record_change(article: Article, kind: str) -> ArticleChange:
+    change = ArticleChange.objects.create(article_id=article.pk, url=article.url, kind=kind)
+    transaction.on_commit(publish_changes)
+    return change
+
+
+def record_changes(entries: Iterable[tuple[Article, str]]) -> int:
+    changes = [ArticleChange(article_id=article.pk, url=article.url, kind=kind) for article, kind in entries]
+    if changes:
+        ArticleChange.objects.bulk_create(changes)
+        transaction.on_commit(publish_changes)
+    return len(changes)
+
+
+def publish_changes() -> int:
+    """Give committed changes their feed position.
+
+    ``seq`` is allocated when the row is inserted, so a slow transaction can make
+    a lower seq visible after a higher one. Positions are handed out after
+    commit, one publisher at a time, so they become visible in increasing order
+    and an ``after=<position>`` consumer never skips a row. Rows whose publisher
+    never ran (the process died right after commit) are picked up by the next one.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PUBLISH_LOCK_ID])
+        pending = list(ArticleChange.objects.filter(position__isnull=True).order_by("seq").only("seq"))
+        if not pending:
+            return 0
+        last = ArticleChange.objects.aggregate(value=Max("position"))["value"] or 0
+        for offset, change in enumerate(pending, start=1):
+            change.position = last + offset
+        ArticleChange.objects.bulk_update(pending, ["position"])
+    return len(pending)
+
+
+def articles_version(article_id: Optional[int] = None) -> tuple[int, Optional[datetime]]:
+    qs = ArticleChange.objects.all()
+    if article_id is not None:
+        qs = qs.filter(article_id=article_id)
+    latest = qs.order_by("-seq").values_list("seq", "created_at").first()
+    return latest if latest else (0, None)
+
+
+def changes_after(after: int, limit: int, include_hidden: bool = False) -> list[dict]:
+    """Return changes after feed position ``after``.
+
+    Unless ``include_hidden`` is set, changes of articles that are not public
+    (or no longer exist) are redacted to their id and ``unpublished``/``deleted``.
+    """
+    rows = (
+        ArticleChange.objects.filter(position__gt=after)
+        .annotate(visible=Exists(Article.objects.filter(pk=OuterRef("article_id"), is_public=True)))
+        .order_by("position")
+        .values("position", "article_id", "url", "kind", "created_at", "visible")[:limit]
+    )
+    changes = []
+    for row in rows:
+        change = {
+            "seq": row["position"],
+            "article_id": row["article_id"],
+            "url": row["url"],
+            "kind": row["kind"],
+            "created_at": row["created_at"],
+        }
+        if not include_hidden and not row["visible"]:
+            change["url"] = ""
+            if change["kind"] != ArticleChange.KIND_DELETED:
+                change["kind"] = ArticleChange.KIND_UNPUBLISHED
+        changes.append(change)
+    return changes
+
+
+def changes_page_frames(
+    after: int,
+    limit: int,
+    wait_seconds: float,
+    include_hidden: bool = False,
+) -> Iterator[Union[str, Pause]]:
+    """Yield one changes page as JSON once rows arrive or the wait runs out.
+
+    Serve it through ``core.streaming.streaming_body``: under ASGI the pauses
+    between polls run on the event loop, so a long poll holds no thread.
+    """
+    poll = max(0.05, float(getattr(settings, "ARTICLES_CHANGES_POLL_SECONDS", 0.5)))
+    deadline = time.monotonic() + max(0.0, wait_seconds)
+    while True:
+        rows = changes_after(after, limit, include_hidden)
+        if rows or time.monotonic() >= deadline:
+            break
+        yield Pause(min(poll, max(0.0, deadline - time.monotonic())))
+    yield json.dumps(
+        {
+            "results": rows,
+            "next_after": rows[-1]["seq"] if rows else after,
+            "has_more": len(rows) == limit,
+        },
+        cls=DjangoJSONEncoder,
+    )
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from articles.models import Article, ArticleFingerprint
+
+BAND_COUNT = 4
+BAND_BITS = 16
+SHINGLE_WORDS = 3
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def dedup_enabled() -> bool:
+    return bool(getattr(settings, "ARTICLES_DEDUP_ENABLED", True))
+
+
+def max_distance() -> int:
+    # Two fingerprints within BAND_COUNT - 1 bits differ in at most that many
+    # bands, so they share at least one band exactly and the banded lookup finds
+    # them. Larger distances would silently miss candidates, so they are capped.
+    distance = int(getattr(settings, "ARTICLES_DEDUP_MAX_DISTANCE", BAND_COUNT - 1))
+    return max(0, min(distance, BAND_COUNT - 1))
+
+
+def simhash(text: str) -> Optional[int]:
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) < SHINGLE_WORDS:
+        return None
+    weights = [0] * 64
+    for index in range(len(words) - SHINGLE_WORDS + 1):
+        shingle = " ".join(words[index:index + SHINGLE_WORDS])
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def article_fingerprint(title: str, body: str) -> Optional[int]:
+    min_chars = int(getattr(settings, "ARTICLES_DEDUP_MIN_CHARS", 200))
+    if len((body or "").strip()) < min_chars:
+        return None
+    return simhash(f"{title}\n{body}")
+
+
+def bands(fingerprint: int) -> list[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (band * BAND_BITS)) & mask for band in range(BAND_COUNT)]
+
+
+def to_signed(fingerprint: int) -> int:
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value & 0xFFFFFFFFFFFFFFFF
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def find_canonicals(fingerprints: dict[str, Optional[int]]) -> dict[str, int]:
+    wanted = {url: fp for url, fp in fingerprints.items() if fp is not None}
+    if not wanted or not dedup_enabled():
+        return {}
+    limit = max_distance()
+    window = timedelta(days=float(getattr(settings, "ARTICLES_DEDUP_WINDOW_DAYS", 7)))
+    condition = Q()
+    for band in range(BAND_COUNT):
+        values = {bands(fp)[band] for fp in wanted.values()}
+        condition |= Q(**{f"band{band}__in": values})
+    # Candidates are bucketed by (band, value), so each fingerprint is only
+    # compared with the candidates it shares a band with.
+    buckets: dict[tuple[int, int], list[tuple[int, int, Optional[int]]]] = {}
+    rows = (
+        ArticleFingerprint.objects.filter(condition, created_at__gte=timezone.now() - window)
+        .exclude(article__url__in=list(wanted))
+        .values_list("article_id", "simhash", "article__canonical_id")
+    )
+    for article_id, stored, canonical_id in rows:
+        stored = to_unsigned(stored)
+        for band, value in enumerate(bands(stored)):
+            buckets.setdefault((band, value), []).append((article_id, stored, canonical_id))
+    matches: dict[str, int] = {}
+    for url, fp in wanted.items():
+        best: Optional[tuple[int, int]] = None
+        for band, value in enumerate(bands(fp)):
+            for article_id, stored, canonical_id in buckets.get((band, value), ()):
+                distance = hamming(fp, stored)
+                if distance <= limit and (best is None or distance < best[0]):
+                    best = (distance, canonical_id or article_id)
+        if best is not None:
+            matches[url] = best[1]
+    return matches
+
+
+def find_canonical(url: str, fingerprint: Optional[int]) -> Optional[int]:
+    return find_canonicals({url: fingerprint}).get(url)
+
+
+def find_batch_canonicals(fingerprints: dict[str, Optional[int]]) -> dict[str, str]:
+    """Map each near-duplicate URL to the earliest URL of the same batch it matches.
+
+    Only URLs that are not duplicates themselves can be a canonical, as in the index.
+    """
+    limit = max_distance()
+    buckets: list[dict[int, list[str]]] = [{} for _ in range(BAND_COUNT)]
+    links: dict[str, str] = {}
+    for url, fp in fingerprints.items():
+        if fp is None:
+            continue
+        best: Optional[tuple[int, str]] = None
+        for band, value in enumerate(bands(fp)):
+            for other in buckets[band].get(value, ()):
+                distance = hamming(fp, fingerprints[other])
+                if distance <= limit and (best is None or distance < best[0]):
+                    best = (distance, other)
+        if best is not None:
+            links[url] = best[1]
+            continue
+        for band, value in enumerate(bands(fp)):
+            buckets[band].setdefault(value, []).append(url)
+    return links
+
+
+def fingerprint_row(article_id: int, fingerprint: int) -> ArticleFingerprint:
+    band_values = bands(fingerprint)
+    return ArticleFingerprint(
+        article_id=article_id,
+        simhash=to_signed(fingerprint),
+        band0=band_values[0],
+        band1=band_values[1],
+        band2=band_values[2],
+        band3=band_values[3],
+    )
+
+
+def sync_fingerprints(entries: Iterable[tuple[int, Optional[int]]]) -> None:
+    """Index canonical articles and drop the fingerprints of duplicates or short texts."""
+    entries = list(entries)
+    stale = [article_id for article_id, fp in entries if fp is None]
+    if stale:
+        ArticleFingerprint.objects.filter(article_id__in=stale).delete()
+    rows = [fingerprint_row(article_id, fp) for article_id, fp in entries if fp is not None]
+    if not rows:
+        return
+    ArticleFingerprint.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["article"],
+        update_fields=["simhash", "band0", "band1", "band2", "band3"],
+    )
+
+
+def dedup_values(values: dict[str, dict]) -> tuple[dict[str, Optional[int]], dict[str, str]]:
+    """Link near-duplicates in ``values`` (keyed by URL) to their canonical article.
+
+    Duplicates keep their body (a false match must not lose text) and get
+    ``canonical_id`` when the canonical is already stored. Returns the fingerprint to index for each URL (None when
+    nothing should be indexed) and, for duplicates of another URL in ``values``,
+    that URL; the caller links those once the canonical row has an id.
+    """
+    fingerprints = {
+        url: article_fingerprint(entry.get("title", ""), entry.get("body", "")) if dedup_enabled() else None
+        for url, entry in values.items()
+    }
+    canonicals = find_canonicals(fingerprints)
+    links = find_batch_canonicals({url: None if url in canonicals else fp for url, fp in fingerprints.items()})
+    for url, entry in values.items():
+        canonical_id = canonicals.get(url)
+        entry["canonical_id"] = canonical_id
+        if canonical_id is not None or url in links:
+            fingerprints[url] = None
+    return fingerprints, links
+
+
+def promote_duplicate(article: Article) -> Optional[Article]:
+    """Make the oldest duplicate of ``article`` the canonical of the others.
+
+    Called before ``article`` is deleted, so its cluster keeps a canonical
+    instead of every duplicate falling back to ``canonical=None`` on its own.
+    """
+    successor = Article.objects.filter(canonical_id=article.pk).order_by("id").first()
+    if successor is None:
+        return None
+    Article.objects.filter(canonical_id=article.pk).exclude(pk=successor.pk).update(canonical=successor)
+    Article.objects.filter(pk=successor.pk).update(canonical=None)
+    successor.canonical = None
+    sync_fingerprints([(successor.pk, article_fingerprint(successor.title, successor.body))])
+    return successor
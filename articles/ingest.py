@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import IO, Any, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from articles.changes import change_kind, record_changes
+from articles.dedup import dedup_values, sync_fingerprints
+from articles.models import Article
+from articles.search import refresh_search_vectors
+
+INGEST_FIELDS = ["source", "published_at", "fetched_at", "title", "body", "language"]
+
+RESULT_CREATED = "created"
+RESULT_UPDATED = "updated"
+RESULT_REJECTED = "rejected"
+
+INVALID_LINE = object()
+
+READ_CHUNK_BYTES = 64 * 1024
+UPSERT_ATTEMPTS = 3
+
+
+class IngestPayloadError(ValueError):
+    pass
+
+
+class IngestPayloadTooLarge(IngestPayloadError):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"payload_too_large (max {max_bytes} bytes)")
+        self.max_bytes = max_bytes
+        self.results: list[dict] = []
+
+
+class BoundedStream:
+    """Reads a request body in chunks and fails once it grows past ``max_bytes``.
+
+    Chunked uploads carry no ``Content-Length``, so the limit has to be enforced
+    while reading rather than up front.
+    """
+
+    def __init__(self, stream: Optional[IO[bytes]], max_bytes: int) -> None:
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.read_bytes = 0
+
+    def _count(self, data: bytes) -> bytes:
+        self.read_bytes += len(data)
+        if self.max_bytes > 0 and self.read_bytes > self.max_bytes:
+            raise IngestPayloadTooLarge(self.max_bytes)
+        return data
+
+    def read(self) -> bytes:
+        if self.stream is None:
+            return b""
+        parts = []
+        while True:
+            chunk = self.stream.read(READ_CHUNK_BYTES)
+            if not chunk:
+                return b"".join(parts)
+            parts.append(self._count(chunk))
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.stream is None:
+            return
+        parts = []
+        while True:
+            part = self._count(self.stream.readline(READ_CHUNK_BYTES))
+            if part:
+                parts.append(part)
+            if parts and (not part or part.endswith(b"\n")):
+                yield b"".join(parts)
+                parts = []
+            if not part:
+                return
+
+
+def ingest_max_body_bytes() -> int:
+    return int(getattr(settings, "ARTICLES_INGEST_MAX_BODY_BYTES", 20 * 1024 * 1024))
+
+
+def ingest_chunk_size() -> int:
+    return max(1, int(getattr(settings, "ARTICLES_INGEST_CHUNK_SIZE", 500)))
+
+
+def validate_item(raw: Any) -> tuple[Optional[dict], str]:
+    if raw is INVALID_LINE:
+        return None, "invalid_json"
+    if not isinstance(raw, dict):
+        return None, "not_an_object"
+    url = raw.get("url")
+    if not isinstance(url, str) or not url.strip():
+        return None, "url_required"
+    url = url.strip()
+    if len(url) > 1000:
+        return None, "url_too_long"
+    if not url.startswith(("http://", "https://")):
+        return None, "url_invalid"
+    source = raw.get("source")
+    if not isinstance(source, str) or not source.strip():
+        return None, "source_required"
+    source = source.strip()
+    if len(source) > 255:
+        return None, "source_too_long"
+    published_at = _parse_timestamp(raw.get("published_at"))
+    if published_at is None:
+        return None, "published_at_invalid"
+    fetched_at = _parse_timestamp(raw.get("fetched_at"))
+    if fetched_at is None:
+        return None, "fetched_at_invalid"
+    values = {
+        "url": url,
+        "source": source,
+        "published_at": published_at,
+        "fetched_at": fetched_at,
+    }
+    for key in ("title", "body", "language"):
+        value = raw.get(key)
+        if value is None:
+            value = ""
+        if not isinstance(value, str):
+            return None, f"{key}_invalid"
+        values[key] = value
+    if len(values["language"]) > 16:
+        return None, "language_too_long"
+    return values, ""
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        dt = parse_datetime(value.strip())
+    except ValueError:
+        return None
+    if dt is None:
+        return None
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt, timezone.get_current_timezone())
+    return dt
+
+
+def iter_json_array(stream: Optional[IO[bytes]]) -> Iterator[Any]:
+    raw = stream.read() if stream is not None else b""
+    try:
+        data = json.loads(raw or b"null")
+    except ValueError as exc:
+        raise IngestPayloadError(f"invalid_json: {exc}") from exc
+    if not isinstance(data, list):
+        raise IngestPayloadError("expected_json_array")
+    yield from data
+
+
+def iter_ndjson(stream: Optional[IO[bytes]]) -> Iterator[Any]:
+    if stream is None:
+        return
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield INVALID_LINE
+
+
+def ingest_items(items: Iterable[Any], chunk_size: Optional[int] = None) -> list[dict]:
+    chunk_size = chunk_size or ingest_chunk_size()
+    results: list[dict] = []
+    chunk: list[tuple[int, dict]] = []
+    try:
+        for index, raw in enumerate(items):
+            values, reason = validate_item(raw)
+            if values is None:
+                results.append({"index": index, "status": RESULT_REJECTED, "reason": reason})
+                continue
+            chunk.append((index, values))
+            if len(chunk) >= chunk_size:
+                results.extend(_upsert_chunk(chunk))
+                chunk = []
+    except IngestPayloadTooLarge as exc:
+        # NDJSON chunks before the limit are already committed; report them.
+        exc.results = sorted(results, key=lambda entry: entry["index"])
+        raise
+    if chunk:
+        results.extend(_upsert_chunk(chunk))
+    results.sort(key=lambda entry: entry["index"])
+    return results
+
+
+def _upsert_chunk(chunk: list[tuple[int, dict]]) -> list[dict]:
+    latest: dict[str, dict] = {}
+    for _, values in chunk:
+        latest[values["url"]] = values
+    for attempt in range(UPSERT_ATTEMPTS):
+        try:
+            return _apply_chunk(chunk, latest)
+        except IntegrityError:
+            # select_for_update only locks existing rows, so a concurrent ingest
+            # can insert one of our new URLs first. Retrying sees it as an update.
+            if attempt == UPSERT_ATTEMPTS - 1:
+                raise
+    return []
+
+
+def _apply_chunk(chunk: list[tuple[int, dict]], latest: dict[str, dict]) -> list[dict]:
+    now = timezone.now()
+    fingerprints, links = dedup_values(latest)
+    with transaction.atomic():
+        existing = {
+            article.url: article
+            for article in Article.objects.select_for_update().filter(url__in=list(latest))
+        }
+        to_create = []
+        to_update = []
+        for url, values in latest.items():
+            article = existing.get(url)
+            if article is None:
+                to_create.append(Article(**values))
+                continue
+            for field in INGEST_FIELDS + ["canonical_id"]:
+                setattr(article, field, values[field])
+            article.updated_at = now
+            to_update.append(article)
+        if to_create:
+            Article.objects.bulk_create(to_create)
+        if to_update:
+            Article.objects.bulk_update(to_update, INGEST_FIELDS + ["canonical", "updated_at"])
+        if links:
+            by_url = {article.url: article for article in to_create + to_update}
+            for url, canonical_url in links.items():
+                by_url[url].canonical_id = by_url[canonical_url].pk
+            Article.objects.bulk_update([by_url[url] for url in links], ["canonical"])
+        refresh_search_vectors(article.pk for article in to_create + to_update)
+        sync_fingerprints((article.pk, fingerprints[article.url]) for article in to_create + to_update)
+        record_changes(
+            [(article, change_kind(article, True)) for article in to_create]
+            + [(article, change_kind(article, False)) for article in to_update]
+        )
+
+    articles = {article.url: article for article in to_create + to_update}
+    results = []
+    seen: set[str] = set()
+    for index, values in chunk:
+        url = values["url"]
+        status = RESULT_CREATED
+        if url in existing or url in seen:
+            status = RESULT_UPDATED
+        seen.add(url)
+        results.append({"index": index, "status": status, "id": articles[url].pk})
+    return results
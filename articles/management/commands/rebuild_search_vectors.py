@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from articles.search import ensure_search_index, is_postgres, rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Backfill Article.search_vector in chunks and ensure its GIN index exists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute every row, not only missing vectors.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not is_postgres():
+            self.stdout.write("Full-text search vectors are only maintained on PostgreSQL; nothing to do.")
+            return
+        ensure_search_index()
+        updated = rebuild_search_vectors(chunk_size=options["chunk_size"], only_missing=not options["all"])
+        self.stdout.write(self.style.SUCCESS(f"Search vectors rebuilt. updated={updated}"))
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from core.models import PublishableModel
@@ -11,13 +12,77 @@ class Article(PublishableModel):
     title = models.TextField(blank=True, default="")
     body = models.TextField(blank=True, default="")
     language = models.CharField(max_length=16, blank=True, default="")
+    # Maintained on write (see articles.search); the GIN index is created after migrate.
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+    canonical = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="duplicates",
+    )
 
     class Meta:
         ordering = ["-published_at"]
         indexes = [
             models.Index(fields=["published_at"]),
             models.Index(fields=["source"]),
+            models.Index(fields=["-published_at", "-id"], name="article_feed_idx"),
+            models.Index(fields=["source", "-published_at", "-id"], name="article_source_feed_idx"),
+            models.Index(fields=["language", "-published_at", "-id"], name="article_language_feed_idx"),
         ]
 
     def __str__(self) -> str:
         return f"{self.source}:{self.published_at:%Y-%m-%d}"
+
+
+class ArticleFingerprint(models.Model):
+    article = models.OneToOneField(Article, primary_key=True, on_delete=models.CASCADE, related_name="fingerprint")
+    simhash = models.BigIntegerField()
+    band0 = models.PositiveIntegerField()
+    band1 = models.PositiveIntegerField()
+    band2 = models.PositiveIntegerField()
+    band3 = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["band0", "created_at"]),
+            models.Index(fields=["band1", "created_at"]),
+            models.Index(fields=["band2", "created_at"]),
+            models.Index(fields=["band3", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.article_id}:{self.simhash & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+class ArticleChange(models.Model):
+    KIND_CREATED = "created"
+    KIND_UPDATED = "updated"
+    KIND_UNPUBLISHED = "unpublished"
+    KIND_DELETED = "deleted"
+
+    KIND_CHOICES = [
+        (KIND_CREATED, "Created"),
+        (KIND_UPDATED, "Updated"),
+        (KIND_UNPUBLISHED, "Unpublished"),
+        (KIND_DELETED, "Deleted"),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    # Feed position, assigned after commit in commit order (see articles.changes).
+    position = models.BigIntegerField(null=True, blank=True, unique=True)
+    article_id = models.BigIntegerField()
+    url = models.URLField(max_length=1000)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["seq"]
+        indexes = [
+            models.Index(fields=["article_id", "seq"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.seq} {self.kind} {self.article_id}"
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import re
+from html import escape
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.functions import Cast, Substr
+
+from articles.models import Article
+
+SEARCH_INDEX_NAME = "article_search_vector_gin"
+HEADLINE_START = "<mark>"
+HEADLINE_STOP = "</mark>"
+# ts_headline does not escape the document, so Postgres marks matches with
+# control characters that are swapped for <mark> after HTML-escaping.
+_PG_START = "\x02"
+_PG_STOP = "\x03"
+
+
+def search_config() -> str:
+    return getattr(settings, "ARTICLES_SEARCH_CONFIG", "english")
+
+
+def is_postgres(conn=None) -> bool:
+    return (conn or connection).vendor == "postgresql"
+
+
+def article_search_vector():
+    config = search_config()
+    return SearchVector("title", weight="A", config=config) + SearchVector("body", weight="B", config=config)
+
+
+def refresh_search_vectors(article_ids: Iterable[int]) -> int:
+    if not is_postgres():
+        return 0
+    ids = list(article_ids)
+    if not ids:
+        return 0
+    return Article.objects.filter(pk__in=ids).update(search_vector=article_search_vector())
+
+
+def rebuild_search_vectors(chunk_size: int = 1000, only_missing: bool = True) -> int:
+    if not is_postgres():
+        return 0
+    qs = Article.objects.order_by("id")
+    if only_missing:
+        qs = qs.filter(search_vector__isnull=True)
+    updated = 0
+    last_id = 0
+    while True:
+        ids = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:chunk_size])
+        if not ids:
+            return updated
+        updated += refresh_search_vectors(ids)
+        last_id = ids[-1]
+
+
+def ensure_search_index(conn=None) -> None:
+    conn = conn or connection
+    if not is_postgres(conn):
+        return
+    table = Article._meta.db_table
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{SEARCH_INDEX_NAME}" ON "{table}" USING gin ("search_vector")'
+        )
+
+
+def search_articles(queryset: QuerySet, query: str) -> QuerySet:
+    if is_postgres():
+        ts_query = SearchQuery(query, search_type="websearch", config=search_config())
+        return queryset.filter(search_vector=ts_query).annotate(
+            # ts_rank returns float4; as float8 the value survives the cursor
+            # round trip, so rows tied at a page boundary still match "rank = c".
+            rank=Cast(SearchRank(F("search_vector"), ts_query), FloatField()),
+            headline=SearchHeadline(
+                "body",
+                ts_query,
+                config=search_config(),
+                start_sel=_PG_START,
+                stop_sel=_PG_STOP,
+                max_words=35,
+                min_words=15,
+            ),
+        )
+    # SQLite/dev fallback: every term must appear in the title or body.
+    terms = [term for term in re.split(r"\s+", query.strip()) if term]
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    return queryset.annotate(
+        rank=Value(0.0, output_field=FloatField()),
+        headline=Substr("body", 1, 300),
+    )
+
+
+def render_headline(text: str, query: str) -> str:
+    if is_postgres():
+        return escape(text or "").replace(_PG_START, HEADLINE_START).replace(_PG_STOP, HEADLINE_STOP)
+    return highlight_fallback(text, query)
+
+
+def highlight_fallback(text: str, query: str) -> str:
+    terms = [escape(term) for term in re.split(r"\s+", query.strip()) if term]
+    escaped = escape(text or "")
+    if not terms:
+        return escaped
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    return pattern.sub(lambda m: f"{HEADLINE_START}{m.group(0)}{HEADLINE_STOP}", escaped)
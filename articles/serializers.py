@@ -1,7 +1,16 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from django.db.models.functions import Substr
+from django.utils import timezone
 from rest_framework import serializers
 
 from articles.models import Article
 
+BODY_EXCERPT_FIELD = "body_excerpt"
+DEFAULT_EXCERPT_CHARS = 280
+MAX_EXCERPT_CHARS = 2000
+
 
 class ArticleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,8 +25,9 @@ class ArticleSerializer(serializers.ModelSerializer):
             "body",
             "language",
             "is_public",
+            "canonical",
         ]
-        read_only_fields = ["id"]
+        read_only_fields = ["id", "canonical"]
 
 
 class ArticleIngestSerializer(serializers.Serializer):
@@ -28,3 +38,37 @@ class ArticleIngestSerializer(serializers.Serializer):
     title = serializers.CharField(allow_blank=True, required=False, default="")
     body = serializers.CharField(allow_blank=True, required=False, default="")
     language = serializers.CharField(allow_blank=True, required=False, default="")
+
+
+ARTICLE_FIELDS = list(ArticleSerializer.Meta.fields)
+ARTICLE_SELECTABLE_FIELDS = ARTICLE_FIELDS + [BODY_EXCERPT_FIELD]
+
+
+def resolve_article_fields(fields: Optional[str], exclude: Optional[str]) -> list[str]:
+    requested = [f.strip() for f in (fields or "").split(",") if f.strip()]
+    excluded = [f.strip() for f in (exclude or "").split(",") if f.strip()]
+    unknown = [f for f in requested + excluded if f not in ARTICLE_SELECTABLE_FIELDS]
+    if unknown:
+        raise serializers.ValidationError(
+            {"fields": f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(ARTICLE_SELECTABLE_FIELDS)}."}
+        )
+    selected = requested or ARTICLE_FIELDS
+    return [f for f in dict.fromkeys(selected) if f not in excluded]
+
+
+def project_articles(queryset, fields: list[str], extra: Iterable[str] = (), excerpt_chars: int = DEFAULT_EXCERPT_CHARS):
+    columns = [f for f in dict.fromkeys(list(fields) + list(extra)) if f != BODY_EXCERPT_FIELD]
+    if BODY_EXCERPT_FIELD in fields:
+        queryset = queryset.annotate(**{BODY_EXCERPT_FIELD: Substr("body", 1, excerpt_chars)})
+        columns.append(BODY_EXCERPT_FIELD)
+    return queryset.values(*columns)
+
+
+def render_article_row(row: dict, fields: list[str]) -> dict:
+    out = {}
+    for name in fields:
+        value = row.get(name)
+        if isinstance(value, datetime) and timezone.is_aware(value):
+            value = timezone.localtime(value)
+        out[name] = value
+    return out
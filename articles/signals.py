@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.db import connections
+from django.dispatch import receiver
+
+from articles.changes import change_kind, record_change
+from articles.dedup import promote_duplicate
+from articles.models import Article, ArticleChange
+from articles.search import ensure_search_index, refresh_search_vectors
+
+
+@receiver(post_save, sender=Article)
+def record_article_save(sender, instance: Article, created: bool, **kwargs):
+    record_change(instance, change_kind(instance, created))
+
+
+@receiver(post_save, sender=Article)
+def refresh_article_search_vector(sender, instance: Article, update_fields=None, **kwargs):
+    if update_fields is not None and not {"title", "body"} & set(update_fields):
+        return
+    refresh_search_vectors([instance.pk])
+
+
+@receiver(pre_delete, sender=Article)
+def promote_article_duplicate(sender, instance: Article, **kwargs):
+    successor = promote_duplicate(instance)
+    if successor is not None:
+        record_change(successor, ArticleChange.KIND_UPDATED)
+
+
+@receiver(post_delete, sender=Article)
+def record_article_delete(sender, instance: Article, **kwargs):
+    record_change(instance, ArticleChange.KIND_DELETED)
+
+
+def create_search_index(sender, using="default", **kwargs):
+    ensure_search_index(connections[using])
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from articles.models import Article
+
+
+class ArticleSearchPaginationTests(TestCase):
+    def test_pages_across_tied_ranks(self):
+        published_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        # Identical documents rank the same, so every page boundary falls on a tie.
+        ids = {
+            Article.objects.create(
+                url=f"https://example.com/{index}",
+                source="example",
+                published_at=published_at,
+                fetched_at=published_at,
+                title="Climate report",
+                body="The climate report covers rising sea levels and warmer winters.",
+            ).id
+            for index in range(7)
+        }
+        client = APIClient()
+        seen = []
+        url = "/api/articles/search/?q=climate&limit=2"
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(len(seen), len(ids))
+        self.assertEqual(set(seen), ids)
@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from articles.views import ArticleSummaryView, ArticleViewSet, HealthView
+from articles.views import ArticleChangesView, ArticleSummaryView, ArticleViewSet, HealthView
 
 router = DefaultRouter()
 router.register("articles", ArticleViewSet, basename="articles")
@@ -9,5 +9,6 @@ router.register("articles", ArticleViewSet, basename="articles")
 urlpatterns = [
     path("health/", HealthView.as_view(), name="health"),
     path("articles/summary/", ArticleSummaryView.as_view(), name="articles-summary"),
+    path("articles/changes/", ArticleChangesView.as_view(), name="articles-changes"),
     path("", include(router.urls)),
 ]
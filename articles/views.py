@@ -1,11 +1,44 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views import View
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from articles.changes import articles_version, changes_page_frames
+from articles.dedup import dedup_values, sync_fingerprints
+from articles.ingest import (
+    RESULT_CREATED,
+    RESULT_REJECTED,
+    RESULT_UPDATED,
+    BoundedStream,
+    IngestPayloadError,
+    IngestPayloadTooLarge,
+    ingest_items,
+    ingest_max_body_bytes,
+    iter_json_array,
+    iter_ndjson,
+)
 from articles.models import Article
-from articles.serializers import ArticleIngestSerializer, ArticleSerializer
+from articles.search import render_headline, search_articles
+from articles.serializers import (
+    DEFAULT_EXCERPT_CHARS,
+    MAX_EXCERPT_CHARS,
+    ArticleIngestSerializer,
+    ArticleSerializer,
+    project_articles,
+    render_article_row,
+    resolve_article_fields,
+)
+from core.caching import cached_conditional_response
+from core.pagination import KeysetPagination
+from core.query import parse_query_datetime
+from core.streaming import streaming_body
 from core.viewsets import PublicReadModelViewSet
 
 
@@ -17,9 +50,121 @@ class HealthView(APIView):
         return Response({"status": "ok"})
 
 
+class ArticlePagination(KeysetPagination):
+    ordering = ("-published_at", "-id")
+    page_size = 50
+    max_page_size = 200
+
+
+class ArticleSearchPagination(KeysetPagination):
+    ordering = ("-rank", "-id")
+    page_size = 20
+    max_page_size = 100
+
+    def cursor_value(self, model, name: str, value):
+        if name == "rank":
+            return float(value)
+        return super().cursor_value(model, name, value)
+
+
 class ArticleViewSet(PublicReadModelViewSet):
     queryset = Article.objects.all()
     serializer_class = ArticleSerializer
+    pagination_class = ArticlePagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in {"list", "search"}:
+            return queryset
+        params = self.request.query_params
+        sources = [s.strip() for s in params.get("source", "").split(",") if s.strip()]
+        if len(sources) == 1:
+            queryset = queryset.filter(source=sources[0])
+        elif sources:
+            queryset = queryset.filter(source__in=sources)
+        language = params.get("language")
+        if language:
+            queryset = queryset.filter(language=language.strip())
+        since = params.get("since")
+        if since:
+            queryset = queryset.filter(published_at__gte=parse_query_datetime(since, "since"))
+        until = params.get("until")
+        if until:
+            queryset = queryset.filter(published_at__lte=parse_query_datetime(until, "until", end_of_day=True))
+        if params.get("collapse", "").lower() in {"1", "true", "yes"}:
+            queryset = queryset.filter(canonical__isnull=True)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_requested_fields()
+        ordering_fields = [f.lstrip("-") for f in ArticlePagination.ordering]
+        queryset = project_articles(
+            self.filter_queryset(self.get_queryset()),
+            fields,
+            extra=ordering_fields,
+            excerpt_chars=self.get_excerpt_chars(),
+        )
+        rows = self.paginate_queryset(queryset)
+        return self.get_paginated_response([render_article_row(row, fields) for row in rows])
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_value = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        if request.user.is_staff or not str(lookup_value).isdigit():
+            return Response(self.get_detail_data(lookup_value))
+        version, last_modified = articles_version(article_id=int(lookup_value))
+        return cached_conditional_response(
+            request,
+            key=f"articles:detail:{lookup_value}:{sorted(request.query_params.lists())}",
+            version=version,
+            last_modified=last_modified,
+            build=lambda: self.get_detail_data(lookup_value),
+            max_age=int(getattr(settings, "ARTICLES_CACHE_MAX_AGE_SECONDS", 60)),
+            timeout=int(getattr(settings, "ARTICLES_CACHE_TIMEOUT_SECONDS", 300)),
+        )
+
+    def get_detail_data(self, lookup_value) -> dict:
+        fields = self.get_requested_fields()
+        params = self.request.query_params
+        if params.get("fields") is None and params.get("exclude") is None:
+            return self.get_serializer(self.get_object()).data
+        lookup = {self.lookup_field: lookup_value}
+        queryset = project_articles(
+            self.filter_queryset(self.get_queryset()).filter(**lookup),
+            fields,
+            excerpt_chars=self.get_excerpt_chars(),
+        )
+        row = queryset.first()
+        if row is None:
+            raise NotFound()
+        return render_article_row(row, fields)
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        query = (request.query_params.get("q") or "").strip()
+        if not query:
+            return Response({"detail": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = search_articles(self.filter_queryset(self.get_queryset()), query).values(
+            "id", "url", "source", "published_at", "title", "language", "rank", "headline"
+        )
+        paginator = ArticleSearchPagination()
+        rows = paginator.paginate_queryset(queryset, request, view=self)
+        results = []
+        for row in rows:
+            row = render_article_row(row, list(row))
+            row["headline"] = render_headline(row["headline"], query)
+            results.append(row)
+        return paginator.get_paginated_response(results)
+
+    def get_requested_fields(self) -> list[str]:
+        params = self.request.query_params
+        return resolve_article_fields(params.get("fields"), params.get("exclude"))
+
+    def get_excerpt_chars(self) -> int:
+        try:
+            chars = int(self.request.query_params.get("excerpt_chars", DEFAULT_EXCERPT_CHARS))
+        except ValueError:
+            chars = DEFAULT_EXCERPT_CHARS
+        return max(1, min(chars, MAX_EXCERPT_CHARS))
 
     @action(detail=False, methods=["post"])
     def ingest(self, request):
@@ -27,12 +172,65 @@ class ArticleViewSet(PublicReadModelViewSet):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         url = data.pop("url")
+        fingerprints, _ = dedup_values({url: data})
+        fingerprint = fingerprints[url]
         article, created = Article.objects.update_or_create(url=url, defaults=data)
+        sync_fingerprints([(article.pk, fingerprint)])
         return Response(
-            {"status": "ok", "id": article.id, "created": created},
+            {"status": "ok", "id": article.id, "created": created, "canonical": article.canonical_id},
             status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
         )
 
+    @action(detail=False, methods=["post"], url_path="ingest/bulk")
+    def ingest_bulk(self, request):
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            content_length = 0
+        max_bytes = ingest_max_body_bytes()
+        if max_bytes > 0 and content_length > max_bytes:
+            return Response(
+                {"status": "error", "detail": f"payload_too_large (max {max_bytes} bytes)"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        content_type = (request.content_type or "").split(";")[0].strip().lower()
+        stream = BoundedStream(request.stream, max_bytes)
+        if content_type in {"application/x-ndjson", "application/jsonl", "application/jsonlines"}:
+            items = iter_ndjson(stream)
+        else:
+            items = iter_json_array(stream)
+        try:
+            results = ingest_items(items)
+        except IngestPayloadTooLarge as exc:
+            return Response(
+                {"status": "error", "detail": str(exc), "results": exc.results},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        except IngestPayloadError as exc:
+            return Response({"status": "error", "detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        counts = {RESULT_CREATED: 0, RESULT_UPDATED: 0, RESULT_REJECTED: 0}
+        for entry in results:
+            counts[entry["status"]] += 1
+        return Response({"status": "ok", **counts, "results": results})
+
+
+class ArticleChangesView(View):
+    def get(self, request):
+        params = request.GET
+        try:
+            after = max(0, int(params.get("after", "0")))
+            limit = int(params.get("limit", "100"))
+            wait = float(params.get("wait", "0"))
+        except ValueError:
+            return JsonResponse({"detail": "after, limit and wait must be numbers."}, status=400)
+        limit = max(1, min(limit, 1000))
+        wait = max(0.0, min(wait, float(getattr(settings, "ARTICLES_CHANGES_MAX_WAIT_SECONDS", 25))))
+        # Staff see every change; others get hidden articles redacted, as in the list.
+        frames = changes_page_frames(after, limit, wait, include_hidden=request.user.is_staff)
+        resp = StreamingHttpResponse(streaming_body(request, frames), content_type="application/json")
+        resp["Cache-Control"] = "no-cache"
+        return resp
+
 
 class ArticleSummaryView(APIView):
     authentication_classes = []
@@ -45,7 +243,18 @@ class ArticleSummaryView(APIView):
         except ValueError:
             limit = 5
         limit = max(1, min(limit, 10))
+        version, last_modified = articles_version()
+        return cached_conditional_response(
+            request,
+            key=f"articles:summary:{limit}",
+            version=version,
+            last_modified=last_modified,
+            build=lambda: self.build_summary(limit),
+            max_age=int(getattr(settings, "ARTICLES_CACHE_MAX_AGE_SECONDS", 60)),
+            timeout=int(getattr(settings, "ARTICLES_CACHE_TIMEOUT_SECONDS", 300)),
+        )
 
+    def build_summary(self, limit: int) -> dict:
         articles = list(
             Article.objects.filter(is_public=True)
             .order_by("-published_at")
@@ -63,11 +272,9 @@ class ArticleSummaryView(APIView):
                 summary_parts.append(title or source)
 
         summary = " · ".join(summary_parts) if summary_parts else "No crawled summaries yet."
-        return Response(
-            {
-                "summary": summary,
-                "count": len(articles),
-                "items": articles,
-                "as_of": timezone.now(),
-            }
-        )
+        return {
+            "summary": summary,
+            "count": len(articles),
+            "items": articles,
+            "as_of": timezone.now(),
+        }
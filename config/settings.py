@@ -92,6 +92,13 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "nousnews"),
+    }
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
@@ -141,3 +148,45 @@ CRAWLER_LLM_TIMEOUT_SECONDS = float(
 )
 CRAWLER_FETCH_TIMEOUT_SECONDS = float(os.getenv("CRAWLER_FETCH_TIMEOUT_SECONDS", "20"))
 CRAWLER_LOG_MAX_CHARS = int(os.getenv("CRAWLER_LOG_MAX_CHARS", "200000"))
+CRAWLER_LOG_FLUSH_EVENTS = int(os.getenv("CRAWLER_LOG_FLUSH_EVENTS", "50"))
+CRAWLER_LOG_FLUSH_SECONDS = float(os.getenv("CRAWLER_LOG_FLUSH_SECONDS", "5"))
+CRAWLER_LOG_BUFFER_MAX = int(os.getenv("CRAWLER_LOG_BUFFER_MAX", "1000"))
+CRAWLER_LOG_OVERFLOW = os.getenv("CRAWLER_LOG_OVERFLOW", "block")
+CRAWLER_LOG_VERBOSITY = os.getenv("CRAWLER_LOG_VERBOSITY", "")
+CRAWLER_LOG_SAMPLE_RATE = float(os.getenv("CRAWLER_LOG_SAMPLE_RATE", "0.1"))
+
+CRAWLER_BLOB_BACKEND = os.getenv("CRAWLER_BLOB_BACKEND", "db")
+CRAWLER_BLOB_ROOT = os.getenv("CRAWLER_BLOB_ROOT", str(BASE_DIR / "blobs"))
+CRAWLER_BLOB_MIN_CHARS = int(os.getenv("CRAWLER_BLOB_MIN_CHARS", "4096"))
+CRAWLER_BLOB_COMPRESS_LEVEL = int(os.getenv("CRAWLER_BLOB_COMPRESS_LEVEL", "6"))
+CRAWLER_ARCHIVE_HTML = os.getenv("CRAWLER_ARCHIVE_HTML", "false").lower() == "true"
+CRAWLER_LOG_PARTITION_DAYS_AHEAD = int(os.getenv("CRAWLER_LOG_PARTITION_DAYS_AHEAD", "7"))
+CRAWLER_METRICS_MAX_HOSTS = int(os.getenv("CRAWLER_METRICS_MAX_HOSTS", "200"))
+CRAWLER_STEP_QUERY_BUDGET = int(os.getenv("CRAWLER_STEP_QUERY_BUDGET", "0"))
+CRAWLER_PROFILE_INTERVAL_SECONDS = float(os.getenv("CRAWLER_PROFILE_INTERVAL_SECONDS", "0.02"))
+CRAWLER_PROFILE_MAX_OVERHEAD = float(os.getenv("CRAWLER_PROFILE_MAX_OVERHEAD", "0.02"))
+CRAWLER_PROFILE_MAX_STACKS = int(os.getenv("CRAWLER_PROFILE_MAX_STACKS", "5000"))
+CRAWLER_SLOW_PAGE_CPU_SECONDS = float(os.getenv("CRAWLER_SLOW_PAGE_CPU_SECONDS", "1.0"))
+CRAWLER_SLOW_PAGE_LIMIT = int(os.getenv("CRAWLER_SLOW_PAGE_LIMIT", "20"))
+CRAWLER_DISCOVERY_MAX_BYTES = int(os.getenv("CRAWLER_DISCOVERY_MAX_BYTES", str(50 * 1024 * 1024)))
+CRAWLER_DISCOVERY_MAX_SITEMAPS = int(os.getenv("CRAWLER_DISCOVERY_MAX_SITEMAPS", "20"))
+CRAWLER_ROBOTS_TTL_SECONDS = float(os.getenv("CRAWLER_ROBOTS_TTL_SECONDS", "86400"))
+CRAWLER_ROBOTS_MAX_CRAWL_DELAY = float(os.getenv("CRAWLER_ROBOTS_MAX_CRAWL_DELAY", "60"))
+CRAWLER_COUNTER_RECONCILE_SECONDS = float(os.getenv("CRAWLER_COUNTER_RECONCILE_SECONDS", "3600"))
+CRAWLER_COUNTER_FOLD_BATCH = int(os.getenv("CRAWLER_COUNTER_FOLD_BATCH", "5000"))
+CRAWLER_EVENTS_POLL_SECONDS = float(os.getenv("CRAWLER_EVENTS_POLL_SECONDS", "0.5"))
+CRAWLER_EVENTS_STATUS_SECONDS = float(os.getenv("CRAWLER_EVENTS_STATUS_SECONDS", "2"))
+CRAWLER_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("CRAWLER_EVENTS_HEARTBEAT_SECONDS", "15"))
+CRAWLER_EVENTS_MAX_SECONDS = float(os.getenv("CRAWLER_EVENTS_MAX_SECONDS", "300"))
+
+ARTICLES_INGEST_MAX_BODY_BYTES = int(os.getenv("ARTICLES_INGEST_MAX_BODY_BYTES", str(20 * 1024 * 1024)))
+ARTICLES_INGEST_CHUNK_SIZE = int(os.getenv("ARTICLES_INGEST_CHUNK_SIZE", "500"))
+ARTICLES_CHANGES_POLL_SECONDS = float(os.getenv("ARTICLES_CHANGES_POLL_SECONDS", "0.5"))
+ARTICLES_CHANGES_MAX_WAIT_SECONDS = float(os.getenv("ARTICLES_CHANGES_MAX_WAIT_SECONDS", "25"))
+ARTICLES_CACHE_MAX_AGE_SECONDS = int(os.getenv("ARTICLES_CACHE_MAX_AGE_SECONDS", "60"))
+ARTICLES_CACHE_TIMEOUT_SECONDS = int(os.getenv("ARTICLES_CACHE_TIMEOUT_SECONDS", "300"))
+ARTICLES_SEARCH_CONFIG = os.getenv("ARTICLES_SEARCH_CONFIG", "english")
+ARTICLES_DEDUP_ENABLED = os.getenv("ARTICLES_DEDUP_ENABLED", "true").lower() == "true"
+ARTICLES_DEDUP_MAX_DISTANCE = int(os.getenv("ARTICLES_DEDUP_MAX_DISTANCE", "3"))
+ARTICLES_DEDUP_WINDOW_DAYS = float(os.getenv("ARTICLES_DEDUP_WINDOW_DAYS", "7"))
+ARTICLES_DEDUP_MIN_CHARS = int(os.getenv("ARTICLES_DEDUP_MIN_CHARS", "200"))
@@ -1,8 +1,11 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from crawler.views import CrawlerMetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("articles.urls")),
     path("api/", include("crawler.urls")),
+    path("metrics", CrawlerMetricsView.as_view(), name="metrics"),
 ]
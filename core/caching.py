@@ -0,0 +1,62 @@
+import hashlib
+from datetime import datetime
+from typing import Callable, Optional
+
+from django.core.cache import cache
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return quote_etag(digest[:32])
+
+
+def is_not_modified(request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+    if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE") or "")
+    if if_modified_since is not None and last_modified is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def apply_cache_headers(
+    response,
+    etag: str,
+    last_modified: Optional[datetime],
+    max_age: int,
+    public: bool = True,
+):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    scope = "public" if public else "private"
+    response["Cache-Control"] = f"{scope}, max-age={max(0, int(max_age))}"
+    return response
+
+
+def cached_conditional_response(
+    request,
+    *,
+    key: str,
+    version: object,
+    last_modified: Optional[datetime],
+    build: Callable[[], object],
+    max_age: int,
+    timeout: int = 300,
+    public: bool = True,
+) -> Response:
+    etag = make_etag(key, version)
+    if is_not_modified(request, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        return apply_cache_headers(response, etag, last_modified, max_age, public)
+    cache_key = f"resp:{hashlib.sha1(key.encode('utf-8')).hexdigest()}:v{version}"
+    data = cache.get(cache_key)
+    if data is None:
+        data = build()
+        cache.set(cache_key, data, timeout)
+    return apply_cache_headers(Response(data), etag, last_modified, max_age, public)
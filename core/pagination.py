@@ -0,0 +1,112 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    ordering = ("-created_at", "-id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    page_size = 50
+    max_page_size = 200
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position))
+        rows = list(queryset[: self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        rows = rows[: self.limit]
+        self.next_position = self.row_position(rows[-1]) if self.has_next and rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "limit": self.limit,
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "limit": {"type": "integer"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        raw = request.query_params.get(self.page_size_query_param)
+        try:
+            size = int(raw) if raw else self.page_size
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def keyset_filter(self, position: list) -> Q:
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            clause = Q(**{f"{name}__{lookup}": position[index]})
+            for prev_field, prev_value in zip(self.ordering[:index], position[:index]):
+                clause &= Q(**{prev_field.lstrip("-"): prev_value})
+            condition |= clause
+        return condition
+
+    def row_position(self, row) -> list:
+        names = [field.lstrip("-") for field in self.ordering]
+        if isinstance(row, dict):
+            return [row.get(name) for name in names]
+        return [getattr(row, name) for name in names]
+
+    def encode_cursor(self, position: list) -> str:
+        values = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in position]
+        raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def cursor_value(self, model, name: str, value):
+        return model._meta.get_field(name).to_python(value)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError("cursor length mismatch")
+            position = []
+            for field, value in zip(self.ordering, values):
+                position.append(self.cursor_value(model, field.lstrip("-"), value))
+            if any(value is None for value in position):
+                raise ValueError("cursor has null values")
+            return position
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,21 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def parse_query_datetime(value: str, param: str, end_of_day: bool = False) -> datetime:
+    value = value.strip()
+    try:
+        dt = parse_datetime(value)
+        day = parse_date(value) if dt is None else None
+    except ValueError:
+        dt = day = None
+    if dt is None:
+        if day is None:
+            raise ValidationError({param: "Expected an ISO-8601 date or datetime."})
+        dt = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt, timezone.get_current_timezone())
+    return dt
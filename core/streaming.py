@@ -0,0 +1,61 @@
+"""Streaming response bodies that stream under both ASGI and WSGI.
+
+Django buffers a streaming body that does not match the server: a sync
+iterator under ASGI is consumed with ``sync_to_async(list)`` and an async one
+under WSGI with ``async_to_sync(list)``. Bodies are therefore written once as
+sync generators and adapted to the handler serving the request. A generator
+may yield a ``Pause`` between polls, which becomes ``time.sleep`` under WSGI
+and ``asyncio.sleep`` under ASGI, where it holds no thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Generator, Iterator, TypeVar, Union
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Pause:
+    seconds: float
+
+
+Frames = Generator[Union[T, Pause], None, None]
+
+
+def iter_sync(frames: Frames) -> Iterator[T]:
+    for frame in frames:
+        if isinstance(frame, Pause):
+            if frame.seconds > 0:
+                time.sleep(frame.seconds)
+            continue
+        yield frame
+
+
+async def iter_async(frames: Frames) -> AsyncIterator[T]:
+    # One thread hop per frame: only the current chunk is held, and database
+    # cursors stay on the request's sync thread.
+    done = object()
+    try:
+        while True:
+            frame = await sync_to_async(next)(frames, done)
+            if frame is done:
+                return
+            if isinstance(frame, Pause):
+                if frame.seconds > 0:
+                    await asyncio.sleep(frame.seconds)
+                continue
+            yield frame
+    finally:
+        await sync_to_async(frames.close)()
+
+
+def streaming_body(request, frames: Frames) -> Union[Iterator[T], AsyncIterator[T]]:
+    request = getattr(request, "_request", request)
+    return iter_async(frames) if isinstance(request, ASGIRequest) else iter_sync(frames)
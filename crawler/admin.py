@@ -1,6 +1,18 @@
 from django.contrib import admin
 
-from .models import CrawlQueueItem, CrawlRun, CrawlSeed, CrawlerConfig, CrawlLogEvent
+from .models import (
+    ContentBlob,
+    CrawlQueueCounter,
+    CrawlQueueItem,
+    CrawlRun,
+    CrawlSeed,
+    CrawlerConfig,
+    CrawlLogEvent,
+    DiscoverySource,
+    PageArchive,
+    RobotsTxt,
+    SeenUrl,
+)
 
 
 @admin.register(CrawlerConfig)
@@ -17,17 +29,44 @@ class CrawlerConfigAdmin(admin.ModelAdmin):
 
 @admin.register(CrawlSeed)
 class CrawlSeedAdmin(admin.ModelAdmin):
-    list_display = ("url", "config", "is_active", "last_fetched_at")
+    list_display = ("url", "config", "is_active", "last_fetched_at", "sources_checked_at")
     list_filter = ("is_active",)
     search_fields = ("url",)
 
 
+@admin.register(DiscoverySource)
+class DiscoverySourceAdmin(admin.ModelAdmin):
+    list_display = ("url", "kind", "seed", "is_active", "last_status", "last_checked_at", "urls_found", "urls_queued")
+    list_filter = ("kind", "is_active")
+    search_fields = ("url", "seed__url")
+    ordering = ("seed", "url")
+
+
 @admin.register(CrawlQueueItem)
 class CrawlQueueItemAdmin(admin.ModelAdmin):
-    list_display = ("url", "status", "depth", "seed_url", "last_attempt_at", "attempts")
+    list_display = ("url", "status", "depth", "priority", "seed_url", "last_attempt_at", "attempts")
     list_filter = ("status",)
     search_fields = ("url", "seed_url")
     ordering = ("-created_at",)
+    show_full_result_count = False
+
+
+@admin.register(CrawlQueueCounter)
+class CrawlQueueCounterAdmin(admin.ModelAdmin):
+    list_display = (
+        "scope",
+        "pending",
+        "in_progress",
+        "done",
+        "failed",
+        "articles_created",
+        "llm_prompt_tokens",
+        "llm_completion_tokens",
+        "last_fetched_at",
+        "reconciled_at",
+    )
+    search_fields = ("scope",)
+    ordering = ("scope",)
 
 
 @admin.register(CrawlRun)
@@ -38,10 +77,13 @@ class CrawlRunAdmin(admin.ModelAdmin):
         "ended_at",
         "pages_processed",
         "articles_created",
+        "llm_prompt_tokens",
+        "llm_completion_tokens",
         "use_llm_filtering",
+        "profile_enabled",
         "objective",
     )
-    list_filter = ("status",)
+    list_filter = ("status", "profile_enabled")
     ordering = ("-started_at",)
 
 
@@ -51,3 +93,34 @@ class CrawlLogEventAdmin(admin.ModelAdmin):
     list_filter = ("level", "step")
     search_fields = ("message", "seed_url", "url", "content")
     ordering = ("-created_at",)
+    show_full_result_count = False
+
+
+@admin.register(ContentBlob)
+class ContentBlobAdmin(admin.ModelAdmin):
+    list_display = ("digest", "backend", "raw_size", "stored_size", "refcount", "created_at")
+    list_filter = ("backend",)
+    search_fields = ("digest",)
+    exclude = ("payload",)
+    ordering = ("-created_at",)
+
+
+@admin.register(PageArchive)
+class PageArchiveAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "url", "status_code", "content_type", "html_chars", "run")
+    search_fields = ("url", "seed_url", "html_digest")
+    ordering = ("-created_at",)
+
+
+@admin.register(RobotsTxt)
+class RobotsTxtAdmin(admin.ModelAdmin):
+    list_display = ("origin", "status_code", "fetched_at", "expires_at")
+    search_fields = ("origin",)
+    ordering = ("origin",)
+
+
+@admin.register(SeenUrl)
+class SeenUrlAdmin(admin.ModelAdmin):
+    list_display = ("digest", "pruned_at")
+    search_fields = ("digest",)
+    ordering = ("-pruned_at",)
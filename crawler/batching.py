@@ -0,0 +1,175 @@
+"""Adaptive choice of how many queue items the crawler claims per step.
+
+After every step the controller is fed the step's wall time, page outcomes,
+LLM time and prompt tokens. It hill-climbs on pages per second: the size keeps
+moving in the same direction while throughput improves and turns around when
+it drops. Two limits override the climb: a high failure rate halves the size,
+and the observed prompt tokens per page cap it so one prompt fits the model's
+context window. A token-per-minute budget is enforced by pausing between steps;
+since the pause counts toward step time, the climb settles on the size that
+makes the best use of the budget.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter, deque
+from typing import Optional
+
+FAILURE_RATE_LIMIT = 0.5
+THROUGHPUT_TOLERANCE = 0.05
+SMOOTHING = 0.5
+DECISIONS_KEPT = 50
+TOKEN_WINDOW_SECONDS = 60.0
+
+
+def _ewma(previous: Optional[float], value: float) -> float:
+    return value if previous is None else previous + SMOOTHING * (value - previous)
+
+
+class BatchSizeController:
+    def __init__(
+        self,
+        *,
+        initial: int,
+        min_size: int = 1,
+        max_size: int = 0,
+        adaptive: bool = True,
+        context_tokens: int = 0,
+        output_tokens: int = 0,
+        tokens_per_minute: int = 0,
+    ) -> None:
+        self.min_size = max(1, int(min_size))
+        self.max_size = max(self.min_size, int(max_size)) if max_size else 0
+        self.adaptive = adaptive
+        self.context_tokens = max(0, int(context_tokens) - int(output_tokens))
+        self.tokens_per_minute = max(0, int(tokens_per_minute))
+        self.size = self._clamp(initial)
+        self.direction = 1
+        self.throughput: Optional[float] = None
+        self.previous_throughput: Optional[float] = None
+        self.failure_rate = 0.0
+        self.prompt_tokens_per_page: Optional[float] = None
+        self.fetch_seconds_per_page: Optional[float] = None
+        self.llm_seconds_per_step: Optional[float] = None
+        self.steps = 0
+        self.size_total = 0
+        self.paused_seconds = 0.0
+        self.reasons: Counter = Counter()
+        self.decisions: deque = deque(maxlen=DECISIONS_KEPT)
+        self._tokens: deque = deque()
+
+    def _clamp(self, size: int) -> int:
+        size = max(self.min_size, int(size))
+        return min(size, self.max_size) if self.max_size else size
+
+    def observe(
+        self,
+        *,
+        pages: int,
+        failed: int,
+        seconds: float,
+        fetch_seconds: float = 0.0,
+        llm_seconds: float = 0.0,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ) -> int:
+        """Record one finished step and return the size for the next one."""
+        self.steps += 1
+        self.size_total += self.size
+        succeeded = max(0, pages - failed)
+        if seconds > 0:
+            self.throughput = _ewma(self.throughput, succeeded / seconds)
+        if pages:
+            self.failure_rate = _ewma(self.failure_rate if self.steps > 1 else None, failed / pages)
+            self.fetch_seconds_per_page = _ewma(self.fetch_seconds_per_page, fetch_seconds / pages)
+        if prompt_tokens and succeeded:
+            self.prompt_tokens_per_page = _ewma(self.prompt_tokens_per_page, prompt_tokens / succeeded)
+        if llm_seconds:
+            self.llm_seconds_per_step = _ewma(self.llm_seconds_per_step, llm_seconds)
+        if prompt_tokens or completion_tokens:
+            self._tokens.append((time.monotonic(), prompt_tokens + completion_tokens))
+
+        size, reason = self._decide()
+        self.reasons[reason] += 1
+        self.decisions.append({
+            "step": self.steps,
+            "size": size,
+            "previous_size": self.size,
+            "reason": reason,
+            "pages_per_second": round(self.throughput, 3) if self.throughput is not None else None,
+            "failure_rate": round(self.failure_rate, 3),
+            "prompt_tokens_per_page": (
+                round(self.prompt_tokens_per_page, 1) if self.prompt_tokens_per_page is not None else None
+            ),
+            "fetch_ms_per_page": (
+                round(self.fetch_seconds_per_page * 1000, 1) if self.fetch_seconds_per_page is not None else None
+            ),
+            "llm_ms": round(self.llm_seconds_per_step * 1000, 1) if self.llm_seconds_per_step is not None else None,
+        })
+        self.size = size
+        return size
+
+    def _decide(self) -> tuple[int, str]:
+        if not self.adaptive:
+            return self.size, "fixed"
+        if self.failure_rate > FAILURE_RATE_LIMIT:
+            self.direction = -1
+            self.previous_throughput = None
+            return self._clamp(self.size // 2), "failures"
+        reason = "explore"
+        if self.previous_throughput is not None and self.throughput is not None:
+            if self.throughput < self.previous_throughput * (1 - THROUGHPUT_TOLERANCE):
+                self.direction = -self.direction
+                reason = "reverse"
+            elif self.throughput > self.previous_throughput * (1 + THROUGHPUT_TOLERANCE):
+                reason = "improving"
+            else:
+                reason = "steady"
+        self.previous_throughput = self.throughput
+        size = self._clamp(self.size + self.direction * max(1, self.size // 4))
+        if size == self.size:
+            # Pinned at a bound; probe the other way next time.
+            self.direction = -self.direction
+        if self.context_tokens and self.prompt_tokens_per_page:
+            fits = int(self.context_tokens // self.prompt_tokens_per_page)
+            if size > fits:
+                size, reason = self._clamp(fits), "context"
+        return size, reason
+
+    def pause_seconds(self) -> float:
+        """Seconds to wait so the tokens of the last minute stay within budget."""
+        if not self.tokens_per_minute:
+            return 0.0
+        now = time.monotonic()
+        while self._tokens and now - self._tokens[0][0] >= TOKEN_WINDOW_SECONDS:
+            self._tokens.popleft()
+        used = sum(tokens for _, tokens in self._tokens)
+        if used < self.tokens_per_minute:
+            return 0.0
+        # Wait until enough of the window has aged out to fall below the budget.
+        for stamp, tokens in self._tokens:
+            used -= tokens
+            if used < self.tokens_per_minute:
+                return max(0.0, TOKEN_WINDOW_SECONDS - (now - stamp))
+        return TOKEN_WINDOW_SECONDS
+
+    def wait(self) -> float:
+        pause = self.pause_seconds()
+        if pause:
+            time.sleep(pause)
+            self.paused_seconds += pause
+        return pause
+
+    def summary(self) -> dict:
+        return {
+            "adaptive": self.adaptive,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "final_size": self.size,
+            "mean_size": round(self.size_total / self.steps, 2) if self.steps else None,
+            "tokens_per_minute": self.tokens_per_minute,
+            "paused_seconds": round(self.paused_seconds, 3),
+            "reasons": dict(self.reasons),
+            "decisions": list(self.decisions),
+        }
@@ -0,0 +1,253 @@
+"""End-to-end crawler benchmark against a local synthetic news site and stub LLM.
+
+Both servers run on loopback threads inside the benchmark process; the crawl
+itself runs ``CrawlerService.run`` unchanged, so the numbers cover the real
+fetch, parse, LLM round trip, store and enqueue paths.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import resource
+import sys
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.db import connection
+
+from crawler.llm import StubLLMClient
+from crawler.metrics import percentile
+from crawler.models import CrawlerConfig, CrawlRun, CrawlSeed
+from crawler.services import CrawlerService
+from crawler.timing import STAGE_SECONDS
+
+WORDS = (
+    "market government election council report energy climate court health school city police "
+    "company budget minister border water transport union trade storm vaccine science research "
+    "farmers festival museum bank inflation housing rail airport port coast river mayor league"
+).split()
+
+
+@dataclass
+class BenchmarkOptions:
+    pages: int = 200
+    seeds: int = 4
+    fanout: int = 8
+    page_kb: int = 20
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    llm_latency_ms: float = 0.0
+    use_llm: bool = True
+    random_seed: int = 7
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        return
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            # The crawler closes error responses without reading the body.
+            pass
+
+
+class FakeNewsSite:
+    """Serves ``/story/<n>`` pages that link to ``fanout`` other stories."""
+
+    def __init__(self, options: BenchmarkOptions):
+        self.options = options
+        site = self
+
+        class Handler(_QuietHandler):
+            def do_GET(self):
+                site.handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, number: int) -> str:
+        return f"{self.base_url}/story/{number}"
+
+    def start(self) -> "FakeNewsSite":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        if self.options.latency_ms:
+            time.sleep(self.options.latency_ms / 1000)
+        path = request.path.rstrip("/")
+        if not path.startswith("/story/") or not path[7:].isdigit():
+            request._send(404, b"not found", "text/plain")
+            return
+        number = int(path[7:]) % max(1, self.options.pages)
+        if zlib.crc32(path.encode()) % 10000 < self.options.error_rate * 10000:
+            request._send(500, b"injected error", "text/plain")
+            return
+        request._send(200, self.render(number).encode("utf-8"), "text/html; charset=utf-8")
+
+    def render(self, number: int) -> str:
+        rng = random.Random(self.options.random_seed * 1_000_003 + number)
+        title = " ".join(rng.choice(WORDS) for _ in range(8)).capitalize()
+        paragraphs = []
+        size = 0
+        while size < self.options.page_kb * 1024:
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 24))).capitalize() + "."
+            paragraphs.append(f"<p>{sentence}</p>")
+            size += len(sentence) + 7
+        links = "".join(
+            f'<li><a href="/story/{rng.randrange(self.options.pages)}">Related story</a></li>'
+            for _ in range(self.options.fanout)
+        )
+        return (
+            f"<!doctype html><html><head><title>{title}</title></head><body>"
+            f"<nav><ul>{links}</ul></nav><article><h1>{title}</h1>"
+            f'<time datetime="2024-01-{number % 28 + 1:02d}T08:00:00Z"></time>'
+            f"{''.join(paragraphs)}</article></body></html>"
+        )
+
+
+class StubLLMServer:
+    """OpenAI-compatible ``/chat/completions`` endpoint backed by ``StubLLMClient``."""
+
+    def __init__(self, config: CrawlerConfig, latency_ms: float = 0.0):
+        self.client = StubLLMClient(config)
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(_QuietHandler):
+            def do_POST(self):
+                server.handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubLLMServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        length = int(request.headers.get("Content-Length") or 0)
+        payload = json.loads(request.rfile.read(length) or b"{}")
+        prompt = payload.get("messages", [{}])[-1].get("content", "")
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        with self.lock:
+            self.client.extract(prompt)
+            content = self.client.last_output_text
+        body = {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4},
+        }
+        request._send(200, json.dumps(body).encode("utf-8"), "application/json")
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def stage_percentiles(snapshot: dict) -> dict[str, dict]:
+    buckets = snapshot["buckets"]
+    merged: dict[str, list[int]] = {}
+    for name, labels, counts, _, _ in snapshot["histograms"]:
+        if name != STAGE_SECONDS:
+            continue
+        stage = dict(labels).get("stage", "")
+        current = merged.setdefault(stage, [0] * len(counts))
+        for index, count in enumerate(counts):
+            current[index] += count
+    out = {}
+    for stage, counts in sorted(merged.items()):
+        p50 = percentile(counts, buckets, 0.5)
+        p95 = percentile(counts, buckets, 0.95)
+        out[stage] = {
+            "count": sum(counts),
+            "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
+        }
+    return out
+
+
+def run_benchmark(options: BenchmarkOptions) -> dict:
+    """Crawl the synthetic site once and report throughput. Expects an empty database."""
+    site = FakeNewsSite(options).start()
+    seeds = max(1, min(options.seeds, options.pages))
+    config = CrawlerConfig.objects.create(
+        llm_enabled=options.use_llm,
+        llm_provider="openai",
+        llm_model="bench-stub",
+        llm_api_key="bench",
+        max_pages_per_run=max(1, -(-options.pages // seeds)),
+        max_depth=0,
+        request_delay_seconds=0,
+        discovery_enabled=False,
+    )
+    llm_server = StubLLMServer(config, options.llm_latency_ms).start()
+    config.llm_base_url = llm_server.base_url
+    config.save(update_fields=["llm_base_url"])
+    for number in range(seeds):
+        CrawlSeed.objects.create(url=site.url(number * max(1, options.pages // seeds)), config=config)
+    # Created as done so the post_save hook does not start a background crawl.
+    run = CrawlRun.objects.create(status=CrawlRun.STATUS_DONE, use_llm_filtering=options.use_llm)
+    service = CrawlerService(config)
+    service.timer.registry = None
+    try:
+        started = time.perf_counter()
+        service.run(run)
+        elapsed = time.perf_counter() - started
+    finally:
+        llm_server.stop()
+        site.stop()
+    run.refresh_from_db()
+    pages = run.pages_processed
+    queries = run.metrics.get("db", {}).get("queries", 0)
+    return {
+        "options": asdict(options),
+        "database": connection.vendor,
+        "status": run.status,
+        "last_error": run.last_error,
+        "pages": pages,
+        "articles": run.articles_created,
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_per_second": round(pages / elapsed, 2) if elapsed > 0 else None,
+        "articles_per_second": round(run.articles_created / elapsed, 2) if elapsed > 0 else None,
+        "queries": queries,
+        "queries_per_page": round(queries / pages, 2) if pages else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "llm": run.metrics.get("llm", {}),
+        "stages": stage_percentiles(service.timer.run_metrics.snapshot()),
+    }
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from crawler.models import ContentBlob
+
+
+def blob_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    def __init__(self, backend: Optional[str] = None, root: Optional[str] = None):
+        backend = (backend or getattr(settings, "CRAWLER_BLOB_BACKEND", ContentBlob.BACKEND_DB)).lower()
+        self.backend = backend if backend in {ContentBlob.BACKEND_DB, ContentBlob.BACKEND_FS} else ""
+        self.root = Path(root or getattr(settings, "CRAWLER_BLOB_ROOT", "blobs"))
+        self.min_chars = int(getattr(settings, "CRAWLER_BLOB_MIN_CHARS", 4096))
+        self.level = int(getattr(settings, "CRAWLER_BLOB_COMPRESS_LEVEL", 6))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.backend)
+
+    def should_offload(self, text: str) -> bool:
+        return self.enabled and bool(text) and len(text) >= self.min_chars
+
+    def put(self, text: str) -> str:
+        return self.put_many([text])[0]
+
+    def put_many(self, texts: Iterable[str]) -> list[str]:
+        texts = list(texts)
+        digests = [blob_digest(text) for text in texts]
+        if not texts:
+            return digests
+        counts = Counter(digests)
+        payloads = dict(zip(digests, texts))
+        existing = set(
+            ContentBlob.objects.filter(digest__in=list(counts)).values_list("digest", flat=True)
+        )
+        new_blobs = [self._build(digest, text) for digest, text in payloads.items() if digest not in existing]
+        with transaction.atomic():
+            if new_blobs:
+                ContentBlob.objects.bulk_create(new_blobs, ignore_conflicts=True)
+            for digest, count in counts.items():
+                updated = ContentBlob.objects.filter(digest=digest).update(refcount=F("refcount") + count)
+                if not updated:
+                    # Collected between the lookup and the increment.
+                    blob = self._build(digest, payloads[digest])
+                    blob.refcount = count
+                    blob.save(force_insert=True)
+        return digests
+
+    def _build(self, digest: str, text: str) -> ContentBlob:
+        raw = text.encode("utf-8")
+        compressed = zlib.compress(raw, self.level)
+        blob = ContentBlob(
+            digest=digest,
+            backend=self.backend,
+            codec=ContentBlob.CODEC_ZLIB,
+            raw_size=len(raw),
+            stored_size=len(compressed),
+            refcount=0,
+        )
+        if self.backend == ContentBlob.BACKEND_FS:
+            self._write_file(digest, compressed)
+        else:
+            blob.payload = compressed
+        return blob
+
+    def get(self, digest: str) -> Optional[str]:
+        return self.get_many([digest]).get(digest)
+
+    def get_many(self, digests: Iterable[str]) -> dict[str, str]:
+        wanted = {digest for digest in digests if digest}
+        if not wanted:
+            return {}
+        out: dict[str, str] = {}
+        for blob in ContentBlob.objects.filter(digest__in=wanted):
+            if blob.backend == ContentBlob.BACKEND_FS:
+                compressed = self._read_file(blob.digest)
+            else:
+                compressed = bytes(blob.payload or b"")
+            if compressed is None:
+                continue
+            out[blob.digest] = zlib.decompress(compressed).decode("utf-8")
+        return out
+
+    def release(self, digests: Iterable[str]) -> None:
+        counts = Counter(digest for digest in digests if digest)
+        for digest, count in counts.items():
+            ContentBlob.objects.filter(digest=digest).update(refcount=F("refcount") - count)
+
+    def collect_garbage(self, limit: int = 1000) -> int:
+        removed = 0
+        while True:
+            batch = list(
+                ContentBlob.objects.filter(refcount__lte=0).values_list("digest", "backend")[:limit]
+            )
+            if not batch:
+                return removed
+            digests = [digest for digest, _ in batch]
+            deleted = ContentBlob.objects.filter(digest__in=digests, refcount__lte=0).delete()[0]
+            if not deleted:
+                return removed
+            kept = set(ContentBlob.objects.filter(digest__in=digests).values_list("digest", flat=True))
+            for digest, backend in batch:
+                if backend == ContentBlob.BACKEND_FS and digest not in kept:
+                    self._path(digest).unlink(missing_ok=True)
+            removed += deleted
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / f"{digest}.zz"
+
+    def _write_file(self, digest: str, compressed: bytes) -> None:
+        path = self._path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(compressed)
+            os.replace(tmp_name, path)
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def _read_file(self, digest: str) -> Optional[bytes]:
+        try:
+            return self._path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
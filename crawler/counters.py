@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, QuerySet, Sum
+from django.utils import timezone
+
+from crawler.models import CrawlQueueCounter, CrawlQueueCounterDelta, CrawlQueueItem
+
+QUEUE_STATUSES = [
+    CrawlQueueItem.STATUS_PENDING,
+    CrawlQueueItem.STATUS_IN_PROGRESS,
+    CrawlQueueItem.STATUS_DONE,
+    CrawlQueueItem.STATUS_FAILED,
+]
+LLM_TOKEN_FIELDS = ["llm_prompt_tokens", "llm_completion_tokens"]
+COUNTER_FIELDS = QUEUE_STATUSES + ["articles_created"] + LLM_TOKEN_FIELDS
+SCOPE_ALL = CrawlQueueCounter.SCOPE_ALL
+COUNTER_LOCK_ID = 0x4E4E5143
+FOLD_LOCK_ID = 0x4E4E5146
+
+
+def adjust_counters(deltas: dict[str, dict[str, int]], fetched_at: Optional[datetime] = None) -> None:
+    """Record per-seed counter deltas; the queue totals are their sum.
+
+    ``deltas`` maps a seed URL to ``{field: delta}``; an empty seed URL only
+    counts towards the totals. Each call appends ``CrawlQueueCounterDelta``
+    rows rather than updating the shared counter rows, so concurrent claimers
+    never wait on each other; reads add the unfolded deltas to the base rows.
+    Call inside the transaction that changed the items so the deltas commit or
+    roll back with them.
+    """
+    rows = []
+    for scope in sorted(deltas):
+        fields = {name: delta for name, delta in deltas[scope].items() if delta}
+        if not fields and fetched_at is None:
+            continue
+        rows.append(CrawlQueueCounterDelta(scope=scope, last_fetched_at=fetched_at, **fields))
+    if not rows:
+        return
+    # Shared with every other writer; only reconcile takes it exclusively.
+    _advisory_lock(COUNTER_LOCK_ID, shared=True)
+    CrawlQueueCounterDelta.objects.bulk_create(rows)
+
+
+def _advisory_lock(lock_id: int, shared: bool = False, wait: bool = True) -> bool:
+    # SQLite serializes writers on its own.
+    if connection.vendor != "postgresql":
+        return True
+    function = "pg_advisory_xact_lock" if wait else "pg_try_advisory_xact_lock"
+    if shared:
+        function += "_shared"
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {function}(%s)", [lock_id])
+        row = cursor.fetchone()
+    return wait or bool(row and row[0])
+
+
+def record_transitions(
+    seed_urls: Iterable[str],
+    from_status: Optional[str],
+    to_status: str,
+    fetched: bool = False,
+) -> None:
+    deltas: dict[str, Counter] = defaultdict(Counter)
+    for seed_url in seed_urls:
+        if from_status:
+            deltas[seed_url or SCOPE_ALL][from_status] -= 1
+        deltas[seed_url or SCOPE_ALL][to_status] += 1
+    if deltas:
+        adjust_counters(deltas, fetched_at=timezone.now() if fetched else None)
+
+
+def record_articles(articles_by_seed: dict[str, int]) -> None:
+    deltas = {seed_url or SCOPE_ALL: {"articles_created": count} for seed_url, count in articles_by_seed.items() if count}
+    if deltas:
+        adjust_counters(deltas)
+
+
+def record_llm_tokens(tokens_by_seed: dict[str, tuple[int, int]]) -> None:
+    deltas = {
+        seed_url or SCOPE_ALL: {"llm_prompt_tokens": prompt, "llm_completion_tokens": completion}
+        for seed_url, (prompt, completion) in tokens_by_seed.items()
+        if prompt or completion
+    }
+    if deltas:
+        adjust_counters(deltas)
+
+
+def _row_counts(row: Optional[dict]) -> dict:
+    row = row or {}
+    return {name: max(0, int(row.get(name) or 0)) for name in QUEUE_STATUSES}
+
+
+def queue_counts() -> dict:
+    row = CrawlQueueCounter.objects.filter(scope=SCOPE_ALL).values(*QUEUE_STATUSES).first()
+    if row is None:
+        reconcile_counters()
+        row = CrawlQueueCounter.objects.filter(scope=SCOPE_ALL).values(*QUEUE_STATUSES).first()
+    pending = CrawlQueueCounterDelta.objects.aggregate(**{name: Sum(name) for name in QUEUE_STATUSES})
+    return _row_counts({name: (row or {}).get(name, 0) + (pending[name] or 0) for name in QUEUE_STATUSES})
+
+
+def seed_delta_totals() -> QuerySet:
+    """Unfolded deltas summed per seed; added to the base rows on read."""
+    return (
+        CrawlQueueCounterDelta.objects.exclude(scope=SCOPE_ALL)
+        .values("scope")
+        .annotate(last_fetched=Max("last_fetched_at"), **{name: Sum(name) for name in COUNTER_FIELDS})
+        .order_by()
+    )
+
+
+def seed_counts() -> list[dict]:
+    rows = {
+        row["scope"]: row
+        for row in CrawlQueueCounter.objects.exclude(scope=SCOPE_ALL).values(
+            "scope", "last_fetched_at", *COUNTER_FIELDS
+        )
+    }
+    for delta in seed_delta_totals():
+        row = rows.setdefault(
+            delta["scope"], {"scope": delta["scope"], "last_fetched_at": None, **dict.fromkeys(COUNTER_FIELDS, 0)}
+        )
+        for name in COUNTER_FIELDS:
+            row[name] += delta[name] or 0
+        if delta["last_fetched"] and (row["last_fetched_at"] is None or delta["last_fetched"] > row["last_fetched_at"]):
+            row["last_fetched_at"] = delta["last_fetched"]
+    return [
+        {
+            "seed_url": row["scope"],
+            **_row_counts(row),
+            "articles_created": row["articles_created"],
+            "llm_prompt_tokens": row["llm_prompt_tokens"],
+            "llm_completion_tokens": row["llm_completion_tokens"],
+            "last_fetched_at": row["last_fetched_at"],
+        }
+        for _, row in sorted(rows.items())
+    ]
+
+
+def fold_counter_deltas(batch_size: Optional[int] = None) -> int:
+    """Move committed delta rows into the counter rows; returns how many were folded.
+
+    Only one folder runs at a time; a second caller returns 0 instead of waiting.
+    """
+    batch_size = batch_size or max(1, int(getattr(settings, "CRAWLER_COUNTER_FOLD_BATCH", 5000)))
+    with transaction.atomic():
+        if not _advisory_lock(FOLD_LOCK_ID, wait=False):
+            return 0
+        return _fold_batch(batch_size)
+
+
+def _fold_batch(batch_size: Optional[int]) -> int:
+    rows = CrawlQueueCounterDelta.objects.order_by("id").values("id", "scope", "last_fetched_at", *COUNTER_FIELDS)
+    if batch_size is not None:
+        rows = rows[:batch_size]
+    rows = list(rows)
+    if not rows:
+        return 0
+    totals: dict[str, Counter] = defaultdict(Counter)
+    fetched: dict[str, datetime] = {}
+    for row in rows:
+        scopes = {SCOPE_ALL, row["scope"]}
+        for scope in scopes:
+            totals[scope].update({name: row[name] for name in COUNTER_FIELDS if row[name]})
+            if row["last_fetched_at"] and (scope not in fetched or row["last_fetched_at"] > fetched[scope]):
+                fetched[scope] = row["last_fetched_at"]
+    CrawlQueueCounter.objects.bulk_create(
+        [CrawlQueueCounter(scope=scope) for scope in sorted(totals)], ignore_conflicts=True
+    )
+    for scope in sorted(totals):
+        changes = {name: F(name) + delta for name, delta in totals[scope].items() if delta}
+        if scope in fetched:
+            changes["last_fetched_at"] = fetched[scope]
+        if changes:
+            CrawlQueueCounter.objects.filter(scope=scope).update(**changes)
+    CrawlQueueCounterDelta.objects.filter(id__in=[row["id"] for row in rows]).delete()
+    return len(rows)
+
+
+def reconcile_counters() -> dict:
+    """Recount the queue with one grouped scan and overwrite the status counters.
+
+    Pending deltas are folded first. ``articles_created``, the LLM token totals
+    and ``last_fetched_at`` have no source of truth in the queue table and are
+    left as they are.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # The exclusive counter lock waits for in-flight transitions to commit and
+        # holds new ones off, so no delta lands between the scan and the overwrite.
+        _advisory_lock(FOLD_LOCK_ID)
+        _advisory_lock(COUNTER_LOCK_ID)
+        _fold_batch(None)
+        CrawlQueueCounter.objects.bulk_create([CrawlQueueCounter(scope=SCOPE_ALL)], ignore_conflicts=True)
+        existing = set(CrawlQueueCounter.objects.select_for_update().order_by("scope").values_list("scope", flat=True))
+        counts: dict[str, Counter] = defaultdict(Counter)
+        rows = CrawlQueueItem.objects.values_list("seed_url", "status").annotate(total=Count("id")).order_by()
+        for seed_url, status, total in rows:
+            counts[SCOPE_ALL][status] += total
+            if seed_url:
+                counts[seed_url][status] += total
+        counts.setdefault(SCOPE_ALL, Counter())
+        missing = [CrawlQueueCounter(scope=scope) for scope in sorted(counts) if scope not in existing]
+        CrawlQueueCounter.objects.bulk_create(missing, ignore_conflicts=True)
+        for scope in sorted(counts):
+            by_status = counts[scope]
+            CrawlQueueCounter.objects.filter(scope=scope).update(
+                reconciled_at=now, **{status: by_status.get(status, 0) for status in QUEUE_STATUSES}
+            )
+        CrawlQueueCounter.objects.exclude(scope__in=list(counts)).update(
+            reconciled_at=now, **{status: 0 for status in QUEUE_STATUSES}
+        )
+    return {status: counts[SCOPE_ALL].get(status, 0) for status in QUEUE_STATUSES}
+
+
+def reconcile_if_stale() -> bool:
+    interval = float(getattr(settings, "CRAWLER_COUNTER_RECONCILE_SECONDS", 3600))
+    if interval <= 0:
+        return False
+    reconciled_at = CrawlQueueCounter.objects.filter(scope=SCOPE_ALL).values_list("reconciled_at", flat=True).first()
+    if reconciled_at and timezone.now() - reconciled_at < timedelta(seconds=interval):
+        return False
+    reconcile_counters()
+    return True
@@ -0,0 +1,411 @@
+"""Find article URLs in sitemaps and RSS/Atom feeds instead of listing pages.
+
+For each seed, ``robots.txt`` (``Sitemap:`` lines, read through the shared
+robots cache) and the seed page
+(``<link rel="alternate">`` feeds) are searched for sources every few days;
+``/sitemap.xml`` is tried when robots.txt lists none. Each source is then
+re-read at most once per ``discovery_interval_minutes`` with a conditional GET,
+so an unchanged sitemap or feed costs a 304 and no parsing.
+
+Responses are streamed into an incremental XML parser that drops each entry
+once read, so a 50 MB sitemap is never held in memory. A sitemap index only
+leads to the child sitemaps whose ``<lastmod>`` changed since the last read and
+is recent enough to hold fresh URLs, newest first. Found URLs go into the
+frontier in bulk at depth 1 with their modification time as priority, so the
+crawler claims fresh articles before pages found by following links.
+"""
+
+from __future__ import annotations
+
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import httpx
+from bs4 import BeautifulSoup
+from dateutil import parser as dtparser
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from crawler.counters import record_transitions
+from crawler.fetching import stream_page
+from crawler.models import CrawlerConfig, CrawlQueueItem, CrawlSeed, DiscoverySource
+from crawler.retention import seen_urls
+from crawler.robots import RobotsCache, origin_of
+
+SOURCE_PROBE_DAYS = 7
+FEED_TYPES = {"application/rss+xml", "application/atom+xml", "application/feed+xml", "application/xml", "text/xml"}
+RECORD_TAGS = {"url", "item", "entry", "sitemap"}
+URL_TAGS = {"loc", "link"}
+# Publication dates win over modification dates when an entry has both.
+DATE_TAGS = ["publication_date", "pubDate", "published", "date", "lastmod", "updated"]
+GONE_STATUSES = {404, 410}
+INSERT_CHUNK_SIZE = 500
+
+
+@dataclass
+class DiscoveredUrl:
+    url: str
+    modified: Optional[datetime] = None
+
+
+@dataclass
+class SourceResult:
+    source: DiscoverySource
+    status: int = 0
+    not_modified: bool = False
+    truncated: bool = False
+    bytes_read: int = 0
+    urls: list[DiscoveredUrl] = field(default_factory=list)
+    sitemaps: list[DiscoveredUrl] = field(default_factory=list)
+    error: str = ""
+    seconds: float = 0.0
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = dtparser.parse(value.strip())
+    except (ValueError, OverflowError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def freshness_priority(modified: Optional[datetime]) -> int:
+    """Queue priority for a discovered URL: minutes since the epoch, or 1 if undated."""
+    if modified is None:
+        return 1
+    return max(1, int(modified.timestamp() // 60))
+
+
+class FeedParser:
+    """Incremental parser for sitemaps, sitemap indexes, RSS and Atom.
+
+    Bytes are fed as they arrive; each ``<url>``, ``<item>``, ``<entry>`` or
+    ``<sitemap>`` element is turned into a ``DiscoveredUrl`` and detached from
+    the tree as soon as it closes.
+    """
+
+    def __init__(self) -> None:
+        self.parser = XMLPullParser(events=("start", "end"))
+        self.kind = ""
+        self.urls: list[DiscoveredUrl] = []
+        self.sitemaps: list[DiscoveredUrl] = []
+        self._stack: list = []
+        self._record_depth = 0
+        self._url = ""
+        self._dates: dict[str, str] = {}
+
+    def feed(self, data: bytes) -> None:
+        self.parser.feed(data)
+        self._drain()
+
+    def close(self) -> None:
+        self.parser.close()
+        self._drain()
+
+    def _drain(self) -> None:
+        for event, elem in self.parser.read_events():
+            tag = _local(elem.tag)
+            if event == "start":
+                if not self._stack:
+                    self.kind = {
+                        "urlset": DiscoverySource.KIND_SITEMAP,
+                        "sitemapindex": DiscoverySource.KIND_SITEMAP_INDEX,
+                    }.get(tag, DiscoverySource.KIND_FEED if tag in {"rss", "RDF", "feed"} else "")
+                self._stack.append(elem)
+                if tag in RECORD_TAGS and not self._record_depth:
+                    self._record_depth = len(self._stack)
+                    self._url, self._dates = "", {}
+                continue
+            self._stack.pop()
+            if not self._record_depth:
+                continue
+            depth = len(self._stack)
+            if depth == self._record_depth and tag in URL_TAGS and not self._url:
+                if tag == "link" and elem.get("href"):
+                    if elem.get("rel", "alternate") == "alternate":
+                        self._url = elem.get("href", "").strip()
+                else:
+                    self._url = (elem.text or "").strip()
+            elif tag in DATE_TAGS and tag not in self._dates:
+                self._dates[tag] = elem.text or ""
+            elif depth == self._record_depth - 1:
+                self._end_record(tag)
+                if self._stack:
+                    self._stack[-1].remove(elem)
+
+    def _end_record(self, tag: str) -> None:
+        self._record_depth = 0
+        if not self._url:
+            return
+        modified = next(
+            (parsed for name in DATE_TAGS if (parsed := parse_date(self._dates.get(name)))),
+            None,
+        )
+        entry = DiscoveredUrl(self._url, modified)
+        (self.sitemaps if tag == "sitemap" else self.urls).append(entry)
+
+
+def page_feeds(html: str, base_url: str) -> list[str]:
+    soup = BeautifulSoup(html or "", "html.parser")
+    urls = []
+    for link in soup.find_all("link", href=True):
+        rel = {value.lower() for value in (link.get("rel") or [])}
+        if "alternate" in rel and (link.get("type") or "").split(";")[0].strip().lower() in FEED_TYPES:
+            urls.append(urljoin(base_url, link["href"].strip()))
+    return urls
+
+
+class Discoverer:
+    def __init__(
+        self,
+        client: httpx.Client,
+        config: CrawlerConfig,
+        robots: RobotsCache,
+        *,
+        url_filter: Optional[Callable[[str], bool]] = None,
+        max_bytes: Optional[int] = None,
+        max_sitemaps: Optional[int] = None,
+    ) -> None:
+        self.client = client
+        self.config = config
+        self.robots = robots
+        self.url_filter = url_filter
+        self.max_bytes = int(
+            max_bytes if max_bytes is not None else getattr(settings, "CRAWLER_DISCOVERY_MAX_BYTES", 50 * 1024 * 1024)
+        )
+        self.max_sitemaps = int(
+            max_sitemaps if max_sitemaps is not None else getattr(settings, "CRAWLER_DISCOVERY_MAX_SITEMAPS", 20)
+        )
+
+    def discover(self, seed: CrawlSeed, now: Optional[datetime] = None) -> tuple[list[SourceResult], int]:
+        """Read the seed's due sources and queue fresh URLs; returns the reads and the count queued."""
+        now = now or datetime.now(timezone.utc)
+        if seed.sources_checked_at is None or seed.sources_checked_at < now - timedelta(days=SOURCE_PROBE_DAYS):
+            self.probe(seed, now)
+        interval = timedelta(minutes=int(self.config.discovery_interval_minutes))
+        due = [
+            source
+            for source in seed.discovery_sources.filter(is_active=True, parent__isnull=True).order_by("id")
+            if source.last_checked_at is None or source.last_checked_at <= now - interval
+        ]
+        results: list[SourceResult] = []
+        budget = self.max_sitemaps
+        for source in due:
+            result = self.read(source, now)
+            results.append(result)
+            if result.sitemaps:
+                children = self._due_children(source, result.sitemaps, now)
+                for child in children[:max(0, budget)]:
+                    results.append(self.read(child, now))
+                budget -= len(children)
+        queued = self.enqueue(seed, results, now)
+        return results, queued
+
+    def probe(self, seed: CrawlSeed, now: datetime) -> None:
+        found = [(url, DiscoverySource.KIND_SITEMAP) for url in self.robots.rules(seed.url).sitemaps]
+        if not found:
+            found.append((f"{origin_of(seed.url)}/sitemap.xml", DiscoverySource.KIND_SITEMAP))
+        try:
+            page = stream_page(self.client, seed.url, max_bytes=int(self.config.max_page_bytes))
+            if page.status_code < 400:
+                found.extend((url, DiscoverySource.KIND_FEED) for url in page_feeds(page.text, page.url or seed.url))
+        except (httpx.HTTPError, RuntimeError):
+            pass
+        DiscoverySource.objects.bulk_create(
+            [DiscoverySource(seed=seed, url=url, kind=kind) for url, kind in found if len(url) <= 1000],
+            ignore_conflicts=True,
+        )
+        seed.sources_checked_at = now
+        seed.save(update_fields=["sources_checked_at"])
+
+    def read(self, source: DiscoverySource, now: datetime) -> SourceResult:
+        result = SourceResult(source=source)
+        headers = {}
+        if source.etag:
+            headers["If-None-Match"] = source.etag
+        if source.last_modified:
+            headers["If-Modified-Since"] = source.last_modified
+        started = time.perf_counter()
+        parser = FeedParser()
+        try:
+            with self.client.stream("GET", source.url, headers=headers) as resp:
+                result.status = resp.status_code
+                if resp.status_code == 304:
+                    result.not_modified = True
+                elif resp.status_code >= 400:
+                    result.error = f"http_{resp.status_code}"
+                else:
+                    self._parse(resp, parser, result)
+                    source.etag = resp.headers.get("etag", "")[:255]
+                    source.last_modified = resp.headers.get("last-modified", "")[:64]
+        except (httpx.HTTPError, zlib.error) as exc:
+            result.error = str(exc) or type(exc).__name__
+        except ParseError as exc:
+            result.error = f"parse_error: {exc}"
+        result.urls, result.sitemaps = parser.urls, parser.sitemaps
+        if parser.kind:
+            source.kind = parser.kind
+        result.seconds = time.perf_counter() - started
+
+        source.last_checked_at = now
+        source.last_status = result.status
+        source.last_error = result.error[:2000]
+        if not result.not_modified and not result.error:
+            source.urls_found = len(result.urls) + len(result.sitemaps)
+        if result.status in GONE_STATUSES:
+            source.is_active = False
+        fields = [
+            "kind",
+            "is_active",
+            "etag",
+            "last_modified",
+            "last_checked_at",
+            "last_status",
+            "last_error",
+            "urls_found",
+            "updated_at",
+        ]
+        if not result.error:
+            # A failed read leaves the listed <lastmod> stale so the index retries it.
+            fields.append("listed_modified_at")
+        source.save(update_fields=fields)
+        return result
+
+    def _parse(self, resp: httpx.Response, parser: FeedParser, result: SourceResult) -> None:
+        # Sitemaps are often served as .xml.gz files rather than with a
+        # Content-Encoding, which httpx would already have undone.
+        inflater = None
+        for chunk in resp.iter_bytes():
+            if inflater is None:
+                inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == b"\x1f\x8b" else False
+            if inflater:
+                chunk = inflater.decompress(chunk, max(1, self.max_bytes - result.bytes_read))
+            room = self.max_bytes - result.bytes_read
+            if len(chunk) > room or (inflater and inflater.unconsumed_tail):
+                parser.feed(chunk[:room])
+                result.bytes_read += min(len(chunk), room)
+                result.truncated = True
+                return
+            parser.feed(chunk)
+            result.bytes_read += len(chunk)
+        parser.close()
+
+    def _due_children(
+        self,
+        index: DiscoverySource,
+        listed: list[DiscoveredUrl],
+        now: datetime,
+    ) -> list[DiscoverySource]:
+        listed = [entry for entry in listed if len(entry.url) <= 1000]
+        DiscoverySource.objects.bulk_create(
+            [DiscoverySource(seed=index.seed, parent=index, url=entry.url) for entry in listed],
+            ignore_conflicts=True,
+        )
+        children = {
+            child.url: child
+            for child in DiscoverySource.objects.filter(seed=index.seed, url__in=[entry.url for entry in listed])
+        }
+        cutoff = self._cutoff(now)
+        interval = timedelta(minutes=int(self.config.discovery_interval_minutes))
+        oldest = datetime.min.replace(tzinfo=timezone.utc)
+        due = []
+        for entry in sorted(listed, key=lambda entry: entry.modified or oldest, reverse=True):
+            child = children.get(entry.url)
+            if child is None or not child.is_active:
+                continue
+            if entry.modified is not None:
+                if cutoff is not None and entry.modified < cutoff:
+                    continue
+                if child.last_checked_at is not None and child.listed_modified_at == entry.modified:
+                    continue
+            elif child.last_checked_at is not None and child.last_checked_at > now - interval:
+                continue
+            child.listed_modified_at = entry.modified
+            due.append(child)
+        return due
+
+    def _cutoff(self, now: datetime) -> Optional[datetime]:
+        days = int(self.config.discovery_max_age_days)
+        return now - timedelta(days=days) if days else None
+
+    def _accept(self, seed_host: str, url: str) -> bool:
+        parsed = urlparse(url)
+        if parsed.scheme not in {"http", "https"} or len(url) > 1000:
+            return False
+        if not self.config.allow_external_domains and parsed.netloc != seed_host:
+            return False
+        return self.url_filter is None or self.url_filter(url)
+
+    def enqueue(self, seed: CrawlSeed, results: Iterable[SourceResult], now: datetime) -> int:
+        cutoff = self._cutoff(now)
+        seed_host = urlparse(seed.url).netloc
+        newest: dict[str, DiscoveredUrl] = {}
+        origin: dict[str, DiscoverySource] = {}
+        for result in results:
+            for entry in result.urls:
+                url = urljoin(result.source.url, entry.url)
+                if cutoff is not None and entry.modified is not None and entry.modified < cutoff:
+                    continue
+                if not self._accept(seed_host, url):
+                    continue
+                known = newest.get(url)
+                if known is None or (entry.modified and (known.modified is None or entry.modified > known.modified)):
+                    newest[url] = DiscoveredUrl(url, entry.modified)
+                    origin[url] = result.source
+        ranked = sorted(newest.values(), key=lambda entry: freshness_priority(entry.modified), reverse=True)
+        limit = int(self.config.discovery_max_urls)
+        if limit:
+            ranked = ranked[:limit]
+        queued = 0
+        per_source: dict[int, int] = {}
+        for offset in range(0, len(ranked), INSERT_CHUNK_SIZE):
+            chunk = ranked[offset:offset + INSERT_CHUNK_SIZE]
+            urls = [entry.url for entry in chunk]
+            skip = seen_urls(urls) | set(
+                CrawlQueueItem.objects.filter(url__in=urls).values_list("url", flat=True)
+            )
+            rows = [
+                CrawlQueueItem(
+                    url=entry.url,
+                    seed=seed,
+                    seed_url=seed.url,
+                    depth=1,
+                    priority=freshness_priority(entry.modified),
+                )
+                for entry in chunk
+                if entry.url not in skip
+            ]
+            if not rows:
+                continue
+            with transaction.atomic():
+                inserted_from = datetime.now(timezone.utc)
+                CrawlQueueItem.objects.bulk_create(rows, ignore_conflicts=True)
+                # Rows a concurrent enqueue got in first were skipped; count only ours.
+                inserted = list(
+                    CrawlQueueItem.objects.filter(
+                        url__in=[row.url for row in rows], seed=seed, discovered_at__gte=inserted_from
+                    ).values_list("url", flat=True)
+                )
+                if inserted:
+                    record_transitions([seed.url] * len(inserted), None, CrawlQueueItem.STATUS_PENDING)
+            queued += len(inserted)
+            for url in inserted:
+                source = origin[url]
+                per_source[source.pk] = per_source.get(source.pk, 0) + 1
+        for source_id, count in per_source.items():
+            DiscoverySource.objects.filter(pk=source_id).update(urls_queued=F("urls_queued") + count)
+        return queued
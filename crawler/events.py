@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import Iterator, Optional, Union
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.streaming import Pause
+from crawler.models import CrawlLogEvent
+from crawler.serializers import project_log_events
+from crawler.services import crawler_live_status
+
+EVENT_LOG = "log"
+EVENT_STATUS = "status"
+LOG_BATCH_SIZE = 200
+
+
+def format_event(event: str, data: object, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_last_event_id(raw: Optional[str]) -> Optional[int]:
+    try:
+        value = int(str(raw).strip())
+    except (TypeError, ValueError):
+        return None
+    return value if value >= 0 else None
+
+
+def latest_log_id() -> int:
+    return CrawlLogEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def log_events_after(after_id: int, run_id: Optional[int] = None, limit: int = LOG_BATCH_SIZE) -> list[dict]:
+    qs = CrawlLogEvent.objects.filter(id__gt=after_id)
+    if run_id is not None:
+        qs = qs.filter(run_id=run_id)
+    return list(project_log_events(qs.order_by("id"))[:limit])
+
+
+def crawler_event_frames(last_id: Optional[int], run_id: Optional[int] = None) -> Iterator[Union[str, Pause]]:
+    """Yield server-sent events for new log rows and status changes.
+
+    Log events carry their row id as the event id, so a reconnecting client that
+    sends ``Last-Event-ID`` resumes exactly after the last row it saw. Status
+    events are only sent when the snapshot changes. Serve it through
+    ``core.streaming.streaming_body``, which turns the pauses into sleeps.
+    """
+    poll = max(0.1, float(getattr(settings, "CRAWLER_EVENTS_POLL_SECONDS", 0.5)))
+    status_every = max(poll, float(getattr(settings, "CRAWLER_EVENTS_STATUS_SECONDS", 2.0)))
+    heartbeat = max(poll, float(getattr(settings, "CRAWLER_EVENTS_HEARTBEAT_SECONDS", 15.0)))
+    max_seconds = float(getattr(settings, "CRAWLER_EVENTS_MAX_SECONDS", 300.0))
+
+    if last_id is None:
+        last_id = latest_log_id()
+    yield f"retry: {int(poll * 2000)}\n\n"
+
+    started = time.monotonic()
+    last_status: Optional[str] = None
+    next_status = 0.0
+    last_sent = started
+    while max_seconds <= 0 or time.monotonic() - started < max_seconds:
+        now = time.monotonic()
+        rows = log_events_after(last_id, run_id)
+        for row in rows:
+            last_id = row["id"]
+            yield format_event(EVENT_LOG, row, last_id)
+        if rows or now >= next_status:
+            snapshot = crawler_live_status()
+            encoded = json.dumps(snapshot, cls=DjangoJSONEncoder, sort_keys=True)
+            if encoded != last_status:
+                last_status = encoded
+                yield format_event(EVENT_STATUS, snapshot, last_id)
+                last_sent = now
+            next_status = now + status_every
+        if rows:
+            last_sent = now
+            if len(rows) >= LOG_BATCH_SIZE:
+                continue
+        elif now - last_sent >= heartbeat:
+            yield ": keep-alive\n\n"
+            last_sent = now
+        yield Pause(poll)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import csv
+import json
+import zlib
+from datetime import datetime
+from io import StringIO
+from typing import Iterable, Iterator, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, QuerySet
+
+from articles.models import Article
+
+EXPORT_FIELDS = ["published_at", "fetched_at", "source", "url", "title", "body", "language", "id", "updated_at"]
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_CHUNK_ROWS = 500
+
+
+def export_queryset(
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    sources: Optional[list[str]] = None,
+    updated_after: Optional[datetime] = None,
+) -> tuple[QuerySet, Optional[datetime]]:
+    qs = Article.objects.all()
+    if since:
+        qs = qs.filter(published_at__gte=since)
+    if until:
+        qs = qs.filter(published_at__lte=until)
+    if sources:
+        qs = qs.filter(source__in=sources)
+    if updated_after is None:
+        return qs.order_by("-published_at", "-id"), None
+    # Incremental pulls are capped at the newest updated_at seen when the export
+    # starts, which becomes the cursor for the next pull.
+    qs = qs.filter(updated_at__gt=updated_after)
+    high_water = qs.aggregate(value=Max("updated_at"))["value"]
+    if high_water is None:
+        return qs.none(), updated_after
+    return qs.filter(updated_at__lte=high_water).order_by("updated_at", "id"), high_water
+
+
+def iter_rows(qs: QuerySet, chunk_size: int = 2000) -> Iterator[tuple]:
+    return qs.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    buf = StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            pending = 0
+    yield buf.getvalue()
+
+
+def iter_ndjson(rows: Iterable[tuple]) -> Iterator[str]:
+    lines: list[str] = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder, ensure_ascii=False))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_gzip(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
@@ -0,0 +1,117 @@
+"""Streaming page fetches with a size cap and incremental decoding.
+
+The status line and ``Content-Type`` are checked before any of the body is
+read: error responses are returned without a body, and so are non-HTML
+responses, flagged ``unsupported``. The body is read in chunks up to
+``max_bytes`` and cut there. Its charset comes from a byte order mark, the
+``Content-Type`` header, or a ``<meta>`` declaration in the first
+``SNIFF_BYTES``, in that order, falling back to UTF-8. Bytes are decoded as they arrive, so the raw body is never held
+alongside the text.
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+HTML_TYPES = {"text/html", "application/xhtml+xml"}
+SNIFF_BYTES = 1024
+DEFAULT_ENCODING = "utf-8"
+BOMS = [(codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")]
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE)
+HEADER_CHARSET = re.compile(r"""charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE)
+
+
+@dataclass
+class FetchedPage:
+    status_code: int
+    content_type: str
+    text: str
+    size: int = 0
+    truncated: bool = False
+    encoding: str = ""
+    # Final URL after redirects; relative links on the page resolve against it.
+    url: str = ""
+    # Not HTML; the body was not read.
+    unsupported: bool = False
+
+
+def _known(encoding: Optional[str]) -> Optional[str]:
+    if not encoding:
+        return None
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return None
+    # As in browsers, pages labelled Latin-1 or ASCII are decoded as windows-1252.
+    return "cp1252" if name in {"iso8859-1", "ascii"} else name
+
+
+def sniff_encoding(content_type: str, head: bytes) -> str:
+    for bom, name in BOMS:
+        if head.startswith(bom):
+            return name
+    match = HEADER_CHARSET.search(content_type or "")
+    encoding = _known(match.group(1)) if match else None
+    if encoding:
+        return encoding
+    match = META_CHARSET.search(head[:SNIFF_BYTES])
+    encoding = _known(match.group(1).decode("ascii")) if match else None
+    return encoding or DEFAULT_ENCODING
+
+
+def is_html(content_type: str) -> bool:
+    mime = (content_type or "").split(";", 1)[0].strip().lower()
+    # A missing type is sniffed like HTML rather than rejected.
+    return not mime or mime in HTML_TYPES
+
+
+def stream_page(client: httpx.Client, url: str, max_bytes: int = 0) -> FetchedPage:
+    with client.stream("GET", url) as resp:
+        content_type = resp.headers.get("content-type", "")
+        if resp.status_code >= 400:
+            return FetchedPage(status_code=resp.status_code, content_type=content_type, text="", url=str(resp.url))
+        if not is_html(content_type):
+            return FetchedPage(
+                status_code=resp.status_code, content_type=content_type, text="", url=str(resp.url), unsupported=True
+            )
+        head = bytearray()
+        decoder = None
+        encoding = ""
+        parts: list[str] = []
+        size = 0
+        truncated = False
+        for chunk in resp.iter_bytes():
+            if max_bytes and size + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - size]
+                truncated = True
+            size += len(chunk)
+            if decoder is None:
+                head.extend(chunk)
+                if len(head) < SNIFF_BYTES and not truncated:
+                    continue
+                encoding = sniff_encoding(content_type, bytes(head))
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                parts.append(decoder.decode(bytes(head)))
+            else:
+                parts.append(decoder.decode(chunk))
+            if truncated:
+                break
+        if decoder is None:
+            encoding = sniff_encoding(content_type, bytes(head))
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            parts.append(decoder.decode(bytes(head)))
+        parts.append(decoder.decode(b"", final=True))
+    return FetchedPage(
+        status_code=resp.status_code,
+        content_type=content_type,
+        text="".join(parts),
+        size=size,
+        truncated=truncated,
+        encoding=encoding,
+        url=str(resp.url),
+    )
@@ -0,0 +1,437 @@
+"""Load generator and operation benchmark for a crawl frontier with millions of rows.
+
+``generate_frontier`` bulk-inserts seeds, queue items and log events shaped like
+a long-running deployment: a few seeds own most of the queue, most items are
+finished, and discovery chains run many levels deep. ``run_frontier_benchmark``
+then drives the crawler's own claim, complete and enqueue paths plus the status
+and log listing reads from concurrent workers and records their latencies and
+query plans.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from itertools import accumulate
+from typing import Callable, Iterator, Optional
+
+from django.db import connection, connections, transaction
+from django.db.models import Count, QuerySet
+from django.utils import timezone
+
+from crawler.counters import SCOPE_ALL, queue_counts, reconcile_counters, seed_delta_totals
+from crawler.models import (
+    CrawlerConfig,
+    CrawlLogEvent,
+    CrawlQueueCounter,
+    CrawlQueueCounterDelta,
+    CrawlQueueItem,
+    CrawlRun,
+    CrawlSeed,
+    SeenUrl,
+)
+from crawler.retention import url_digest
+from crawler.serializers import project_log_events
+from crawler.services import CrawlerService, crawler_live_status, get_config
+from crawler.views import CrawlLogPagination
+
+DEFAULT_STATUS_MIX = {
+    CrawlQueueItem.STATUS_DONE: 0.85,
+    CrawlQueueItem.STATUS_FAILED: 0.05,
+    CrawlQueueItem.STATUS_PENDING: 0.09,
+    CrawlQueueItem.STATUS_IN_PROGRESS: 0.01,
+}
+LOG_STEP_MIX = {
+    CrawlLogEvent.STEP_FETCH_RESPONSE: 0.3,
+    CrawlLogEvent.STEP_CLEANED_TEXT: 0.3,
+    CrawlLogEvent.STEP_LLM_PROMPT: 0.1,
+    CrawlLogEvent.STEP_LLM_OUTPUT: 0.1,
+    CrawlLogEvent.STEP_NEXT_STEP: 0.15,
+    CrawlLogEvent.STEP_ERROR: 0.05,
+}
+LOGS_PER_RUN = 2000
+OPERATIONS = [
+    "claim_seed",
+    "claim_any",
+    "complete",
+    "enqueue",
+    "ensure_seed_queue",
+    "status",
+    "status_seeds",
+    "logs_feed",
+    "logs_run_step",
+    "logs_deep_page",
+]
+
+
+@dataclass
+class FrontierOptions:
+    seeds: int = 200
+    items: int = 200_000
+    logs: int = 100_000
+    max_depth: int = 12
+    seed_skew: float = 1.1
+    status_mix: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_STATUS_MIX))
+    days: int = 90
+    chunk_size: int = 5000
+    workers: int = 4
+    iterations: int = 200
+    analyze: bool = False
+    random_seed: int = 7
+
+
+@contextmanager
+def explicit_timestamps(model) -> Iterator[None]:
+    """Let bulk inserts set ``auto_now``/``auto_now_add`` columns to backdated values."""
+    fields = [
+        model_field
+        for model_field in model._meta.concrete_fields
+        if getattr(model_field, "auto_now", False) or getattr(model_field, "auto_now_add", False)
+    ]
+    saved = [(model_field, model_field.auto_now, model_field.auto_now_add) for model_field in fields]
+    for model_field in fields:
+        model_field.auto_now = model_field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for model_field, auto_now, auto_now_add in saved:
+            model_field.auto_now = auto_now
+            model_field.auto_now_add = auto_now_add
+
+
+def _seed_url(index: int) -> str:
+    return f"https://site-{index}.bench.example/"
+
+
+def generate_frontier(options: FrontierOptions) -> dict:
+    """Bulk-insert a synthetic frontier; returns the generated counts and timing."""
+    rng = random.Random(options.random_seed)
+    started = time.perf_counter()
+    now = timezone.now()
+    span = timedelta(days=max(1, options.days)).total_seconds()
+    seeds = CrawlSeed.objects.bulk_create(
+        [CrawlSeed(url=_seed_url(index)) for index in range(options.seeds)],
+        batch_size=options.chunk_size,
+    )
+    # Zipf-like weights: the first seeds own most of the queue.
+    seed_weights = list(accumulate(1 / (rank + 1) ** options.seed_skew for rank in range(len(seeds))))
+    statuses = list(options.status_mix)
+    status_weights = list(accumulate(options.status_mix[name] for name in statuses))
+    attempts_for = {
+        CrawlQueueItem.STATUS_PENDING: 0,
+        CrawlQueueItem.STATUS_IN_PROGRESS: 1,
+        CrawlQueueItem.STATUS_DONE: 1,
+        CrawlQueueItem.STATUS_FAILED: 3,
+    }
+    recent_depths = {seed.id: deque([0], maxlen=64) for seed in seeds}
+    generated = 0
+    with explicit_timestamps(CrawlQueueItem):
+        while generated < options.items:
+            size = min(options.chunk_size, options.items - generated)
+            rows = []
+            picked_seeds = rng.choices(seeds, cum_weights=seed_weights, k=size)
+            picked_statuses = rng.choices(statuses, cum_weights=status_weights, k=size)
+            for offset, (seed, status) in enumerate(zip(picked_seeds, picked_statuses)):
+                index = generated + offset
+                # Items are discovered in index order across the window, each
+                # one level below a recently discovered item of the same seed.
+                if index < len(seeds):
+                    seed, depth, url = seeds[index], 0, seeds[index].url
+                else:
+                    depths = recent_depths[seed.id]
+                    depth = min(options.max_depth, rng.choice(depths) + 1) if rng.random() < 0.9 else 1
+                    url = f"{seed.url}story/{index}"
+                recent_depths[seed.id].append(depth)
+                discovered = now - timedelta(seconds=span * (1 - index / max(1, options.items)))
+                attempted = discovered + timedelta(minutes=rng.randint(1, 600)) if attempts_for[status] else None
+                rows.append(
+                    CrawlQueueItem(
+                        url=url,
+                        seed=seed,
+                        seed_url=seed.url,
+                        depth=depth,
+                        status=status,
+                        discovered_at=discovered,
+                        last_attempt_at=attempted,
+                        attempts=attempts_for[status],
+                        last_error="HTTP 500" if status == CrawlQueueItem.STATUS_FAILED else "",
+                        created_at=discovered,
+                        updated_at=attempted or discovered,
+                    )
+                )
+            CrawlQueueItem.objects.bulk_create(rows, batch_size=options.chunk_size)
+            generated += size
+    logs = _generate_logs(options, rng, now, span)
+    reconcile_counters()
+    _analyze_tables()
+    return {
+        "seeds": len(seeds),
+        "items": generated,
+        "logs": logs,
+        "queue": queue_counts(),
+        "generate_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _generate_logs(options: FrontierOptions, rng: random.Random, now, span: float) -> int:
+    if options.logs <= 0:
+        return 0
+    run_count = max(1, options.logs // LOGS_PER_RUN)
+    with explicit_timestamps(CrawlRun):
+        runs = CrawlRun.objects.bulk_create(
+            [
+                CrawlRun(
+                    status=CrawlRun.STATUS_DONE,
+                    started_at=now - timedelta(seconds=span * (1 - index / run_count)),
+                    created_at=now - timedelta(seconds=span * (1 - index / run_count)),
+                    updated_at=now,
+                )
+                for index in range(run_count)
+            ]
+        )
+    run_ids = [run.pk for run in runs]
+    steps = list(LOG_STEP_MIX)
+    step_weights = list(accumulate(LOG_STEP_MIX[name] for name in steps))
+    generated = 0
+    with explicit_timestamps(CrawlLogEvent):
+        while generated < options.logs:
+            size = min(options.chunk_size, options.logs - generated)
+            rows = []
+            for offset, step in enumerate(rng.choices(steps, cum_weights=step_weights, k=size)):
+                index = generated + offset
+                created = now - timedelta(seconds=span * (1 - index / options.logs))
+                seed_url = _seed_url(rng.randrange(max(1, options.seeds)))
+                rows.append(
+                    CrawlLogEvent(
+                        run_id=run_ids[min(len(run_ids) - 1, index // LOGS_PER_RUN)],
+                        seed_url=seed_url,
+                        url=f"{seed_url}story/{index}",
+                        step=step,
+                        level=CrawlLogEvent.LEVEL_ERROR if step == CrawlLogEvent.STEP_ERROR else CrawlLogEvent.LEVEL_INFO,
+                        message=step.replace("_", " ").capitalize(),
+                        content="lorem ipsum " * 20,
+                        created_at=created,
+                        updated_at=created,
+                    )
+                )
+            CrawlLogEvent.objects.bulk_create(rows, batch_size=options.chunk_size)
+            generated += size
+    return generated
+
+
+def _analyze_tables() -> None:
+    # Refresh planner statistics so the EXPLAIN output reflects the new rows.
+    with connection.cursor() as cursor:
+        for model in (CrawlQueueItem, CrawlLogEvent, CrawlQueueCounter, CrawlQueueCounterDelta, SeenUrl):
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+
+def _quantile(samples: list[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _summarize(samples: list[float], errors: list[str], elapsed: float) -> dict:
+    ordered = sorted(samples)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "calls": len(ordered),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else "",
+        "ops_per_second": round(len(ordered) / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": ms(_quantile(ordered, 0.5)),
+        "p95_ms": ms(_quantile(ordered, 0.95)),
+        "p99_ms": ms(_quantile(ordered, 0.99)),
+        "max_ms": ms(ordered[-1] if ordered else None),
+    }
+
+
+class FrontierWorkload:
+    """Operations timed by the benchmark, each a single call into crawler code."""
+
+    def __init__(self, config: CrawlerConfig, random_seed: int):
+        self.config = config
+        self.seeds = list(CrawlSeed.objects.filter(is_active=True).order_by("id"))
+        self.seed_weights = list(accumulate(1 / (rank + 1) for rank in range(len(self.seeds))))
+        self.claimed: list[CrawlQueueItem] = []
+        self.lock = threading.Lock()
+        self.random_seed = random_seed
+        self.local = threading.local()
+        newest = CrawlLogEvent.objects.order_by("-created_at", "-id").values_list("created_at", "id")
+        total = CrawlLogEvent.objects.count()
+        self.deep_position = list(newest[total // 2]) if total else None
+        self.run_id = CrawlLogEvent.objects.order_by("-created_at").values_list("run_id", flat=True).first()
+
+    @property
+    def service(self) -> CrawlerService:
+        service = getattr(self.local, "service", None)
+        if service is None:
+            service = self.local.service = CrawlerService(self.config)
+            service.timer.registry = None
+        return service
+
+    @property
+    def rng(self) -> random.Random:
+        rng = getattr(self.local, "rng", None)
+        if rng is None:
+            rng = self.local.rng = random.Random(f"{self.random_seed}-{threading.get_ident()}")
+        return rng
+
+    def close_thread(self) -> None:
+        service = getattr(self.local, "service", None)
+        if service is not None:
+            service.close()
+            self.local.service = None
+        connections.close_all()
+
+    def pick_seed(self) -> CrawlSeed:
+        return self.rng.choices(self.seeds, cum_weights=self.seed_weights, k=1)[0]
+
+    def claim_seed(self) -> None:
+        item = self.service._claim_next_pending_for_seed(self.pick_seed())
+        if item:
+            with self.lock:
+                self.claimed.append(item)
+
+    def claim_any(self) -> None:
+        items = self.service._claim_next_pending_any(1, [])
+        with self.lock:
+            self.claimed.extend(items)
+
+    def complete(self) -> None:
+        with self.lock:
+            item = self.claimed.pop() if self.claimed else None
+        if item:
+            self.service._mark_done([item], {item.seed_url: 1})
+
+    def enqueue(self) -> None:
+        seed = self.pick_seed()
+        url = f"{seed.url}bench/{uuid.uuid4().hex}"
+        self.service._enqueue_next_urls_by_seed([(seed.url, url)], {seed.url: seed}, {seed.url: 1})
+
+    def ensure_seed_queue(self) -> None:
+        self.service._ensure_seed_queue()
+
+    def status(self) -> None:
+        crawler_live_status()
+
+    def status_seeds(self) -> None:
+        crawler_live_status(include_seeds=True)
+
+    def logs_feed(self) -> None:
+        list(self._log_page(CrawlLogEvent.objects.all()))
+
+    def logs_run_step(self) -> None:
+        qs = CrawlLogEvent.objects.filter(run_id=self.run_id, step=CrawlLogEvent.STEP_FETCH_RESPONSE)
+        list(self._log_page(qs))
+
+    def logs_deep_page(self) -> None:
+        list(self._log_page(CrawlLogEvent.objects.all(), self.deep_position))
+
+    def _log_page(self, qs, position: Optional[list] = None):
+        paginator = CrawlLogPagination()
+        qs = project_log_events(qs).order_by(*paginator.ordering)
+        if position is not None:
+            qs = qs.filter(paginator.keyset_filter(position))
+        return qs[: paginator.page_size + 1]
+
+    def querysets(self) -> dict:
+        """The statements behind each operation, for EXPLAIN."""
+        service = CrawlerService(self.config)
+        service.close()
+        heaviest = self.seeds[0] if self.seeds else CrawlSeed(url=_seed_url(0))
+        sample_url = CrawlQueueItem.objects.values_list("url", flat=True).last() or ""
+        return {
+            "claim_seed": service._pending_for_seed_queryset(heaviest)[:1],
+            "claim_any": service._pending_any_queryset()[:1],
+            "ensure_seed_queue": CrawlQueueItem.objects.filter(status=CrawlQueueItem.STATUS_PENDING).query.exists(),
+            "enqueue_lookup": CrawlQueueItem.objects.filter(url=sample_url)[:21],
+            "enqueue_seen_urls": SeenUrl.objects.filter(digest__in=[url_digest(sample_url)]).values_list("digest"),
+            "status": CrawlQueueCounter.objects.filter(scope=SCOPE_ALL).values(
+                "pending", "in_progress", "done", "failed"
+            )[:1],
+            "status_seeds": CrawlQueueCounter.objects.exclude(scope=SCOPE_ALL),
+            "status_seed_deltas": seed_delta_totals(),
+            "reconcile_scan": CrawlQueueItem.objects.values_list("seed_url", "status").annotate(total=Count("id")).order_by(),
+            "logs_feed": self._log_page(CrawlLogEvent.objects.all()),
+            "logs_run_step": self._log_page(
+                CrawlLogEvent.objects.filter(run_id=self.run_id, step=CrawlLogEvent.STEP_FETCH_RESPONSE)
+            ),
+            "logs_deep_page": self._log_page(CrawlLogEvent.objects.all(), self.deep_position),
+        }
+
+
+def explain_plans(workload: FrontierWorkload, analyze: bool = False) -> dict[str, str]:
+    options = {"analyze": True, "buffers": True} if analyze and connection.vendor == "postgresql" else {}
+    plans = {}
+    for name, query in workload.querysets().items():
+        # ``select_for_update`` needs a transaction; ANALYZE actually runs the
+        # statement, so roll it back.
+        try:
+            with transaction.atomic():
+                if isinstance(query, QuerySet):
+                    plans[name] = query.explain(**options)
+                else:
+                    plans[name] = query.explain(connection.alias, **options)
+                transaction.set_rollback(True)
+        except Exception as exc:
+            plans[name] = f"explain failed: {exc}"
+    return plans
+
+
+def _run_operation(workload: FrontierWorkload, operation: Callable[[], None], workers: int, iterations: int) -> dict:
+    samples: list[float] = []
+    errors: list[str] = []
+    lock = threading.Lock()
+    calls_per_worker = [iterations // workers + (1 if index < iterations % workers else 0) for index in range(workers)]
+
+    def worker(calls: int) -> None:
+        local_samples = []
+        local_errors: list[str] = []
+        try:
+            for _ in range(calls):
+                started = time.perf_counter()
+                try:
+                    operation()
+                except Exception as exc:
+                    local_errors.append(f"{type(exc).__name__}: {exc}"[:200])
+                    continue
+                local_samples.append(time.perf_counter() - started)
+        finally:
+            workload.close_thread()
+            with lock:
+                samples.extend(local_samples)
+                errors.extend(local_errors)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, calls_per_worker))
+    return _summarize(samples, errors, time.perf_counter() - started)
+
+
+def run_frontier_benchmark(options: FrontierOptions, generate: bool = True) -> dict:
+    report: dict = {"options": asdict(options), "database": connection.vendor}
+    if generate:
+        report["frontier"] = generate_frontier(options)
+    workload = FrontierWorkload(get_config(), options.random_seed)
+    report["plans"] = explain_plans(workload, options.analyze)
+    started = time.perf_counter()
+    reconcile_counters()
+    report["reconcile_seconds"] = round(time.perf_counter() - started, 3)
+    workers = max(1, options.workers)
+    report["operations"] = {
+        name: _run_operation(workload, getattr(workload, name), workers, max(1, options.iterations))
+        for name in OPERATIONS
+    }
+    return report
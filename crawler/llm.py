@@ -9,6 +9,15 @@ from django.conf import settings
 
 from crawler.models import CrawlerConfig
 
+# Rough English average for BPE tokenizers; used when a provider reports no usage.
+CHARS_PER_TOKEN = 4
+USAGE_PROVIDER = "provider"
+USAGE_ESTIMATE = "estimate"
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
 
 @dataclass(frozen=True)
 class LLMResult:
@@ -28,6 +37,8 @@ class LLMClient:
         self.last_status_code: Optional[int] = None
         self.last_provider = self._provider
         self.last_model = self._config.llm_model
+        self.last_usage: Dict[str, int] = {}
+        self.last_usage_source = ""
 
     def _reset_trace(self) -> None:
         self.last_output_text = ""
@@ -35,6 +46,8 @@ class LLMClient:
         self.last_status_code = None
         self.last_provider = self._provider
         self.last_model = self._config.llm_model
+        self.last_usage = {}
+        self.last_usage_source = ""
 
     @staticmethod
     def _default_base_url(provider: str) -> str:
@@ -62,12 +75,28 @@ class LLMClient:
             self.last_error = "llm_disabled"
             return None
         if self._provider == "huggingface":
-            return self._extract_huggingface(prompt)
-        if self._provider == "apifreellm":
-            return self._extract_apifreellm(prompt)
-        if self._provider in {"google", "gemini", "google_ai", "ai_studio"}:
-            return self._extract_google(prompt)
-        return self._extract_openai(prompt)
+            result = self._extract_huggingface(prompt)
+        elif self._provider == "apifreellm":
+            result = self._extract_apifreellm(prompt)
+        elif self._provider in {"google", "gemini", "google_ai", "ai_studio"}:
+            result = self._extract_google(prompt)
+        else:
+            result = self._extract_openai(prompt)
+        self._fill_usage(prompt)
+        return result
+
+    def _fill_usage(self, prompt: str) -> None:
+        # Only answered calls are billed; fill in what the provider did not report.
+        if self.last_status_code is None or self.last_status_code >= 400:
+            return
+        source = USAGE_PROVIDER
+        if "prompt" not in self.last_usage:
+            self.last_usage["prompt"] = estimate_tokens(prompt)
+            source = USAGE_ESTIMATE
+        if "completion" not in self.last_usage:
+            self.last_usage["completion"] = estimate_tokens(self.last_output_text)
+            source = USAGE_ESTIMATE
+        self.last_usage_source = source
 
     def _extract_openai(self, prompt: str) -> Optional[LLMResult]:
         payload = {
@@ -102,6 +131,7 @@ class LLMClient:
                 self.last_error = f"http_{resp.status_code}"
                 return None
             data = resp.json()
+            self.last_usage = self._usage_from(data.get("usage"), "prompt_tokens", "completion_tokens")
             content = data["choices"][0]["message"]["content"]
             self.last_output_text = content or ""
             result = self._parse_response(content)
@@ -209,6 +239,10 @@ class LLMClient:
                 self.last_error = f"http_{resp.status_code}"
                 return None
             data = resp.json()
+            if isinstance(data, dict):
+                self.last_usage = self._usage_from(
+                    data.get("usageMetadata"), "promptTokenCount", "candidatesTokenCount"
+                )
             content = self._extract_google_text(data)
             if not content:
                 self.last_error = "empty_response"
@@ -222,6 +256,17 @@ class LLMClient:
             self.last_error = "request_failed"
             return None
 
+    @staticmethod
+    def _usage_from(block: Any, prompt_key: str, completion_key: str) -> Dict[str, int]:
+        if not isinstance(block, dict):
+            return {}
+        usage = {}
+        for name, key in (("prompt", prompt_key), ("completion", completion_key)):
+            value = block.get(key)
+            if isinstance(value, int) and value >= 0:
+                usage[name] = value
+        return usage
+
     def _build_hf_prompt(self, prompt: str) -> str:
         return "Return ONLY valid JSON.\n" + prompt
 
@@ -303,3 +348,56 @@ class LLMClient:
             next_urls_by_seed=next_urls_by_seed,
             articles=articles,
         )
+
+
+class StubLLMClient(LLMClient):
+    def __init__(self, config: CrawlerConfig):
+        super().__init__(config)
+        self._provider = "stub"
+        self.last_provider = "stub"
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    def _reset_trace(self) -> None:
+        super()._reset_trace()
+        self.last_provider = "stub"
+
+    def extract(self, prompt: str) -> Optional[LLMResult]:
+        self._reset_trace()
+        context, _, candidates = prompt.partition("Candidate URLs by seed:")
+        articles: List[Dict[str, Any]] = []
+        for block in context.split("\n\n---\n\n"):
+            url = ""
+            lines = []
+            for line in block.splitlines():
+                if line.startswith("URL: ") and not url:
+                    url = line[5:].strip()
+                elif url:
+                    lines.append(line)
+            text = " ".join(lines).strip()
+            if not url or not text:
+                continue
+            title = text.split(". ")[0][:200]
+            articles.append(
+                {
+                    "url": url,
+                    "title": title,
+                    "body": text[: self._config.max_article_chars],
+                }
+            )
+        next_urls_by_seed = []
+        seed_url = ""
+        for line in candidates.splitlines():
+            if line.startswith("Seed: "):
+                seed_url = line[6:].strip()
+            elif line.startswith("- http") and seed_url:
+                next_urls_by_seed.append({"seed_url": seed_url, "next_url": line[2:].strip()})
+                seed_url = ""
+        self.last_status_code = 200
+        self.last_output_text = json.dumps(
+            {"next_urls_by_seed": next_urls_by_seed, "articles": articles[: self._config.max_articles]}
+        )
+        self._fill_usage(prompt)
+        return self._parse_response(self.last_output_text)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+import zlib
+from typing import Optional
+
+from django.conf import settings
+
+from crawler.blobs import BlobStore
+from crawler.models import CrawlLogEvent
+
+logger = logging.getLogger(__name__)
+
+VERBOSITY_FULL = "full"
+VERBOSITY_SAMPLED = "sampled"
+VERBOSITY_SUMMARY = "summary"
+VERBOSITY_OFF = "off"
+VERBOSITY_CHOICES = {VERBOSITY_FULL, VERBOSITY_SAMPLED, VERBOSITY_SUMMARY, VERBOSITY_OFF}
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_CHOICES = {OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST}
+
+# Offloaded events keep this much content inline so listings can show an
+# excerpt without reading the blob (see crawler.serializers.LOG_EXCERPT_CHARS).
+OFFLOAD_EXCERPT_CHARS = 200
+
+
+def parse_verbosity(raw: object) -> dict[str, str]:
+    if isinstance(raw, dict):
+        items = raw.items()
+    else:
+        items = []
+        for part in str(raw or "").split(","):
+            step, _, level = part.partition("=")
+            items.append((step, level))
+    levels: dict[str, str] = {}
+    for step, level in items:
+        step = str(step).strip()
+        level = str(level).strip().lower()
+        if step and level in VERBOSITY_CHOICES:
+            levels[step] = level
+    return levels
+
+
+class CrawlLogSink:
+    def __init__(
+        self,
+        *,
+        flush_events: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+        max_buffer: Optional[int] = None,
+        overflow: Optional[str] = None,
+        verbosity: Optional[dict[str, str]] = None,
+        sample_rate: Optional[float] = None,
+        blob_store: Optional[BlobStore] = None,
+    ):
+        self.flush_events = max(1, int(
+            flush_events if flush_events is not None else getattr(settings, "CRAWLER_LOG_FLUSH_EVENTS", 50)
+        ))
+        self.flush_seconds = float(
+            flush_seconds if flush_seconds is not None else getattr(settings, "CRAWLER_LOG_FLUSH_SECONDS", 5.0)
+        )
+        self.max_buffer = max(self.flush_events, int(
+            max_buffer if max_buffer is not None else getattr(settings, "CRAWLER_LOG_BUFFER_MAX", 1000)
+        ))
+        overflow = (overflow or getattr(settings, "CRAWLER_LOG_OVERFLOW", OVERFLOW_BLOCK)).lower()
+        self.overflow = overflow if overflow in OVERFLOW_CHOICES else OVERFLOW_BLOCK
+        self.verbosity = (
+            verbosity if verbosity is not None
+            else parse_verbosity(getattr(settings, "CRAWLER_LOG_VERBOSITY", ""))
+        )
+        self.sample_rate = min(1.0, max(0.0, float(
+            sample_rate if sample_rate is not None else getattr(settings, "CRAWLER_LOG_SAMPLE_RATE", 0.1)
+        )))
+        self.blob_store = blob_store or BlobStore()
+        self._buffer: list[CrawlLogEvent] = []
+        self._withheld: dict[int, str] = {}
+        self._last_flush = time.monotonic()
+        self.written = 0
+        self.dropped = 0
+
+    def level_for(self, step: str) -> str:
+        return self.verbosity.get(step, VERBOSITY_FULL)
+
+    def is_sampled(self, url: str = "") -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        if self.sample_rate <= 0.0:
+            return False
+        if url:
+            return (zlib.crc32(url.encode("utf-8")) % 10000) < self.sample_rate * 10000
+        return random.random() < self.sample_rate
+
+    def add(self, event: CrawlLogEvent) -> None:
+        is_failure = event.level != CrawlLogEvent.LEVEL_INFO
+        level = VERBOSITY_FULL if is_failure else self.level_for(event.step)
+        if level == VERBOSITY_OFF:
+            return
+        withheld = ""
+        if event.content and level != VERBOSITY_FULL:
+            if level == VERBOSITY_SUMMARY or not self.is_sampled(event.url):
+                withheld = event.content
+                event.metadata = dict(event.metadata or {})
+                event.metadata.update({"content_omitted": True, "omitted_chars": len(withheld)})
+                event.content = ""
+                if level == VERBOSITY_SUMMARY:
+                    withheld = ""
+
+        if len(self._buffer) >= self.max_buffer:
+            if self.overflow == OVERFLOW_DROP_NEWEST:
+                self.dropped += 1
+                return
+            if self.overflow == OVERFLOW_DROP_OLDEST:
+                oldest = self._buffer.pop(0)
+                self._withheld.pop(id(oldest), None)
+                self.dropped += 1
+            else:
+                self.flush(raise_errors=True)
+
+        self._buffer.append(event)
+        if withheld:
+            self._withheld[id(event)] = withheld
+        if is_failure:
+            self._restore_withheld(event)
+        if len(self._buffer) >= self.flush_events or self._flush_due():
+            self.flush()
+
+    def flush(self, raise_errors: bool = False) -> int:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return 0
+        pending = self._buffer
+        try:
+            self._offload(pending)
+            CrawlLogEvent.objects.bulk_create(pending)
+        except Exception:
+            if raise_errors:
+                raise
+            logger.exception("Failed to flush %s crawl log events", len(pending))
+            return 0
+        self._buffer = []
+        self._withheld = {}
+        self.written += len(pending)
+        return len(pending)
+
+    def close(self) -> None:
+        self.flush()
+        if self.dropped:
+            logger.warning("Crawl log sink dropped %s events on buffer overflow", self.dropped)
+
+    def _offload(self, events: list[CrawlLogEvent]) -> None:
+        large = [event for event in events if self.blob_store.should_offload(event.content)]
+        if not large:
+            return
+        digests = self.blob_store.put_many([event.content for event in large])
+        for event, digest in zip(large, digests):
+            event.metadata = dict(event.metadata or {})
+            event.metadata["content_chars"] = len(event.content)
+            event.content_digest = digest
+            event.content = event.content[:OFFLOAD_EXCERPT_CHARS]
+
+    def _flush_due(self) -> bool:
+        return self.flush_seconds <= 0 or (time.monotonic() - self._last_flush) >= self.flush_seconds
+
+    def _restore_withheld(self, failure: CrawlLogEvent) -> None:
+        # Sampled-out content is kept in memory until flush, so a later failure
+        # on the same page (or a run-level failure) can still persist it.
+        if not self._withheld:
+            return
+        for event in self._buffer:
+            content = self._withheld.get(id(event))
+            if content is None:
+                continue
+            if failure.queue_item_id is not None and event.queue_item_id != failure.queue_item_id:
+                continue
+            event.content = content
+            event.metadata.pop("content_omitted", None)
+            event.metadata.pop("omitted_chars", None)
+            del self._withheld[id(event)]
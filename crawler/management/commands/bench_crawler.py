@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from crawler.benchmark import BenchmarkOptions, run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Crawl a local synthetic news site with a stub LLM and report throughput as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=200, help="Distinct pages on the synthetic site.")
+        parser.add_argument("--seeds", type=int, default=4, help="Seed URLs (also the batch size per step).")
+        parser.add_argument("--fanout", type=int, default=8, help="Links from each page to other pages.")
+        parser.add_argument("--page-kb", type=int, default=20, help="Approximate article text per page in KiB.")
+        parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every page response.")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of pages answering HTTP 500.")
+        parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Delay added to every LLM response.")
+        parser.add_argument("--no-llm", action="store_true", help="Use the heuristic extraction path.")
+        parser.add_argument("--random-seed", type=int, default=7, help="Seed for the generated page content.")
+        parser.add_argument(
+            "--keep-db",
+            action="store_true",
+            help="Run against the configured database instead of a throwaway test database.",
+        )
+        parser.add_argument("--output", default="", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        bench = BenchmarkOptions(
+            pages=max(1, options["pages"]),
+            seeds=max(1, options["seeds"]),
+            fanout=max(0, options["fanout"]),
+            page_kb=max(1, options["page_kb"]),
+            latency_ms=max(0.0, options["latency_ms"]),
+            error_rate=min(1.0, max(0.0, options["error_rate"])),
+            llm_latency_ms=max(0.0, options["llm_latency_ms"]),
+            use_llm=not options["no_llm"],
+            random_seed=options["random_seed"],
+        )
+        old_name = None
+        if not options["keep_db"]:
+            old_name = connection.settings_dict["NAME"]
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = run_benchmark(bench)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(text + "\n")
+        self.stdout.write(text)
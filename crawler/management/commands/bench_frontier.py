@@ -0,0 +1,82 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from crawler.frontier_bench import DEFAULT_STATUS_MIX, FrontierOptions, run_frontier_benchmark
+
+
+def parse_status_mix(raw: str) -> dict[str, float]:
+    mix = {}
+    for part in filter(None, (chunk.strip() for chunk in raw.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_STATUS_MIX:
+            raise CommandError(f"Unknown queue status in --status-mix: {name}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight in --status-mix: {part}")
+    if not mix or sum(mix.values()) <= 0:
+        raise CommandError("--status-mix needs at least one positive weight.")
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic crawl frontier and benchmark claim, enqueue, complete, "
+        "status and log listing with concurrent workers. Prints latencies and EXPLAIN plans as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seeds", type=int, default=200, help="Seeds to generate.")
+        parser.add_argument("--items", type=int, default=200_000, help="Queue items to generate (0 skips generation).")
+        parser.add_argument("--logs", type=int, default=100_000, help="Crawl log events to generate.")
+        parser.add_argument("--max-depth", type=int, default=12, help="Deepest discovery level generated.")
+        parser.add_argument("--seed-skew", type=float, default=1.1, help="Zipf exponent of items per seed.")
+        parser.add_argument(
+            "--status-mix",
+            default=",".join(f"{name}={weight}" for name, weight in DEFAULT_STATUS_MIX.items()),
+            help="Relative weights of queue statuses, e.g. done=0.85,failed=0.05,pending=0.09,in_progress=0.01.",
+        )
+        parser.add_argument("--days", type=int, default=90, help="Age of the oldest generated rows.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per bulk insert.")
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent workers per operation.")
+        parser.add_argument("--iterations", type=int, default=200, help="Calls per operation across all workers.")
+        parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN ANALYZE on PostgreSQL.")
+        parser.add_argument("--random-seed", type=int, default=7)
+        parser.add_argument(
+            "--keep-db",
+            action="store_true",
+            help="Run against the configured database instead of a throwaway test database.",
+        )
+        parser.add_argument("--output", default="", help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        bench = FrontierOptions(
+            seeds=max(1, options["seeds"]),
+            items=max(0, options["items"]),
+            logs=max(0, options["logs"]),
+            max_depth=max(1, options["max_depth"]),
+            seed_skew=max(0.0, options["seed_skew"]),
+            status_mix=parse_status_mix(options["status_mix"]),
+            days=max(1, options["days"]),
+            chunk_size=max(1, options["chunk_size"]),
+            workers=max(1, options["workers"]),
+            iterations=max(1, options["iterations"]),
+            analyze=options["analyze"],
+            random_seed=options["random_seed"],
+        )
+        old_name = None
+        if not options["keep_db"]:
+            old_name = connection.settings_dict["NAME"]
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = run_frontier_benchmark(bench, generate=bench.items > 0)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        text = json.dumps(report, indent=2, default=str)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(text + "\n")
+        self.stdout.write(text)
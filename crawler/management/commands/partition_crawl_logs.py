@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from crawler.partitions import convert_log_table, ensure_log_partitions
+
+
+class Command(BaseCommand):
+    help = "Convert the crawl log table to daily partitions (PostgreSQL) and create upcoming partitions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days-ahead", type=int, default=None, help="Daily partitions to create ahead of today.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Log partitioning requires PostgreSQL.")
+        converted = convert_log_table(options["days_ahead"])
+        created = ensure_log_partitions(options["days_ahead"])
+        state = "converted" if converted else "already partitioned"
+        self.stdout.write(self.style.SUCCESS(f"Crawl log table {state}. partitions_ensured={len(created)}"))
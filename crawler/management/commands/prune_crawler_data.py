@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from crawler.partitions import ensure_log_partitions
+from crawler.retention import DEFAULT_CHUNK_SIZE, prune_all
+from crawler.services import get_config
+
+TABLES = ["logs", "archives", "queue"]
+
+
+class Command(BaseCommand):
+    help = "Delete crawl logs, page archives and finished queue items older than the configured retention."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows deleted per transaction.")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between chunks.")
+        parser.add_argument("--only", choices=TABLES, action="append", help="Prune only these tables (repeatable).")
+
+    def handle(self, *args, **options):
+        ensure_log_partitions()
+        report = prune_all(
+            get_config(),
+            chunk_size=max(1, options["chunk_size"]),
+            pause=max(0.0, options["pause"]),
+            tables=set(options["only"] or TABLES),
+        )
+        self.stdout.write(json.dumps(report))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from crawler.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recount crawl queue items per status and seed and overwrite the maintained counters."
+
+    def handle(self, *args, **options):
+        totals = reconcile_counters()
+        summary = " ".join(f"{status}={count}" for status, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f"Queue counters reconciled. {summary}"))
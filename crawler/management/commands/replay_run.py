@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from crawler.models import CrawlRun, PageArchive
+from crawler.services import CrawlerService
+
+
+class Command(BaseCommand):
+    help = "Re-run extraction over the archived pages of a crawl run without network fetches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("run_id", type=int, help="Run whose archived pages should be replayed.")
+        parser.add_argument("--stub-llm", action="store_true", help="Use the local stub LLM instead of the configured provider.")
+        parser.add_argument("--no-llm", action="store_true", help="Use heuristic extraction only.")
+        parser.add_argument("--limit", type=int, default=0, help="Replay at most this many pages.")
+        parser.add_argument("--objective", default=None, help="Override the source run objective.")
+        parser.add_argument("--profile", action="store_true", help="Sample the replay's stacks into a profile artifact.")
+
+    def handle(self, *args, **options):
+        source_run = CrawlRun.objects.filter(pk=options["run_id"]).first()
+        if source_run is None:
+            raise CommandError(f"Run {options['run_id']} does not exist.")
+        if not PageArchive.objects.filter(run=source_run).exists():
+            raise CommandError(
+                f"Run {source_run.id} has no archived pages. Enable CRAWLER_ARCHIVE_HTML for the runs you want to replay."
+            )
+        scratch = CrawlRun.objects.create(
+            status=CrawlRun.STATUS_DONE,
+            objective=source_run.objective if options["objective"] is None else options["objective"],
+            use_llm_filtering=source_run.use_llm_filtering and not options["no_llm"],
+            replay_of=source_run,
+            profile_enabled=options["profile"],
+        )
+        service = CrawlerService(stub_llm=options["stub_llm"])
+        report = service.replay(source_run, run=scratch, limit=options["limit"] or None)
+        self.stdout.write(json.dumps(report, indent=2, default=str))
+        if report["status"] != CrawlRun.STATUS_DONE:
+            raise CommandError(f"Replay run {scratch.id} failed: {scratch.last_error}")
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_left
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+from django.conf import settings
+
+from crawler.models import MetricsSnapshot
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+OTHER_LABEL = "_other"
+SNAPSHOT_KEY = "crawler"
+# Codes raised as RuntimeError by the crawler; anything else is folded into a
+# fixed set so error messages never become label values.
+ERROR_CODES = {"robots_disallowed", "robots_unavailable", "unsupported_content_type", "empty_context", "replay_missing_page"}
+HTTP_STATUS_CODE = re.compile(r"http_([1-5])\d\d")
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(values: dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in values.items()))
+
+
+class MetricsRegistry:
+    """Thread-safe counters and fixed-bucket histograms keyed by name and labels."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS, max_hosts: Optional[int] = None):
+        self.buckets = buckets
+        self.max_hosts = int(max_hosts if max_hosts is not None else getattr(settings, "CRAWLER_METRICS_MAX_HOSTS", 200))
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], list] = {}
+        self._hosts: set[str] = set()
+
+    def host_label(self, url: str) -> str:
+        # Caps label cardinality: hosts beyond the first ``max_hosts`` share one series.
+        host = (urlparse(url).hostname or "").lower() or "unknown"
+        with self._lock:
+            if host in self._hosts:
+                return host
+            if len(self._hosts) >= self.max_hosts:
+                return OTHER_LABEL
+            self._hosts.add(host)
+            return host
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [
+                    [name, list(labels), list(series[0]), series[1], series[2]]
+                    for (name, labels), series in self._histograms.items()
+                ],
+            }
+
+
+def percentile(bucket_counts: list[int], buckets: tuple[float, ...] | list[float], q: float) -> Optional[float]:
+    """Estimate a quantile from bucket counts by interpolating inside the bucket."""
+    total = sum(bucket_counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(bucket_counts):
+        if seen + count >= rank and count:
+            lower = buckets[index - 1] if index > 0 else 0.0
+            upper = buckets[index] if index < len(buckets) else buckets[-1]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return float(buckets[-1])
+
+
+def summarize(snapshot: dict) -> dict:
+    """Fold a registry snapshot into a JSON-friendly per-run summary."""
+    buckets = snapshot["buckets"]
+    histograms: dict[str, dict] = {}
+    for name, labels, counts, total, count in snapshot["histograms"]:
+        label_text = ",".join(f"{key}={value}" for key, value in labels) or "all"
+        p50 = percentile(counts, buckets, 0.5)
+        p95 = percentile(counts, buckets, 0.95)
+        histograms.setdefault(name, {})[label_text] = {
+            "count": count,
+            "total_seconds": round(total, 6),
+            "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
+        }
+    counters: dict[str, dict] = {}
+    for name, labels, value in snapshot["counters"]:
+        label_text = ",".join(f"{key}={value}" for key, value in labels) or "all"
+        counters.setdefault(name, {})[label_text] = value
+    return {"histograms": histograms, "counters": counters}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: list, extra: Optional[tuple[str, str]] = None) -> str:
+    pairs = [tuple(pair) for pair in labels]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(snapshot: Optional[dict], gauges: Optional[dict[str, list[tuple[dict, float]]]] = None) -> str:
+    lines: list[str] = []
+    for name, samples in (gauges or {}).items():
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_number(value)}")
+    if snapshot:
+        buckets = snapshot["buckets"]
+        typed: set[str] = set()
+        for name, labels, value in sorted(snapshot["counters"], key=lambda entry: (entry[0], entry[1])):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+        for name, labels, counts, total, count in sorted(snapshot["histograms"], key=lambda entry: (entry[0], entry[1])):
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                le = bound if bound == "+Inf" else _format_number(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', le))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {repr(float(total))}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def error_reason(exc: BaseException) -> str:
+    """Map a page failure to a bounded ``reason`` label value."""
+    if isinstance(exc, RuntimeError):
+        code = str(exc).split(":", 1)[0].strip()
+        if code in ERROR_CODES:
+            return code
+        match = HTTP_STATUS_CODE.fullmatch(code)
+        return f"http_{match.group(1)}xx" if match else "other"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(exc, httpx.ConnectError):
+        return "connect_error"
+    if isinstance(exc, httpx.TooManyRedirects):
+        return "too_many_redirects"
+    if isinstance(exc, httpx.HTTPError):
+        return "http_error"
+    return "other"
+
+
+def publish_snapshot(registry: MetricsRegistry = REGISTRY) -> None:
+    # The crawler thread may live in a different worker than the one serving
+    # /metrics. The default cache is per process, so the snapshot goes to the database.
+    MetricsSnapshot.objects.update_or_create(key=SNAPSHOT_KEY, defaults={"data": registry.snapshot()})
+
+
+def load_snapshot() -> Optional[dict]:
+    return MetricsSnapshot.objects.filter(key=SNAPSHOT_KEY).values_list("data", flat=True).first()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from django.db import models
+from django.utils import timezone
 
 from core.models import TimeStampedModel
 
@@ -53,6 +54,8 @@ class CrawlerConfig(TimeStampedModel):
     llm_max_output_tokens = models.PositiveIntegerField(default=1400)
 
     max_context_chars = models.PositiveIntegerField(default=12000)
+    # Pages are cut at this many bytes while downloading; 0 is unlimited.
+    max_page_bytes = models.PositiveIntegerField(default=2 * 1024 * 1024)
     max_next_urls = models.PositiveIntegerField(default=10)
     max_articles = models.PositiveIntegerField(default=20)
     max_article_chars = models.PositiveIntegerField(default=2000)
@@ -62,9 +65,45 @@ class CrawlerConfig(TimeStampedModel):
     request_delay_seconds = models.FloatField(default=1.0)
     user_agent = models.CharField(max_length=255, default="nousnews-crawler/1.0 (+https://crawler.miyangroup.com)")
     allow_external_domains = models.BooleanField(default=False)
+    # Skip URLs disallowed by robots.txt and space requests to a host by its
+    # Crawl-delay (at least request_delay_seconds); see crawler.robots.
+    respect_robots_txt = models.BooleanField(default=True)
 
     prompt_template = models.TextField(default=DEFAULT_PROMPT)
 
+    # Retention in days; 0 keeps rows forever.
+    log_retention_days = models.PositiveIntegerField(default=30)
+    queue_retention_days = models.PositiveIntegerField(default=30)
+    archive_retention_days = models.PositiveIntegerField(default=30)
+
+    # LLM token budgets; 0 is unlimited. Once spent, extraction falls back to
+    # the heuristic path for the rest of the run.
+    llm_run_token_budget = models.PositiveIntegerField(default=0)
+    llm_daily_token_budget = models.PositiveIntegerField(default=0)
+    # Prices per million tokens, used to report cost alongside token counts.
+    llm_prompt_cost_per_million = models.FloatField(default=0.0)
+    llm_completion_cost_per_million = models.FloatField(default=0.0)
+
+    # Queue items claimed per step. With adaptive sizing the crawler tunes the
+    # size between these bounds from observed throughput, failures and prompt
+    # size; otherwise it stays at the number of active seeds (clamped).
+    adaptive_batch_size = models.BooleanField(default=True)
+    batch_size_min = models.PositiveIntegerField(default=1)
+    batch_size_max = models.PositiveIntegerField(default=20)
+    # Model context window used to cap the batch prompt, and a tokens-per-minute
+    # rate limit enforced by pausing between steps; 0 disables either.
+    llm_context_tokens = models.PositiveIntegerField(default=128000)
+    llm_tokens_per_minute = models.PositiveIntegerField(default=0)
+
+    # Sitemap and RSS/Atom discovery; see crawler.discovery. Each source is
+    # re-read at most once per interval, and only entries modified within
+    # discovery_max_age_days (0 = any age) are queued, up to
+    # discovery_max_urls per seed and pass.
+    discovery_enabled = models.BooleanField(default=True)
+    discovery_interval_minutes = models.PositiveIntegerField(default=30)
+    discovery_max_age_days = models.PositiveIntegerField(default=3)
+    discovery_max_urls = models.PositiveIntegerField(default=500)
+
     class Meta:
         verbose_name = "Crawler Configuration"
         verbose_name_plural = "Crawler Configuration"
@@ -82,6 +121,50 @@ class CrawlSeed(TimeStampedModel):
     is_active = models.BooleanField(default=True)
     last_fetched_at = models.DateTimeField(null=True, blank=True)
     last_error = models.TextField(blank=True, default="")
+    # When robots.txt and the seed page were last searched for sitemaps and feeds.
+    sources_checked_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return self.url
+
+
+class DiscoverySource(TimeStampedModel):
+    KIND_SITEMAP = "sitemap"
+    KIND_SITEMAP_INDEX = "sitemap_index"
+    KIND_FEED = "feed"
+
+    KIND_CHOICES = [
+        (KIND_SITEMAP, "Sitemap"),
+        (KIND_SITEMAP_INDEX, "Sitemap index"),
+        (KIND_FEED, "RSS/Atom feed"),
+    ]
+
+    seed = models.ForeignKey(CrawlSeed, on_delete=models.CASCADE, related_name="discovery_sources")
+    parent = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="children",
+    )
+    url = models.URLField(max_length=1000)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_SITEMAP)
+    is_active = models.BooleanField(default=True)
+    # Validators from the last 200 response, sent back as a conditional GET.
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    # <lastmod> of this sitemap as listed by its index at the last read.
+    listed_modified_at = models.DateTimeField(null=True, blank=True)
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+    last_status = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    urls_found = models.PositiveIntegerField(default=0)
+    urls_queued = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["seed", "url"], name="discovery_source_seed_url"),
+        ]
 
     def __str__(self) -> str:
         return self.url
@@ -104,16 +187,21 @@ class CrawlQueueItem(TimeStampedModel):
     seed = models.ForeignKey(CrawlSeed, null=True, blank=True, on_delete=models.SET_NULL)
     seed_url = models.URLField(max_length=1000, blank=True, default="")
     depth = models.PositiveIntegerField(default=0)
+    # Claimed highest first. Items found in sitemaps and feeds carry their
+    # modification time in minutes since the epoch; links found on pages stay 0.
+    priority = models.PositiveIntegerField(default=0)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
     discovered_at = models.DateTimeField(auto_now_add=True)
     last_attempt_at = models.DateTimeField(null=True, blank=True)
     attempts = models.PositiveIntegerField(default=0)
     last_error = models.TextField(blank=True, default="")
+    # Pending items are not claimed before this time (set while robots.txt is unavailable).
+    available_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         indexes = [
-            models.Index(fields=["status", "discovered_at"]),
+            models.Index(fields=["status", "-priority", "discovered_at"], name="crawl_queue_claim_idx"),
             models.Index(fields=["seed_url", "status"]),
         ]
 
@@ -121,6 +209,78 @@ class CrawlQueueItem(TimeStampedModel):
         return f"{self.url} ({self.status})"
 
 
+class RobotsTxt(TimeStampedModel):
+    # One row per scheme://host[:port], shared by every run and worker process.
+    origin = models.CharField(max_length=255, unique=True)
+    status_code = models.PositiveIntegerField(default=0)
+    body = models.TextField(blank=True, default="")
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    fetched_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return self.origin
+
+
+class SeenUrl(models.Model):
+    # Hash of a queue URL whose row was pruned; keeps it from being enqueued again.
+    digest = models.CharField(max_length=32, primary_key=True)
+    pruned_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.digest
+
+
+class CrawlQueueCounter(models.Model):
+    SCOPE_ALL = ""
+
+    # "" holds the totals for the whole queue; other rows are keyed by seed URL.
+    scope = models.CharField(max_length=1000, unique=True, blank=True)
+    pending = models.BigIntegerField(default=0)
+    in_progress = models.BigIntegerField(default=0)
+    done = models.BigIntegerField(default=0)
+    failed = models.BigIntegerField(default=0)
+    articles_created = models.BigIntegerField(default=0)
+    llm_prompt_tokens = models.BigIntegerField(default=0)
+    llm_completion_tokens = models.BigIntegerField(default=0)
+    last_fetched_at = models.DateTimeField(null=True, blank=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return self.scope or "(all)"
+
+
+class CrawlQueueCounterDelta(models.Model):
+    # Appended by the queue paths instead of updating the shared counter rows;
+    # folded into CrawlQueueCounter by crawler.counters.fold_counter_deltas.
+    scope = models.CharField(max_length=1000, blank=True)
+    pending = models.BigIntegerField(default=0)
+    in_progress = models.BigIntegerField(default=0)
+    done = models.BigIntegerField(default=0)
+    failed = models.BigIntegerField(default=0)
+    articles_created = models.BigIntegerField(default=0)
+    llm_prompt_tokens = models.BigIntegerField(default=0)
+    llm_completion_tokens = models.BigIntegerField(default=0)
+    last_fetched_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.scope or "(all)"
+
+
+class MetricsSnapshot(models.Model):
+    # The crawler process's metric series, written after every step so that any
+    # worker serving /metrics can read it.
+    key = models.CharField(max_length=64, unique=True)
+    data = models.JSONField(blank=True, default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return self.key
+
+
 class CrawlRun(TimeStampedModel):
     STATUS_RUNNING = "running"
     STATUS_DONE = "done"
@@ -134,12 +294,71 @@ class CrawlRun(TimeStampedModel):
     pages_processed = models.PositiveIntegerField(default=0)
     articles_created = models.PositiveIntegerField(default=0)
     queued_urls = models.PositiveIntegerField(default=0)
+    llm_calls = models.PositiveIntegerField(default=0)
+    llm_prompt_tokens = models.PositiveBigIntegerField(default=0)
+    llm_completion_tokens = models.PositiveBigIntegerField(default=0)
     last_error = models.TextField(blank=True, default="")
+    replay_of = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="replays",
+    )
+    metrics = models.JSONField(blank=True, default=dict)
+    profile_enabled = models.BooleanField(default=False)
+    # Collapsed-stack profile in the blob store; see crawler.profiler.
+    profile_digest = models.CharField(max_length=64, blank=True, default="")
 
     class Meta:
         ordering = ["-started_at"]
 
 
+class ContentBlob(models.Model):
+    BACKEND_DB = "db"
+    BACKEND_FS = "fs"
+
+    CODEC_ZLIB = "zlib"
+
+    digest = models.CharField(max_length=64, primary_key=True)
+    backend = models.CharField(max_length=8, default=BACKEND_DB)
+    codec = models.CharField(max_length=16, default=CODEC_ZLIB)
+    payload = models.BinaryField(null=True, blank=True)
+    raw_size = models.PositiveBigIntegerField(default=0)
+    stored_size = models.PositiveBigIntegerField(default=0)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.digest[:12]} ({self.raw_size}b, refs={self.refcount})"
+
+
+class PageArchive(TimeStampedModel):
+    run = models.ForeignKey(CrawlRun, null=True, blank=True, on_delete=models.SET_NULL, related_name="pages")
+    queue_item = models.ForeignKey(
+        CrawlQueueItem,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="pages",
+    )
+    seed_url = models.URLField(max_length=1000, blank=True, default="")
+    url = models.URLField(max_length=1000)
+    status_code = models.PositiveIntegerField(default=0)
+    content_type = models.CharField(max_length=255, blank=True, default="")
+    html_digest = models.CharField(max_length=64, db_index=True)
+    html_chars = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["run", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return self.url
+
+
 class CrawlLogEvent(TimeStampedModel):
     LEVEL_INFO = "info"
     LEVEL_WARN = "warn"
@@ -150,6 +369,7 @@ class CrawlLogEvent(TimeStampedModel):
     STEP_LLM_PROMPT = "llm_prompt"
     STEP_LLM_OUTPUT = "llm_output"
     STEP_NEXT_STEP = "next_step"
+    STEP_DISCOVERY = "discovery"
     STEP_ERROR = "error"
 
     LEVEL_CHOICES = [
@@ -164,6 +384,7 @@ class CrawlLogEvent(TimeStampedModel):
         (STEP_LLM_PROMPT, "LLM prompt"),
         (STEP_LLM_OUTPUT, "LLM output"),
         (STEP_NEXT_STEP, "Next step"),
+        (STEP_DISCOVERY, "Discovery"),
         (STEP_ERROR, "Error"),
     ]
 
@@ -181,13 +402,19 @@ class CrawlLogEvent(TimeStampedModel):
     level = models.CharField(max_length=16, choices=LEVEL_CHOICES, default=LEVEL_INFO)
     message = models.CharField(max_length=255, blank=True, default="")
     content = models.TextField(blank=True, default="")
+    content_digest = models.CharField(max_length=64, blank=True, default="")
     metadata = models.JSONField(blank=True, default=dict)
+    # Set when the event is emitted rather than when the buffered sink flushes it.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["step", "created_at"]),
             models.Index(fields=["run", "created_at"]),
+            models.Index(fields=["-created_at", "-id"], name="crawl_log_feed_idx"),
+            models.Index(fields=["run", "step", "-created_at", "-id"], name="crawl_log_run_step_idx"),
+            models.Index(fields=["level", "-created_at", "-id"], name="crawl_log_level_idx"),
         ]
 
     def __str__(self) -> str:
@@ -0,0 +1,206 @@
+"""Optional daily range partitioning of the crawl log table on PostgreSQL.
+
+``convert_log_table`` swaps the log table for a table partitioned by
+``created_at``. The existing rows become one ``_legacy`` partition ending at the
+conversion day, a ``_default`` partition catches rows outside the created ranges,
+and ``ensure_log_partitions`` keeps daily partitions created ahead of time.
+Partitions that end before the retention cutoff are dropped whole by
+``drop_log_partitions_before``. The foreign keys to runs and queue items move
+to the partitioned parent (PostgreSQL 11+), so every partition enforces them.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from crawler.blobs import BlobStore
+from crawler.models import CrawlLogEvent
+
+PARTITION_PREFIX = "_p"
+LEGACY_SUFFIX = "_legacy"
+DEFAULT_SUFFIX = "_default"
+
+
+def log_table() -> str:
+    return CrawlLogEvent._meta.db_table
+
+
+def _is_postgres(conn=None) -> bool:
+    return (conn or connection).vendor == "postgresql"
+
+
+def _quote(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def log_table_is_partitioned() -> bool:
+    if not _is_postgres():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [log_table()],
+        )
+        return cursor.fetchone() is not None
+
+
+def log_partitions() -> list[tuple[str, Optional[datetime]]]:
+    """Return ``(name, upper_bound)`` for the day and legacy partitions, oldest first."""
+    table = log_table()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND pg_table_is_visible(p.oid)",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions: list[tuple[str, Optional[datetime]]] = []
+    for name in names:
+        suffix = name[len(table):]
+        if suffix.startswith(PARTITION_PREFIX):
+            day = datetime.strptime(suffix[len(PARTITION_PREFIX):], "%Y%m%d").date()
+            partitions.append((name, _day_start(day + timedelta(days=1))))
+    legacy_upper = _legacy_upper_bound()
+    if legacy_upper is not None:
+        partitions.append((f"{table}{LEGACY_SUFFIX}", legacy_upper))
+    return sorted(partitions, key=lambda entry: entry[1])
+
+
+def _legacy_upper_bound() -> Optional[datetime]:
+    legacy = f"{log_table()}{LEGACY_SUFFIX}"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT obj_description(c.oid, 'pg_class') FROM pg_class c "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [legacy],
+        )
+        row = cursor.fetchone()
+    if not row or not row[0]:
+        return None
+    return datetime.fromisoformat(row[0])
+
+
+def ensure_log_partitions(days_ahead: Optional[int] = None, start: Optional[date] = None) -> list[str]:
+    if not log_table_is_partitioned():
+        return []
+    days_ahead = int(days_ahead if days_ahead is not None else getattr(settings, "CRAWLER_LOG_PARTITION_DAYS_AHEAD", 7))
+    table = log_table()
+    start = start or datetime.now(dt_timezone.utc).date()
+    legacy_upper = _legacy_upper_bound()
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(days_ahead + 1):
+            day = start + timedelta(days=offset)
+            if legacy_upper is not None and _day_start(day) < legacy_upper:
+                continue
+            name = f"{table}{PARTITION_PREFIX}{day:%Y%m%d}"
+            try:
+                with transaction.atomic():
+                    cursor.execute(
+                        f"CREATE TABLE IF NOT EXISTS {_quote(name)} PARTITION OF {_quote(table)} "
+                        "FOR VALUES FROM (%s) TO (%s)",
+                        [_day_start(day), _day_start(day + timedelta(days=1))],
+                    )
+            except DatabaseError:
+                # Rows for this day already landed in the default partition;
+                # they stay there and are removed by the chunked delete.
+                continue
+            created.append(name)
+    return created
+
+
+def convert_log_table(days_ahead: Optional[int] = None) -> bool:
+    """Replace the log table with a partitioned one; returns False if already done."""
+    if not _is_postgres() or log_table_is_partitioned():
+        return False
+    table = log_table()
+    legacy = f"{table}{LEGACY_SUFFIX}"
+    sequence = f"{table}_pid_seq"
+    boundary = _day_start(datetime.now(dt_timezone.utc).date() + timedelta(days=1))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {_quote(table)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0), MAX(created_at) FROM {_quote(table)}")
+        max_id, newest = cursor.fetchone()
+        if newest is not None and newest >= boundary:
+            boundary = _day_start(newest.astimezone(dt_timezone.utc).date() + timedelta(days=1))
+        cursor.execute(
+            "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+            "JOIN pg_class i ON i.oid = x.indexrelid JOIN pg_class t ON t.oid = x.indrelid "
+            "WHERE t.relname = %s AND pg_table_is_visible(t.oid) AND NOT x.indisprimary",
+            [table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT c.conname, pg_get_constraintdef(c.oid) FROM pg_constraint c "
+            "JOIN pg_class t ON t.oid = c.conrelid "
+            "WHERE t.relname = %s AND pg_table_is_visible(t.oid) AND c.contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"ALTER TABLE {_quote(table)} RENAME TO {_quote(legacy)}")
+        cursor.execute(f"ALTER TABLE {_quote(legacy)} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute(
+            f"CREATE TABLE {_quote(table)} (LIKE {_quote(legacy)} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f"CREATE SEQUENCE {_quote(sequence)} OWNED BY {_quote(table)}.id")
+        cursor.execute("SELECT setval(%s, %s, false)", [sequence, max_id + 1])
+        cursor.execute(f"ALTER TABLE {_quote(table)} ALTER COLUMN id SET DEFAULT nextval(%s)", [sequence])
+        cursor.execute(f"ALTER TABLE {_quote(table)} ADD PRIMARY KEY (id, created_at)")
+        # Index names move to the parent so later migrations find them. Attaching
+        # the legacy table below adopts its renamed, identical indexes.
+        for name, definition in indexes:
+            method_and_columns = definition.split(" USING ", 1)[1]
+            cursor.execute(f"ALTER INDEX {_quote(name)} RENAME TO {_quote(name[:55] + '_legacy')}")
+            cursor.execute(f"CREATE INDEX {_quote(name)} ON ONLY {_quote(table)} USING {method_and_columns}")
+        # Foreign keys go on the parent before the legacy table is attached, so the
+        # attach adopts its identical, already validated constraints.
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f"ALTER TABLE {_quote(legacy)} RENAME CONSTRAINT {_quote(name)} TO {_quote(name[:55] + '_legacy')}"
+            )
+            cursor.execute(f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(name)} {definition}")
+        cursor.execute(
+            f"ALTER TABLE {_quote(legacy)} ADD CONSTRAINT {_quote(legacy + '_range')} "
+            "CHECK (created_at IS NOT NULL AND created_at < %s)",
+            [boundary],
+        )
+        cursor.execute(
+            f"ALTER TABLE {_quote(table)} ATTACH PARTITION {_quote(legacy)} FOR VALUES FROM (MINVALUE) TO (%s)",
+            [boundary],
+        )
+        cursor.execute(f"ALTER TABLE {_quote(legacy)} DROP CONSTRAINT {_quote(legacy + '_range')}")
+        cursor.execute(f"COMMENT ON TABLE {_quote(legacy)} IS %s", [boundary.isoformat()])
+        cursor.execute(f"CREATE TABLE {_quote(table + DEFAULT_SUFFIX)} PARTITION OF {_quote(table)} DEFAULT")
+    ensure_log_partitions(days_ahead, start=boundary.date())
+    return True
+
+
+def drop_log_partitions_before(cutoff: datetime, blob_store: Optional[BlobStore] = None) -> int:
+    """Drop every partition that ends at or before ``cutoff``; returns the rows removed."""
+    blob_store = blob_store or BlobStore()
+    removed = 0
+    for name, upper in log_partitions():
+        if upper is None or upper > cutoff:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT content_digest, COUNT(*) FROM {_quote(name)} WHERE content_digest <> '' "
+                "GROUP BY content_digest"
+            )
+            digests = cursor.fetchall()
+            cursor.execute(f"SELECT COUNT(*) FROM {_quote(name)}")
+            removed += cursor.fetchone()[0]
+            cursor.execute(f"DROP TABLE {_quote(name)}")
+            blob_store.release(digest for digest, count in digests for _ in range(count))
+    return removed
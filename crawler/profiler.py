@@ -0,0 +1,151 @@
+"""Low-rate stack sampling of the crawler thread and capture of CPU-heavy pages.
+
+``StackSampler`` runs a daemon thread that reads the target thread's frame
+from ``sys._current_frames`` at a fixed interval and counts identical stacks.
+The result is written in the collapsed format (``frame;frame;frame count``)
+read by flamegraph.pl, speedscope and similar viewers. The sampler times its
+own work and doubles the interval whenever that exceeds ``max_overhead`` of
+the elapsed time, so the cost stays bounded on deep or busy stacks.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from django.conf import settings
+
+MAX_INTERVAL_SECONDS = 1.0
+TRUNCATED_STACK = "[truncated]"
+OTHER_STACKS = "[other]"
+
+
+def _frame_label(frame) -> str:
+    module = frame.f_globals.get("__name__") or frame.f_code.co_filename
+    return f"{module}:{frame.f_code.co_name}"
+
+
+class StackSampler:
+    def __init__(
+        self,
+        thread_id: int,
+        *,
+        interval: Optional[float] = None,
+        max_overhead: Optional[float] = None,
+        max_depth: int = 96,
+        max_stacks: Optional[int] = None,
+    ) -> None:
+        self.thread_id = thread_id
+        self.interval = max(0.001, float(
+            interval if interval is not None else getattr(settings, "CRAWLER_PROFILE_INTERVAL_SECONDS", 0.02)
+        ))
+        self.max_overhead = float(
+            max_overhead if max_overhead is not None else getattr(settings, "CRAWLER_PROFILE_MAX_OVERHEAD", 0.02)
+        )
+        self.max_depth = max_depth
+        self.max_stacks = int(
+            max_stacks if max_stacks is not None else getattr(settings, "CRAWLER_PROFILE_MAX_STACKS", 5000)
+        )
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.sample_seconds = 0.0
+        self.active_seconds = 0.0
+        self._started: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> "StackSampler":
+        if self._thread is None:
+            self._stop.clear()
+            self._started = time.perf_counter()
+            self._thread = threading.Thread(target=self._loop, name="crawler-profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.active_seconds += time.perf_counter() - (self._started or time.perf_counter())
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            self.sample()
+            self.sample_seconds += time.perf_counter() - started
+            elapsed = self.active_seconds + started - (self._started or started)
+            if elapsed > 0 and self.sample_seconds / elapsed > self.max_overhead:
+                self.interval = min(MAX_INTERVAL_SECONDS, self.interval * 2)
+
+    def sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        if frame is not None:
+            labels.append(TRUNCATED_STACK)
+        stack = ";".join(reversed(labels))
+        if stack not in self.stacks and len(self.stacks) >= self.max_stacks:
+            stack = OTHER_STACKS
+        self.stacks[stack] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        active = self.active_seconds
+        if self._thread is not None and self._started is not None:
+            active += time.perf_counter() - self._started
+        return {
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "interval_ms": round(self.interval * 1000, 3),
+            "active_seconds": round(active, 3),
+            "sample_seconds": round(self.sample_seconds, 6),
+            "overhead": round(self.sample_seconds / active, 6) if active > 0 else None,
+        }
+
+
+class SlowPageRecorder:
+    """Keeps the HTML of pages whose parsing used more CPU than ``threshold`` seconds."""
+
+    def __init__(self, threshold: Optional[float] = None, limit: Optional[int] = None) -> None:
+        self.threshold = float(
+            threshold if threshold is not None else getattr(settings, "CRAWLER_SLOW_PAGE_CPU_SECONDS", 1.0)
+        )
+        self.limit = int(limit if limit is not None else getattr(settings, "CRAWLER_SLOW_PAGE_LIMIT", 20))
+        self.pages: list[dict] = []
+        self.skipped = 0
+
+    @contextmanager
+    def measure(self, stage: str, url: str, html: str) -> Iterator[None]:
+        if self.threshold <= 0:
+            yield
+            return
+        # Thread CPU time, so fetch waits and other threads do not count.
+        started = time.thread_time()
+        try:
+            yield
+        finally:
+            cpu = time.thread_time() - started
+            if cpu >= self.threshold:
+                if len(self.pages) < self.limit:
+                    self.pages.append(
+                        {"url": url, "stage": stage, "cpu_ms": round(cpu * 1000, 3), "chars": len(html or ""), "html": html}
+                    )
+                else:
+                    self.skipped += 1
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from crawler.blobs import BlobStore
+from crawler.counters import adjust_counters
+from crawler.models import CrawlerConfig, CrawlLogEvent, CrawlQueueItem, PageArchive, SeenUrl
+from crawler.partitions import drop_log_partitions_before, log_table_is_partitioned
+
+DEFAULT_CHUNK_SIZE = 1000
+PRUNABLE_QUEUE_STATUSES = [CrawlQueueItem.STATUS_DONE, CrawlQueueItem.STATUS_FAILED]
+
+
+def url_digest(url: str) -> str:
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def seen_urls(urls: Iterable[str]) -> set[str]:
+    """Return the URLs among ``urls`` whose queue rows were pruned."""
+    by_digest = {url_digest(url): url for url in urls if url}
+    if not by_digest:
+        return set()
+    found = SeenUrl.objects.filter(digest__in=list(by_digest)).values_list("digest", flat=True)
+    return {by_digest[digest] for digest in found}
+
+
+def retention_cutoff(days: int, now: Optional[datetime] = None) -> Optional[datetime]:
+    if not days:
+        return None
+    return (now or timezone.now()) - timedelta(days=int(days))
+
+
+def prune_logs(
+    cutoff: datetime,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause: float = 0.0,
+    blob_store: Optional[BlobStore] = None,
+) -> int:
+    blob_store = blob_store or BlobStore()
+    deleted = 0
+    if log_table_is_partitioned():
+        deleted += drop_log_partitions_before(cutoff, blob_store)
+    # Walk (created_at, id) forward so each chunk seeks past the rows already
+    # removed instead of rescanning their dead index entries.
+    position: Optional[tuple[datetime, int]] = None
+    while True:
+        qs = CrawlLogEvent.objects.filter(created_at__lt=cutoff)
+        if position is not None:
+            qs = qs.filter(Q(created_at__gt=position[0]) | Q(created_at=position[0], id__gt=position[1]))
+        rows = list(qs.order_by("created_at", "id").values_list("created_at", "id", "content_digest")[:chunk_size])
+        if not rows:
+            return deleted
+        with transaction.atomic():
+            deleted += CrawlLogEvent.objects.filter(id__in=[row[1] for row in rows]).delete()[0]
+            blob_store.release(row[2] for row in rows)
+        position = (rows[-1][0], rows[-1][1])
+        if pause:
+            time.sleep(pause)
+
+
+def prune_archives(
+    cutoff: datetime,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause: float = 0.0,
+    blob_store: Optional[BlobStore] = None,
+) -> int:
+    blob_store = blob_store or BlobStore()
+    deleted = 0
+    last_id = 0
+    while True:
+        rows = list(
+            PageArchive.objects.filter(id__gt=last_id, created_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", "html_digest")[:chunk_size]
+        )
+        if not rows:
+            return deleted
+        with transaction.atomic():
+            deleted += PageArchive.objects.filter(id__in=[row[0] for row in rows]).delete()[0]
+            blob_store.release(row[1] for row in rows)
+        last_id = rows[-1][0]
+        if pause:
+            time.sleep(pause)
+
+
+def prune_queue(cutoff: datetime, chunk_size: int = DEFAULT_CHUNK_SIZE, pause: float = 0.0) -> int:
+    """Delete finished queue rows, keeping a hash of each URL so it is not crawled again."""
+    deleted = 0
+    last_id = 0
+    while True:
+        rows = list(
+            CrawlQueueItem.objects.filter(
+                id__gt=last_id,
+                status__in=PRUNABLE_QUEUE_STATUSES,
+                updated_at__lt=cutoff,
+            )
+            .order_by("id")
+            .values_list("id", "url", "seed_url", "status")[:chunk_size]
+        )
+        if not rows:
+            return deleted
+        with transaction.atomic():
+            # Lock and re-check the status so rows reclaimed since the read are kept.
+            locked = list(
+                CrawlQueueItem.objects.select_for_update()
+                .filter(id__in=[row[0] for row in rows], status__in=PRUNABLE_QUEUE_STATUSES)
+                .values_list("id", "url", "seed_url", "status")
+            )
+            SeenUrl.objects.bulk_create([SeenUrl(digest=url_digest(url)) for _, url, _, _ in locked], ignore_conflicts=True)
+            removed = CrawlQueueItem.objects.filter(id__in=[row[0] for row in locked]).delete()[0]
+            deltas: dict[str, Counter] = defaultdict(Counter)
+            for _, _, seed_url, status in locked:
+                deltas[seed_url][status] -= 1
+            adjust_counters(deltas)
+        deleted += removed
+        last_id = rows[-1][0]
+        if pause:
+            time.sleep(pause)
+
+
+def prune_all(
+    config: CrawlerConfig,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause: float = 0.0,
+    tables: Optional[set[str]] = None,
+) -> dict[str, int]:
+    tables = tables or {"logs", "archives", "queue"}
+    blob_store = BlobStore()
+    now = timezone.now()
+    report: dict[str, int] = {}
+    cutoff = retention_cutoff(config.log_retention_days, now)
+    if cutoff and "logs" in tables:
+        report["logs"] = prune_logs(cutoff, chunk_size, pause, blob_store)
+    cutoff = retention_cutoff(config.archive_retention_days, now)
+    if cutoff and "archives" in tables:
+        report["archives"] = prune_archives(cutoff, chunk_size, pause, blob_store)
+    cutoff = retention_cutoff(config.queue_retention_days, now)
+    if cutoff and "queue" in tables:
+        report["queue"] = prune_queue(cutoff, chunk_size, pause)
+    report["blobs"] = blob_store.collect_garbage()
+    return report
@@ -0,0 +1,253 @@
+"""robots.txt rules per host, cached in the database and compiled in memory.
+
+A host's robots.txt is fetched once per ``CRAWLER_ROBOTS_TTL_SECONDS`` for all
+runs and worker processes (``RobotsTxt`` rows); when it expires, it is
+revalidated with ``If-None-Match``/``If-Modified-Since``. Status handling
+follows RFC 9309: a 4xx other than 429 means no restrictions, while a 5xx, a
+429 or a network error blocks the host until the next attempt, reusing the
+last good copy when there is one.
+
+The rules of the group matching the crawler's product token (or ``*``) are
+compiled once per process. Plain path rules sit in a dict keyed by the rule,
+so a lookup tries one prefix of the path per distinct rule length instead of
+scanning every rule. Only rules containing ``*`` or ``$`` become regexes.
+The longest match wins and ``Allow`` wins ties.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+from django.conf import settings
+
+from crawler.models import RobotsTxt
+from crawler.timing import StageTimer
+
+MAX_BODY_BYTES = 500 * 1024
+RETRY_SECONDS = 3600
+MEMORY_HOSTS = 1000
+UNAVAILABLE_STATUSES = {429}
+
+# Compiled rules shared by every crawler in the process, keyed by (agent, origin).
+_COMPILED: OrderedDict[tuple[str, str], tuple["RobotsRules", datetime]] = OrderedDict()
+_COMPILED_LOCK = threading.Lock()
+
+
+def product_token(user_agent: str) -> str:
+    return (user_agent or "").split("/", 1)[0].strip().lower()
+
+
+def origin_of(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+
+def _compile_pattern(pattern: str) -> re.Pattern:
+    anchored = pattern.endswith("$")
+    body = pattern[:-1] if anchored else pattern
+    regex = ".*".join(re.escape(part) for part in body.split("*"))
+    return re.compile(regex + ("$" if anchored else ""))
+
+
+class RobotsRules:
+    def __init__(
+        self,
+        rules: list[tuple[str, bool]] = (),
+        *,
+        crawl_delay: Optional[float] = None,
+        sitemaps: Optional[list[str]] = None,
+        disallow_all: bool = False,
+        retry_at: Optional[datetime] = None,
+    ) -> None:
+        self.crawl_delay = crawl_delay
+        self.sitemaps = list(sitemaps or [])
+        self.disallow_all = disallow_all
+        # Set when robots.txt could not be fetched: the block lifts at the next attempt.
+        self.retry_at = retry_at
+        self.literal: dict[str, bool] = {}
+        wildcards: list[tuple[int, re.Pattern, bool]] = []
+        for path, allow in rules:
+            if "*" in path or path.endswith("$"):
+                wildcards.append((len(path), _compile_pattern(path), allow))
+            else:
+                self.literal[path] = self.literal.get(path, False) or allow
+        self.lengths = sorted({len(path) for path in self.literal}, reverse=True)
+        # Longest first; allow before disallow at equal length.
+        self.wildcards = sorted(wildcards, key=lambda rule: (-rule[0], not rule[2]))
+
+    @classmethod
+    def parse(cls, text: str, agent: str) -> "RobotsRules":
+        groups: list[tuple[list[str], list[tuple[str, bool]], list[float]]] = []
+        sitemaps: list[str] = []
+        current = None
+        for raw in (text or "").splitlines():
+            line = raw.split("#", 1)[0].strip()
+            name, sep, value = line.partition(":")
+            if not sep:
+                continue
+            name, value = name.strip().lower(), value.strip()
+            if name == "sitemap":
+                if value:
+                    sitemaps.append(value)
+            elif name == "user-agent":
+                if current is None or current[1] or current[2]:
+                    current = ([], [], [])
+                    groups.append(current)
+                current[0].append(value.lower())
+            elif current is None:
+                continue
+            elif name in {"allow", "disallow"}:
+                if value:
+                    current[1].append((value, name == "allow"))
+            elif name == "crawl-delay":
+                try:
+                    current[2].append(max(0.0, float(value)))
+                except ValueError:
+                    pass
+        matched = [group for group in groups if any(ua != "*" and agent.startswith(ua) for ua in group[0])]
+        if not matched:
+            matched = [group for group in groups if "*" in group[0]]
+        rules = [rule for group in matched for rule in group[1]]
+        delays = [delay for group in matched for delay in group[2]]
+        return cls(rules, crawl_delay=max(delays) if delays else None, sitemaps=sitemaps)
+
+    def allowed(self, url: str) -> bool:
+        parsed = urlparse(url)
+        path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        if self.disallow_all:
+            return path == "/robots.txt"
+        best, allow = -1, True
+        for length in self.lengths:
+            if length <= len(path):
+                hit = self.literal.get(path[:length])
+                if hit is not None:
+                    best, allow = length, hit
+                    break
+        for length, pattern, rule_allow in self.wildcards:
+            if length < best or (length == best and allow):
+                break
+            if pattern.match(path):
+                best, allow = length, rule_allow
+                break
+        return allow
+
+
+class RobotsCache:
+    def __init__(
+        self,
+        client: httpx.Client,
+        user_agent: str,
+        *,
+        ttl: Optional[float] = None,
+        timer: Optional[StageTimer] = None,
+    ) -> None:
+        self.client = client
+        self.agent = product_token(user_agent)
+        self.ttl = float(ttl if ttl is not None else getattr(settings, "CRAWLER_ROBOTS_TTL_SECONDS", 86400))
+        self.timer = timer
+        self.stats: Counter = Counter()
+
+    def allowed(self, url: str) -> bool:
+        allowed = self.rules(url).allowed(url)
+        if not allowed:
+            self.stats["blocked"] += 1
+        return allowed
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        return self.rules(url).crawl_delay
+
+    def retry_at(self, url: str) -> Optional[datetime]:
+        """When robots.txt is refetched if it was unavailable, else None."""
+        return self.rules(url).retry_at
+
+    def rules(self, url: str) -> RobotsRules:
+        origin = origin_of(url)
+        key = (self.agent, origin)
+        now = datetime.now(timezone.utc)
+        with _COMPILED_LOCK:
+            cached = _COMPILED.get(key)
+            if cached is not None and cached[1] > now:
+                _COMPILED.move_to_end(key)
+                return cached[0]
+        row = RobotsTxt.objects.filter(origin=origin).first()
+        if row is None or row.expires_at is None or row.expires_at <= now:
+            row = self._refresh(origin, row, now)
+        else:
+            self.stats["shared"] += 1
+        rules = self._compile(row)
+        with _COMPILED_LOCK:
+            _COMPILED[key] = (rules, row.expires_at)
+            _COMPILED.move_to_end(key)
+            while len(_COMPILED) > MEMORY_HOSTS:
+                _COMPILED.popitem(last=False)
+        return rules
+
+    def _compile(self, row: RobotsTxt) -> RobotsRules:
+        if 200 <= row.status_code < 300:
+            return RobotsRules.parse(row.body, self.agent)
+        if row.status_code >= 500 or row.status_code in UNAVAILABLE_STATUSES or not row.status_code:
+            return RobotsRules(disallow_all=True, retry_at=row.expires_at)
+        return RobotsRules()
+
+    def _refresh(self, origin: str, row: Optional[RobotsTxt], now: datetime) -> RobotsTxt:
+        row = row or RobotsTxt(origin=origin)
+        headers = {}
+        if 200 <= row.status_code < 300:
+            if row.etag:
+                headers["If-None-Match"] = row.etag
+            if row.last_modified:
+                headers["If-Modified-Since"] = row.last_modified
+        host = urlparse(origin).hostname or ""
+        try:
+            if self.timer is not None:
+                with self.timer.stage("robots", host=host):
+                    status, body, response_headers = self._fetch(origin, headers)
+            else:
+                status, body, response_headers = self._fetch(origin, headers)
+        except httpx.HTTPError:
+            status, body, response_headers = 0, "", {}
+        ttl = self.ttl
+        if status == 304:
+            self.stats["not_modified"] += 1
+        elif status >= 500 or status in UNAVAILABLE_STATUSES or not status:
+            self.stats["unavailable"] += 1
+            ttl = min(ttl, RETRY_SECONDS)
+            if not 200 <= row.status_code < 300:
+                row.status_code, row.body = status, ""
+        else:
+            self.stats["fetched"] += 1
+            row.status_code = status
+            row.body = body if 200 <= status < 300 else ""
+            row.etag = response_headers.get("etag", "")[:255]
+            row.last_modified = response_headers.get("last-modified", "")[:64]
+            row.fetched_at = now
+        row.expires_at = now + timedelta(seconds=ttl)
+        if row.pk:
+            row.save()
+        else:
+            row, _ = RobotsTxt.objects.update_or_create(
+                origin=origin,
+                defaults={
+                    field: getattr(row, field)
+                    for field in ["status_code", "body", "etag", "last_modified", "fetched_at", "expires_at"]
+                },
+            )
+        return row
+
+    def _fetch(self, origin: str, headers: dict) -> tuple[int, str, httpx.Headers]:
+        with self.client.stream("GET", f"{origin}/robots.txt", headers=headers) as resp:
+            if resp.status_code != 200:
+                return resp.status_code, "", resp.headers
+            # RFC 9309 lets crawlers ignore anything past the first 500 KiB.
+            data = bytearray()
+            for chunk in resp.iter_bytes():
+                data.extend(chunk[:MAX_BODY_BYTES - len(data)])
+                if len(data) >= MAX_BODY_BYTES:
+                    break
+            return resp.status_code, data.decode(resp.encoding or "utf-8", errors="replace"), resp.headers
@@ -1,6 +1,27 @@
+from django.db.models import Case, OuterRef, Subquery, When
+from django.db.models.functions import Length, Substr
 from rest_framework import serializers
 
-from crawler.models import CrawlSeed, CrawlerConfig, CrawlLogEvent
+from crawler.blobs import BlobStore
+from crawler.models import ContentBlob, CrawlSeed, CrawlerConfig, CrawlLogEvent
+
+LOG_EXCERPT_CHARS = 200
+LOG_LIST_FIELDS = [
+    "id",
+    "run_id",
+    "queue_item_id",
+    "seed_url",
+    "url",
+    "step",
+    "level",
+    "message",
+    "excerpt",
+    "content_chars",
+    "content_bytes",
+    "content_digest",
+    "metadata",
+    "created_at",
+]
 
 
 class CrawlSeedSerializer(serializers.ModelSerializer):
@@ -13,10 +34,11 @@ class CrawlSeedSerializer(serializers.ModelSerializer):
             "is_active",
             "last_fetched_at",
             "last_error",
+            "sources_checked_at",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["last_fetched_at", "last_error", "created_at", "updated_at"]
+        read_only_fields = ["last_fetched_at", "last_error", "sources_checked_at", "created_at", "updated_at"]
 
 
 class CrawlerConfigSerializer(serializers.ModelSerializer):
@@ -32,6 +54,7 @@ class CrawlerConfigSerializer(serializers.ModelSerializer):
             "llm_temperature",
             "llm_max_output_tokens",
             "max_context_chars",
+            "max_page_bytes",
             "max_next_urls",
             "max_articles",
             "max_article_chars",
@@ -40,7 +63,24 @@ class CrawlerConfigSerializer(serializers.ModelSerializer):
             "request_delay_seconds",
             "user_agent",
             "allow_external_domains",
+            "respect_robots_txt",
             "prompt_template",
+            "log_retention_days",
+            "queue_retention_days",
+            "archive_retention_days",
+            "llm_run_token_budget",
+            "llm_daily_token_budget",
+            "llm_prompt_cost_per_million",
+            "llm_completion_cost_per_million",
+            "adaptive_batch_size",
+            "batch_size_min",
+            "batch_size_max",
+            "llm_context_tokens",
+            "llm_tokens_per_minute",
+            "discovery_enabled",
+            "discovery_interval_minutes",
+            "discovery_max_age_days",
+            "discovery_max_urls",
             "created_at",
             "updated_at",
         ]
@@ -60,7 +100,33 @@ class CrawlLogEventSerializer(serializers.ModelSerializer):
             "level",
             "message",
             "content",
+            "content_digest",
             "metadata",
             "created_at",
         ]
         read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.content_digest:
+            # Offloaded content keeps only an excerpt inline.
+            blob_texts = self.context.get("blob_texts")
+            if blob_texts is None:
+                data["content"] = BlobStore().get(instance.content_digest) or instance.content
+            else:
+                data["content"] = blob_texts.get(instance.content_digest, instance.content)
+        return data
+
+
+def project_log_events(queryset):
+    """Project log events for listings: an excerpt and sizes instead of the full content.
+
+    ``content_chars`` is the inline content length. Offloaded content keeps only an
+    excerpt inline, so its uncompressed size is reported as ``content_bytes`` instead.
+    """
+    blob_size = ContentBlob.objects.filter(digest=OuterRef("content_digest")).values("raw_size")[:1]
+    return queryset.annotate(
+        excerpt=Substr("content", 1, LOG_EXCERPT_CHARS),
+        content_chars=Case(When(content_digest="", then=Length("content"))),
+        content_bytes=Subquery(blob_size),
+    ).values(*LOG_LIST_FIELDS)
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import csv
+import logging
 import random
 import threading
 import time
+from collections import Counter
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import date, datetime, time as dt_time, timezone
 from typing import Iterable, Optional
 from urllib.parse import urljoin, urlparse
 
@@ -14,19 +15,88 @@ import re
 from bs4 import BeautifulSoup
 from dateutil import parser as dtparser
 from django.conf import settings
-from django.db import transaction
-from django.db.models import Q
+from django.db import connection, transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Now
 
+from articles.dedup import dedup_values, sync_fingerprints
 from articles.models import Article
-from crawler.llm import LLMClient
-from crawler.models import CrawlQueueItem, CrawlRun, CrawlSeed, CrawlerConfig, CrawlLogEvent
+from crawler.batching import BatchSizeController
+from crawler.blobs import BlobStore
+from crawler.counters import (
+    fold_counter_deltas,
+    queue_counts,
+    reconcile_if_stale,
+    record_articles,
+    record_llm_tokens,
+    record_transitions,
+    seed_counts,
+)
+from crawler.discovery import Discoverer
+from crawler.fetching import FetchedPage, stream_page
+from crawler.llm import USAGE_ESTIMATE, LLMClient, StubLLMClient
+from crawler.logsink import CrawlLogSink
+from crawler.metrics import REGISTRY, error_reason, publish_snapshot
+from crawler.models import (
+    ContentBlob,
+    CrawlQueueItem,
+    CrawlRun,
+    CrawlSeed,
+    CrawlerConfig,
+    CrawlLogEvent,
+    PageArchive,
+)
+from crawler.partitions import ensure_log_partitions
+from crawler.profiler import SlowPageRecorder, StackSampler
+from crawler.retention import seen_urls
+from crawler.robots import RobotsCache
+from crawler.timing import QueryAccountant, StageTimer
+
+logger = logging.getLogger(__name__)
+
+PROFILE_POLL_SECONDS = 10.0
+
+
+class ItemSkipped(RuntimeError):
+    """Fails the queue item without deactivating its seed."""
+
+
+class ItemDeferred(ItemSkipped):
+    """Returns the queue item to pending until ``retry_at``."""
+
+    def __init__(self, reason: str, retry_at: datetime) -> None:
+        super().__init__(reason)
+        self.retry_at = retry_at
 
 
 @dataclass
 class CrawlStats:
     pages_processed: int = 0
+    pages_failed: int = 0
     articles_created: int = 0
     queued_urls: int = 0
+    llm_calls: int = 0
+    llm_estimated_calls: int = 0
+    llm_prompt_tokens: int = 0
+    llm_completion_tokens: int = 0
+    llm_articles: int = 0
+
+    @property
+    def llm_tokens(self) -> int:
+        return self.llm_prompt_tokens + self.llm_completion_tokens
+
+
+def _split_tokens(total: int, weights: dict[str, int]) -> dict[str, int]:
+    """Split ``total`` in proportion to ``weights`` so the parts add up exactly."""
+    weight_sum = sum(weights.values())
+    if not weight_sum:
+        return {key: 0 for key in weights}
+    shares = {key: total * weight / weight_sum for key, weight in weights.items()}
+    parts = {key: int(share) for key, share in shares.items()}
+    leftover = total - sum(parts.values())
+    for key in sorted(shares, key=lambda key: parts[key] - shares[key])[:leftover]:
+        parts[key] += 1
+    return parts
 
 
 def get_config() -> CrawlerConfig:
@@ -37,92 +107,273 @@ def get_config() -> CrawlerConfig:
 
 
 class CrawlerService:
-    def __init__(self, config: Optional[CrawlerConfig] = None):
+    def __init__(self, config: Optional[CrawlerConfig] = None, *, stub_llm: bool = False):
         self.config = config or get_config()
         self.client = httpx.Client(
             timeout=getattr(settings, "CRAWLER_FETCH_TIMEOUT_SECONDS", 20),
             headers={"User-Agent": self.config.user_agent},
             follow_redirects=True,
         )
-        self.llm = LLMClient(self.config)
+        self.llm = StubLLMClient(self.config) if stub_llm else LLMClient(self.config)
         self.log_max_chars = int(getattr(settings, "CRAWLER_LOG_MAX_CHARS", 200000))
+        self.blob_store = BlobStore()
+        self.log_sink = CrawlLogSink(blob_store=self.blob_store)
+        self.archive_html = bool(getattr(settings, "CRAWLER_ARCHIVE_HTML", False)) and self.blob_store.enabled
+        self.timer = StageTimer()
+        self.queries = QueryAccountant(self.timer, budget=getattr(settings, "CRAWLER_STEP_QUERY_BUDGET", 0))
+        self.sampler: Optional[StackSampler] = None
+        self.slow_pages = SlowPageRecorder()
+        self._profile_checked = 0.0
+        self.llm_paused = ""
+        self._budget_day: Optional[date] = None
+        self._tokens_before_today = 0
+        self.batching: Optional[BatchSizeController] = None
+        self.robots = RobotsCache(self.client, self.config.user_agent, timer=self.timer)
+        self.max_crawl_delay = float(getattr(settings, "CRAWLER_ROBOTS_MAX_CRAWL_DELAY", 60))
+        self._host_ready: dict[str, float] = {}
+        self.discoverer = Discoverer(self.client, self.config, self.robots, url_filter=self._may_enqueue)
+        self.discovery: Counter = Counter()
+        self._discovered_at: Optional[float] = None
+        self._seed_offset = 0
+        self.replay_pages: Optional[dict[str, FetchedPage]] = None
+        self.replay_articles: dict[str, dict] = {}
 
     def close(self) -> None:
+        self.log_sink.close()
         self.client.close()
 
-    def run(self, run: Optional[CrawlRun] = None) -> CrawlRun:
+    def run(self, run: Optional[CrawlRun] = None, *, profile: Optional[bool] = None) -> CrawlRun:
         if run is None:
             run = CrawlRun.objects.create(
                 status=CrawlRun.STATUS_RUNNING,
+                profile_enabled=bool(profile),
             )
-        elif run.status != CrawlRun.STATUS_RUNNING:
+        elif run.status != CrawlRun.STATUS_RUNNING or profile is not None:
             run.status = CrawlRun.STATUS_RUNNING
             run.last_error = ""
-            run.save(update_fields=["status", "last_error"])
+            if profile is not None:
+                run.profile_enabled = profile
+            run.save(update_fields=["status", "last_error", "profile_enabled"])
         stats = CrawlStats()
+        self._sync_profiler(run, force=True)
         try:
-            self._ensure_seed_queue()
-            target_batch_size = max(1, len(self._active_seeds()))
-            pages_target = int(self.config.max_pages_per_run)
-            unlimited = pages_target <= 0
-            page_count = 0
-            while True:
-                if not unlimited and page_count >= pages_target:
-                    break
-                seeds = self._active_seeds()
-                batch = self._next_pending_batch(seeds, target_batch_size)
-                if not batch:
-                    break
-                processed = self._process_step(batch, stats, run, target_batch_size)
-                stats.pages_processed += processed
-                page_count += 1
-                time.sleep(max(0.0, float(self.config.request_delay_seconds)))
+            with connection.execute_wrapper(self.queries):
+                reconcile_if_stale()
+                ensure_log_partitions()
+                self._ensure_seed_queue()
+                self._discover(run, stats)
+                self.batching = self._batch_controller(len(self._active_seeds()))
+                pages_target = int(self.config.max_pages_per_run)
+                unlimited = pages_target <= 0
+                page_count = 0
+                self.queries.discard_step()
+                while True:
+                    if not unlimited and page_count >= pages_target:
+                        break
+                    self._discover(run, stats)
+                    step_started = time.perf_counter()
+                    before = (
+                        self.timer.totals["fetch"],
+                        self.timer.totals["llm"],
+                        stats.pages_failed,
+                        stats.llm_prompt_tokens,
+                        stats.llm_completion_tokens,
+                    )
+                    target_batch_size = self.batching.size
+                    seeds = self._active_seeds()
+                    with self.timer.stage("claim"):
+                        batch = self._next_pending_batch(seeds, target_batch_size)
+                    if not batch:
+                        break
+                    processed = self._process_step(batch, stats, run, target_batch_size)
+                    # Steps where every fetch failed end without a summary.
+                    self.queries.discard_step()
+                    stats.pages_processed += processed
+                    page_count += 1
+                    fold_counter_deltas()
+                    self._sync_profiler(run)
+                    if self.timer.registry is not None:
+                        publish_snapshot()
+                    self.batching.wait()
+                    self.batching.observe(
+                        pages=len(batch),
+                        failed=stats.pages_failed - before[2],
+                        seconds=time.perf_counter() - step_started,
+                        fetch_seconds=self.timer.totals["fetch"] - before[0],
+                        llm_seconds=self.timer.totals["llm"] - before[1],
+                        prompt_tokens=stats.llm_prompt_tokens - before[3],
+                        completion_tokens=stats.llm_completion_tokens - before[4],
+                    )
             run.status = CrawlRun.STATUS_DONE
         except Exception as exc:
             run.status = CrawlRun.STATUS_FAILED
             run.last_error = str(exc)[:2000]
         finally:
+            self.log_sink.flush()
             run.pages_processed = stats.pages_processed
             run.articles_created = stats.articles_created
             run.queued_urls = stats.queued_urls
+            run.llm_calls = stats.llm_calls
+            run.llm_prompt_tokens = stats.llm_prompt_tokens
+            run.llm_completion_tokens = stats.llm_completion_tokens
             run.ended_at = datetime.now(timezone.utc)
+            run.metrics = {**self.timer.summary(), "db": self.queries.summary(), "llm": self._llm_summary(stats)}
+            if self.batching is not None:
+                run.metrics["batching"] = self.batching.summary()
+            if self._discovered_at is not None:
+                run.metrics["discovery"] = dict(self.discovery)
+            if self.robots.stats:
+                run.metrics["robots"] = dict(self.robots.stats)
+            self._finish_profile(run)
             run.save(update_fields=[
                 "status",
                 "last_error",
                 "pages_processed",
                 "articles_created",
                 "queued_urls",
+                "llm_calls",
+                "llm_prompt_tokens",
+                "llm_completion_tokens",
                 "ended_at",
+                "metrics",
+                "profile_digest",
             ])
+            if self.timer.registry is not None:
+                publish_snapshot()
             self.close()
         return run
 
-    def export_articles_csv(self, writer: csv.writer) -> int:
-        rows = Article.objects.order_by("-published_at").values_list(
-            "published_at",
-            "fetched_at",
-            "source",
-            "url",
-            "title",
-            "body",
-            "language",
-        )
-        writer.writerow(["published_at", "fetched_at", "source", "url", "title", "body", "language"])
-        count = 0
-        for row in rows.iterator():
-            writer.writerow(row)
-            count += 1
-        return count
+    @property
+    def replaying(self) -> bool:
+        return self.replay_pages is not None
+
+    def replay(
+        self,
+        source_run: CrawlRun,
+        run: Optional[CrawlRun] = None,
+        limit: Optional[int] = None,
+    ) -> dict:
+        pages = PageArchive.objects.filter(run=source_run).order_by("created_at", "id")
+        if limit:
+            pages = pages[:limit]
+        pages = list(pages)
+        if run is None:
+            # Created as done so the post_save hook does not start a live crawl.
+            run = CrawlRun.objects.create(
+                status=CrawlRun.STATUS_DONE,
+                objective=source_run.objective,
+                use_llm_filtering=source_run.use_llm_filtering,
+                replay_of=source_run,
+            )
+        run.status = CrawlRun.STATUS_RUNNING
+        run.save(update_fields=["status"])
+        stats = CrawlStats()
+        self.replay_articles = {}
+        # Replays are offline benchmarks; keep them out of the live metrics.
+        self.timer.registry = None
+        target_size = max(1, len({page.seed_url or page.url for page in pages}))
+        started = time.perf_counter()
+        self._sync_profiler(run, force=True)
+        try:
+            with connection.execute_wrapper(self.queries):
+                for offset in range(0, len(pages), target_size):
+                    batch = pages[offset:offset + target_size]
+                    with self.timer.stage("replay_load"):
+                        html_by_digest = self.blob_store.get_many(page.html_digest for page in batch)
+                    self.replay_pages = {
+                        page.url: FetchedPage(
+                            status_code=page.status_code,
+                            content_type=page.content_type,
+                            text=html_by_digest.get(page.html_digest, ""),
+                            url=page.url,
+                        )
+                        for page in batch
+                    }
+                    items = [
+                        CrawlQueueItem(url=page.url, seed_url=page.seed_url, depth=0)
+                        for page in batch
+                    ]
+                    stats.pages_processed += self._process_step(items, stats, run, target_size)
+                    self.queries.discard_step()
+            run.status = CrawlRun.STATUS_DONE
+        except Exception as exc:
+            run.status = CrawlRun.STATUS_FAILED
+            run.last_error = str(exc)[:2000]
+        finally:
+            elapsed = time.perf_counter() - started
+            self.replay_pages = None
+            self.log_sink.flush()
+            run.pages_processed = stats.pages_processed
+            run.articles_created = stats.articles_created
+            run.llm_calls = stats.llm_calls
+            run.llm_prompt_tokens = stats.llm_prompt_tokens
+            run.llm_completion_tokens = stats.llm_completion_tokens
+            run.ended_at = datetime.now(timezone.utc)
+            run.metrics = {**self.timer.summary(), "db": self.queries.summary(), "llm": self._llm_summary(stats)}
+            self._finish_profile(run)
+            run.save(update_fields=[
+                "status",
+                "last_error",
+                "pages_processed",
+                "articles_created",
+                "llm_calls",
+                "llm_prompt_tokens",
+                "llm_completion_tokens",
+                "ended_at",
+                "metrics",
+                "profile_digest",
+            ])
+            self.close()
+        return {
+            "source_run": source_run.id,
+            "replay_run": run.id,
+            "status": run.status,
+            "pages": stats.pages_processed,
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_second": round(stats.pages_processed / elapsed, 2) if elapsed > 0 else None,
+            "stages": self.timer.report(),
+            "diff": self._diff_replay_articles(source_run),
+        }
+
+    def _diff_replay_articles(self, source_run: CrawlRun, preview: int = 20) -> dict:
+        # Articles have no run link; anything fetched while the source run was
+        # active is attributed to it.
+        original_qs = Article.objects.filter(fetched_at__gte=source_run.started_at)
+        if source_run.ended_at:
+            original_qs = original_qs.filter(fetched_at__lte=source_run.ended_at)
+        original = dict(original_qs.values_list("url", "title"))
+        replayed = {url: entry["title"] for url, entry in self.replay_articles.items()}
+        added = sorted(set(replayed) - set(original))
+        removed = sorted(set(original) - set(replayed))
+        changed = sorted(url for url in set(original) & set(replayed) if original[url] != replayed[url])
+        return {
+            "original": len(original),
+            "replayed": len(replayed),
+            "added": len(added),
+            "removed": len(removed),
+            "title_changed": len(changed),
+            "added_preview": added[:preview],
+            "removed_preview": removed[:preview],
+            "title_changed_preview": [
+                {"url": url, "original": original[url], "replayed": replayed[url]} for url in changed[:preview]
+            ],
+        }
 
     def _ensure_seed_queue(self) -> None:
         if CrawlQueueItem.objects.filter(status=CrawlQueueItem.STATUS_PENDING).exists():
             return
         seeds = self._active_seeds()
+        pruned = seen_urls(seed.url for seed in seeds)
         for seed in seeds:
-            CrawlQueueItem.objects.get_or_create(
-                url=seed.url,
-                defaults={"seed": seed, "seed_url": seed.url, "depth": 0},
-            )
+            if seed.url in pruned:
+                continue
+            with transaction.atomic():
+                _, created = CrawlQueueItem.objects.get_or_create(
+                    url=seed.url,
+                    defaults={"seed": seed, "seed_url": seed.url, "depth": 0},
+                )
+                if created:
+                    record_transitions([seed.url], None, CrawlQueueItem.STATUS_PENDING)
 
     def _active_seeds(self) -> list[CrawlSeed]:
         return list(
@@ -131,9 +382,86 @@ class CrawlerService:
             ).order_by("url")
         )
 
+    def _discover(self, run: CrawlRun, stats: CrawlStats) -> None:
+        if not self.config.discovery_enabled or self.replaying:
+            return
+        interval = 60.0 * float(self.config.discovery_interval_minutes)
+        now = time.monotonic()
+        if self._discovered_at is not None and now - self._discovered_at < interval:
+            return
+        self._discovered_at = now
+        for seed in self._active_seeds():
+            try:
+                with self.timer.stage("discover", host=REGISTRY.host_label(seed.url)):
+                    results, queued = self.discoverer.discover(seed)
+            except Exception as exc:
+                self.discovery["errors"] += 1
+                self._log_event(
+                    run=run,
+                    step=CrawlLogEvent.STEP_DISCOVERY,
+                    message="Discovery failed",
+                    content=str(exc),
+                    level=CrawlLogEvent.LEVEL_WARN,
+                    seed_url=seed.url,
+                )
+                continue
+            if not results:
+                continue
+            stats.queued_urls += queued
+            sources = []
+            for result in results:
+                self.discovery["sources_read"] += 1
+                self.discovery["not_modified"] += int(result.not_modified)
+                self.discovery["truncated"] += int(result.truncated)
+                self.discovery["errors"] += int(bool(result.error))
+                self.discovery["bytes_read"] += result.bytes_read
+                self.discovery["urls_found"] += len(result.urls)
+                sources.append({
+                    "url": result.source.url,
+                    "kind": result.source.kind,
+                    "status": result.status,
+                    "not_modified": result.not_modified,
+                    "truncated": result.truncated,
+                    "bytes": result.bytes_read,
+                    "urls": len(result.urls),
+                    "sitemaps": len(result.sitemaps),
+                    "error": result.error,
+                    "ms": round(result.seconds * 1000, 1),
+                })
+            self.discovery["urls_queued"] += queued
+            failed = any(result.error for result in results)
+            self._log_event(
+                run=run,
+                step=CrawlLogEvent.STEP_DISCOVERY,
+                message=f"Queued {queued} URLs from {len(results)} sitemaps and feeds",
+                metadata={"queued": queued, "sources": sources},
+                level=CrawlLogEvent.LEVEL_WARN if failed else CrawlLogEvent.LEVEL_INFO,
+                seed_url=seed.url,
+            )
+
+    def _batch_controller(self, seed_count: int) -> BatchSizeController:
+        llm_active = self.config.llm_enabled
+        return BatchSizeController(
+            initial=max(1, seed_count),
+            min_size=self.config.batch_size_min,
+            max_size=self.config.batch_size_max,
+            adaptive=self.config.adaptive_batch_size,
+            context_tokens=self.config.llm_context_tokens if llm_active else 0,
+            output_tokens=self.config.llm_max_output_tokens,
+            tokens_per_minute=self.config.llm_tokens_per_minute if llm_active else 0,
+        )
+
     def _next_pending_batch(self, seeds: list[CrawlSeed], target_size: int) -> list[CrawlQueueItem]:
         batch: list[CrawlQueueItem] = []
+        if seeds:
+            # Rotate the starting seed so batches smaller than the seed list
+            # still visit every seed in turn.
+            start = self._seed_offset % len(seeds)
+            seeds = seeds[start:] + seeds[:start]
         for seed in seeds:
+            if len(batch) >= target_size:
+                break
+            self._seed_offset += 1
             item = self._claim_next_pending_for_seed(seed)
             if item:
                 batch.append(item)
@@ -141,21 +469,34 @@ class CrawlerService:
             batch.extend(self._claim_next_pending_any(target_size - len(batch), batch))
         return batch
 
+    def _pending_for_seed_queryset(self, seed: CrawlSeed):
+        return (
+            CrawlQueueItem.objects.select_for_update(skip_locked=True)
+            .filter(status=CrawlQueueItem.STATUS_PENDING)
+            .filter(Q(available_at__isnull=True) | Q(available_at__lte=Now()))
+            .filter(Q(seed=seed) | Q(seed__isnull=True, seed_url=seed.url))
+            .order_by("-priority", "discovered_at")
+        )
+
+    def _pending_any_queryset(self, exclude_ids: Iterable[int] = ()):
+        return (
+            CrawlQueueItem.objects.select_for_update(skip_locked=True)
+            .filter(status=CrawlQueueItem.STATUS_PENDING)
+            .filter(Q(available_at__isnull=True) | Q(available_at__lte=Now()))
+            .exclude(id__in=exclude_ids)
+            .order_by("-priority", "discovered_at")
+        )
+
     def _claim_next_pending_for_seed(self, seed: CrawlSeed) -> Optional[CrawlQueueItem]:
         with transaction.atomic():
-            item = (
-                CrawlQueueItem.objects.select_for_update(skip_locked=True)
-                .filter(status=CrawlQueueItem.STATUS_PENDING)
-                .filter(Q(seed=seed) | Q(seed__isnull=True, seed_url=seed.url))
-                .order_by("discovered_at")
-                .first()
-            )
+            item = self._pending_for_seed_queryset(seed).first()
             if not item:
                 return None
             item.status = CrawlQueueItem.STATUS_IN_PROGRESS
             item.attempts += 1
             item.last_attempt_at = datetime.now(timezone.utc)
             item.save(update_fields=["status", "attempts", "last_attempt_at"])
+            record_transitions([item.seed_url], CrawlQueueItem.STATUS_PENDING, CrawlQueueItem.STATUS_IN_PROGRESS)
             return item
 
     def _claim_next_pending_any(
@@ -167,19 +508,14 @@ class CrawlerService:
         exclude_ids = {item.id for item in existing if item.id}
         for _ in range(limit):
             with transaction.atomic():
-                item = (
-                    CrawlQueueItem.objects.select_for_update(skip_locked=True)
-                    .filter(status=CrawlQueueItem.STATUS_PENDING)
-                    .exclude(id__in=exclude_ids)
-                    .order_by("discovered_at")
-                    .first()
-                )
+                item = self._pending_any_queryset(exclude_ids).first()
                 if not item:
                     break
                 item.status = CrawlQueueItem.STATUS_IN_PROGRESS
                 item.attempts += 1
                 item.last_attempt_at = datetime.now(timezone.utc)
                 item.save(update_fields=["status", "attempts", "last_attempt_at"])
+                record_transitions([item.seed_url], CrawlQueueItem.STATUS_PENDING, CrawlQueueItem.STATUS_IN_PROGRESS)
                 claimed.append(item)
                 exclude_ids.add(item.id)
         return claimed
@@ -194,21 +530,42 @@ class CrawlerService:
         seed_payloads = []
         candidate_pool: list[str] = []
         failed_items: list[CrawlQueueItem] = []
+        # Failures that leave the seed active, and items put back for later.
+        skipped_ids: set[int] = set()
+        deferred_items: list[CrawlQueueItem] = []
         seed_map: dict[str, CrawlSeed] = {}
         seed_depth: dict[str, int] = {}
 
-        for item in items:
+        # Fetch hosts that are free first so per-host spacing overlaps other fetches.
+        for item in sorted(items, key=lambda item: self._host_ready.get(urlparse(item.url).netloc, 0.0)):
             seed_url = item.seed_url or item.url
             if item.seed:
                 seed_map[seed_url] = item.seed
             seed_depth[seed_url] = min(item.depth, seed_depth.get(seed_url, item.depth))
+            host = REGISTRY.host_label(item.url)
+            self.timer.count("crawler_pages_total", host=host)
             try:
-                resp = self.client.get(item.url)
+                if not self._robots_allowed(item.url):
+                    retry_at = self.robots.retry_at(item.url)
+                    if retry_at is not None:
+                        raise ItemDeferred("robots_unavailable", retry_at)
+                    raise ItemSkipped("robots_disallowed")
+                self._wait_for_host(item.url, host)
+                with self.timer.stage("fetch", host=host):
+                    resp = self._fetch_page(item)
+                fetched_bytes = resp.size or len((resp.text or "").encode("utf-8"))
+                self.timer.count("crawler_fetch_bytes_total", fetched_bytes, host=host)
                 if resp.status_code >= 400:
                     raise RuntimeError(f"http_{resp.status_code}")
+                if resp.unsupported:
+                    raise ItemSkipped(f"unsupported_content_type: {resp.content_type.split(';', 1)[0].strip()}")
+                if resp.truncated:
+                    self.timer.count("crawler_fetch_truncated_total", host=host)
 
-                content_type = resp.headers.get("content-type", "")
+                content_type = resp.content_type
                 body_chars = len(resp.text or "")
+                if self.archive_html and not self.replaying:
+                    self._archive_page(run, item, seed_url, resp.status_code, content_type, resp.text or "")
                 self._log_event(
                     run=run,
                     item=item,
@@ -216,15 +573,23 @@ class CrawlerService:
                     url=item.url,
                     step=CrawlLogEvent.STEP_FETCH_RESPONSE,
                     message="Fetched response",
-                    content=f"status={resp.status_code} content_type={content_type} chars={body_chars}",
+                    content=(
+                        f"status={resp.status_code} content_type={content_type} chars={body_chars} "
+                        f"bytes={fetched_bytes} truncated={resp.truncated}"
+                    ),
                     metadata={
                         "status_code": resp.status_code,
                         "content_type": content_type,
                         "chars": body_chars,
+                        "bytes": fetched_bytes,
+                        "truncated": resp.truncated,
+                        "encoding": resp.encoding,
                     },
+                    level=CrawlLogEvent.LEVEL_WARN if resp.truncated else CrawlLogEvent.LEVEL_INFO,
                 )
 
-                cleaned_text = self._clean_html(resp.text)
+                with self.timer.stage("clean"), self.slow_pages.measure("clean", item.url, resp.text):
+                    cleaned_text = self._clean_html(resp.text)
                 if not cleaned_text:
                     raise RuntimeError("empty_context")
 
@@ -239,7 +604,8 @@ class CrawlerService:
                     metadata={"chars": len(cleaned_text or "")},
                 )
 
-                candidate_urls = self._extract_candidate_urls(resp.text, item.url, seed_url)
+                with self.timer.stage("links"), self.slow_pages.measure("links", item.url, resp.text):
+                    candidate_urls = self._extract_candidate_urls(resp.text, resp.url or item.url, seed_url)
                 candidate_pool.extend(candidate_urls)
                 seed_payloads.append(
                     {
@@ -251,6 +617,23 @@ class CrawlerService:
                         "candidate_urls": candidate_urls,
                     }
                 )
+            except ItemDeferred as exc:
+                self._log_event(
+                    run=run,
+                    item=item,
+                    seed_url=seed_url,
+                    url=item.url,
+                    step=CrawlLogEvent.STEP_ERROR,
+                    level=CrawlLogEvent.LEVEL_WARN,
+                    message="Fetch deferred",
+                    content=str(exc),
+                    metadata={"retry_at": exc.retry_at.isoformat()},
+                )
+                self.timer.count("crawler_page_errors_total", host=host, reason=error_reason(exc))
+                item.status = CrawlQueueItem.STATUS_PENDING
+                item.available_at = exc.retry_at
+                item.last_error = str(exc)
+                deferred_items.append(item)
             except Exception as exc:
                 self._log_event(
                     run=run,
@@ -262,12 +645,36 @@ class CrawlerService:
                     message="Fetch failed",
                     content=str(exc),
                 )
+                self.timer.count("crawler_page_errors_total", host=host, reason=error_reason(exc))
                 item.status = CrawlQueueItem.STATUS_FAILED
                 item.last_error = str(exc)[:2000]
                 failed_items.append(item)
+                if isinstance(exc, ItemSkipped):
+                    skipped_ids.add(item.id)
+        stats.pages_failed += len(failed_items)
 
+        if deferred_items and not self.replaying:
+            with transaction.atomic():
+                for item in deferred_items:
+                    item.save(update_fields=["status", "available_at", "last_error"])
+                record_transitions(
+                    [item.seed_url for item in deferred_items],
+                    CrawlQueueItem.STATUS_IN_PROGRESS,
+                    CrawlQueueItem.STATUS_PENDING,
+                )
+        if failed_items and not self.replaying:
+            with transaction.atomic():
+                for item in failed_items:
+                    item.save(update_fields=["status", "last_error"])
+                record_transitions(
+                    [item.seed_url for item in failed_items],
+                    CrawlQueueItem.STATUS_IN_PROGRESS,
+                    CrawlQueueItem.STATUS_FAILED,
+                    fetched=True,
+                )
         for item in failed_items:
-            item.save(update_fields=["status", "last_error"])
+            if self.replaying or item.id in skipped_ids:
+                continue
             if item.seed:
                 item.seed.last_fetched_at = datetime.now(timezone.utc)
                 item.seed.last_error = item.last_error or ""
@@ -279,16 +686,18 @@ class CrawlerService:
 
         seed_urls = [payload["seed_url"] for payload in seed_payloads]
         unique_seed_urls = list(dict.fromkeys(seed_urls))
-        context = self._build_context(seed_payloads)
-        candidate_block = self._build_candidate_block(seed_payloads)
-        prompt = self._build_prompt(
-            seed_urls=unique_seed_urls,
-            context=context,
-            candidate_urls=candidate_block,
-            objective=run.objective,
-        )
+        with self.timer.stage("prompt"):
+            context = self._build_context(seed_payloads)
+            candidate_block = self._build_candidate_block(seed_payloads)
+            prompt = self._build_prompt(
+                seed_urls=unique_seed_urls,
+                context=context,
+                candidate_urls=candidate_block,
+                objective=run.objective,
+            )
 
-        used_llm = run.use_llm_filtering and self.llm.enabled
+        llm_paused = self._llm_pause_reason(run, stats) if run.use_llm_filtering and self.llm.enabled else ""
+        used_llm = run.use_llm_filtering and self.llm.enabled and not llm_paused
         candidate_preview = [u for u in dict.fromkeys(candidate_pool) if u][:20]
         self._log_event(
             run=run,
@@ -297,14 +706,30 @@ class CrawlerService:
             content=context,
             metadata={
                 "used_llm": used_llm,
+                "llm_paused": llm_paused,
                 "seed_urls": unique_seed_urls,
                 "candidate_count": len(candidate_pool),
                 "candidate_preview": candidate_preview,
                 "objective": (run.objective or "").strip(),
             },
         )
-        result = self.llm.extract(prompt) if used_llm else None
+        result = None
         if used_llm:
+            provider = self.llm.last_provider
+            with self.timer.stage("llm", provider=provider):
+                result = self.llm.extract(prompt)
+            self.timer.count("crawler_llm_prompt_bytes_total", len(prompt.encode("utf-8")), provider=provider)
+            self.timer.count(
+                "crawler_llm_output_bytes_total",
+                len((self.llm.last_output_text or "").encode("utf-8")),
+                provider=provider,
+            )
+            for kind, tokens in self.llm.last_usage.items():
+                self.timer.count("crawler_llm_tokens_total", tokens, provider=provider, kind=kind)
+            if self.llm.last_error:
+                self.timer.count("crawler_llm_errors_total", provider=provider, error=self.llm.last_error)
+        if used_llm:
+            usage = self._account_llm_usage(run, stats, seed_payloads)
             self._log_event(
                 run=run,
                 step=CrawlLogEvent.STEP_LLM_OUTPUT,
@@ -315,6 +740,7 @@ class CrawlerService:
                     "model": self.llm.last_model,
                     "status_code": self.llm.last_status_code,
                     "error": self.llm.last_error,
+                    "usage": usage,
                 },
             )
 
@@ -333,14 +759,23 @@ class CrawlerService:
                     },
                 )
             created = 0
+            articles_by_seed: dict[str, int] = {}
             for payload in seed_payloads:
-                payload_articles = self._extract_articles_without_llm(
-                    payload["html"],
-                    payload["cleaned_text"],
-                    payload["url"],
-                )
-                created += self._store_articles(payload_articles, payload["url"])
+                with self.timer.stage("heuristic_extract"), self.slow_pages.measure(
+                    "heuristic_extract", payload["url"], payload["html"]
+                ):
+                    payload_articles = self._extract_articles_without_llm(
+                        payload["html"],
+                        payload["cleaned_text"],
+                        payload["url"],
+                    )
+                with self.timer.stage("store"):
+                    stored = self._store_articles(payload_articles, payload["url"])
+                created += stored
+                seed_key = payload["item"].seed_url
+                articles_by_seed[seed_key] = articles_by_seed.get(seed_key, 0) + stored
             stats.articles_created += created
+            self.timer.count("crawler_articles_created_total", created)
             next_urls = self._select_next_urls(candidate_pool, limit=target_size)
             selections = self._assign_next_urls(
                 [],
@@ -350,10 +785,15 @@ class CrawlerService:
                 candidate_pool,
             )
         else:
-            stats.articles_created += self._store_articles(
-                result.articles,
-                seed_payloads[0]["url"],
-            )
+            with self.timer.stage("store"):
+                created = self._store_articles(
+                    result.articles,
+                    seed_payloads[0]["url"],
+                )
+            stats.articles_created += created
+            stats.llm_articles += created
+            self.timer.count("crawler_articles_created_total", created)
+            articles_by_seed = {seed_payloads[0]["item"].seed_url: created}
             selections = self._assign_next_urls(
                 result.next_urls_by_seed,
                 result.next_urls,
@@ -362,8 +802,27 @@ class CrawlerService:
                 candidate_pool,
             )
 
-        added = self._enqueue_next_urls_by_seed(selections, seed_map, seed_depth)
+        added = 0
+        if not self.replaying:
+            with self.timer.stage("enqueue"):
+                added = self._enqueue_next_urls_by_seed(selections, seed_map, seed_depth)
         stats.queued_urls += added
+        self.timer.count("crawler_urls_enqueued_total", added)
+
+        if not self.replaying:
+            with self.timer.stage("complete"):
+                self._mark_done([payload["item"] for payload in seed_payloads], articles_by_seed)
+                for payload in seed_payloads:
+                    item = payload["item"]
+                    if item.seed:
+                        item.seed.last_fetched_at = datetime.now(timezone.utc)
+                        item.seed.last_error = ""
+                        item.seed.save(update_fields=["last_fetched_at", "last_error"])
+
+        # Logged last so the query totals cover the whole step, claim included.
+        db = self.queries.take_step()
+        if db.get("over_budget"):
+            logger.warning("Crawl step issued %s queries (budget %s)", db["queries"], db["budget"])
         self._log_event(
             run=run,
             step=CrawlLogEvent.STEP_NEXT_STEP,
@@ -372,20 +831,163 @@ class CrawlerService:
                 "queued_urls": added,
                 "selections": [{"seed_url": s, "next_url": u} for s, u in selections],
                 "articles_created": stats.articles_created,
+                "db": db,
             },
+            level=CrawlLogEvent.LEVEL_WARN if db.get("over_budget") else CrawlLogEvent.LEVEL_INFO,
         )
+        return len(items)
 
+    def _llm_pause_reason(self, run: CrawlRun, stats: CrawlStats) -> str:
+        if self.llm_paused:
+            return self.llm_paused
+        run_budget = int(self.config.llm_run_token_budget)
+        daily_budget = int(self.config.llm_daily_token_budget)
+        reason, limit, used = "", 0, stats.llm_tokens
+        if run_budget and stats.llm_tokens >= run_budget:
+            reason, limit = "run_budget", run_budget
+        elif daily_budget:
+            today = datetime.now(timezone.utc).date()
+            if self._budget_day != today:
+                self._budget_day = today
+                self._tokens_before_today = self._tokens_spent_since(today, run)
+            used = self._tokens_before_today + stats.llm_tokens
+            if used >= daily_budget:
+                reason, limit = "daily_budget", daily_budget
+        if reason:
+            self.llm_paused = reason
+            self._log_event(
+                run=run,
+                step=CrawlLogEvent.STEP_ERROR,
+                level=CrawlLogEvent.LEVEL_WARN,
+                message="LLM token budget spent, using heuristic extraction",
+                metadata={"reason": reason, "budget": limit, "used": used},
+            )
+        return reason
+
+    @staticmethod
+    def _tokens_spent_since(day: date, run: CrawlRun) -> int:
+        # Runs count toward the UTC day they started on.
+        totals = (
+            CrawlRun.objects.filter(started_at__gte=datetime.combine(day, dt_time.min, tzinfo=timezone.utc))
+            .exclude(pk=run.pk)
+            .aggregate(tokens=Sum(F("llm_prompt_tokens") + F("llm_completion_tokens")))
+        )
+        return int(totals["tokens"] or 0)
+
+    def _llm_cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return round(
+            (
+                prompt_tokens * float(self.config.llm_prompt_cost_per_million)
+                + completion_tokens * float(self.config.llm_completion_cost_per_million)
+            ) / 1_000_000,
+            6,
+        )
+
+    def _account_llm_usage(self, run: CrawlRun, stats: CrawlStats, seed_payloads: list[dict]) -> dict:
+        usage = self.llm.last_usage
+        prompt_tokens = int(usage.get("prompt", 0))
+        completion_tokens = int(usage.get("completion", 0))
+        if not prompt_tokens and not completion_tokens:
+            return {}
+        stats.llm_calls += 1
+        stats.llm_estimated_calls += int(self.llm.last_usage_source == USAGE_ESTIMATE)
+        stats.llm_prompt_tokens += prompt_tokens
+        stats.llm_completion_tokens += completion_tokens
+        # Seeds share one prompt; split its tokens by each seed's share of the context.
+        weights: dict[str, int] = {}
         for payload in seed_payloads:
-            item = payload["item"]
-            item.status = CrawlQueueItem.STATUS_DONE
-            item.last_error = ""
-            item.save(update_fields=["status", "last_error"])
-            if item.seed:
-                item.seed.last_fetched_at = datetime.now(timezone.utc)
-                item.seed.last_error = ""
-                item.seed.save(update_fields=["last_fetched_at", "last_error"])
+            seed_url = payload["item"].seed_url
+            weights[seed_url] = weights.get(seed_url, 0) + len(payload["cleaned_text"] or "") + 1
+        prompt_split = _split_tokens(prompt_tokens, weights)
+        completion_split = _split_tokens(completion_tokens, weights)
+        if not self.replaying:
+            record_llm_tokens({seed_url: (prompt_split[seed_url], completion_split[seed_url]) for seed_url in weights})
+        # Persisted as it accrues so a concurrent run's daily budget sees it.
+        CrawlRun.objects.filter(pk=run.pk).update(
+            llm_calls=stats.llm_calls,
+            llm_prompt_tokens=stats.llm_prompt_tokens,
+            llm_completion_tokens=stats.llm_completion_tokens,
+        )
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "source": self.llm.last_usage_source,
+            "cost": self._llm_cost(prompt_tokens, completion_tokens),
+            "by_seed": {
+                seed_url: {"prompt_tokens": prompt_split[seed_url], "completion_tokens": completion_split[seed_url]}
+                for seed_url in weights
+            },
+            "run_tokens": stats.llm_tokens,
+        }
 
-        return len(items)
+    def _llm_summary(self, stats: CrawlStats) -> dict:
+        return {
+            "calls": stats.llm_calls,
+            "estimated_calls": stats.llm_estimated_calls,
+            "prompt_tokens": stats.llm_prompt_tokens,
+            "completion_tokens": stats.llm_completion_tokens,
+            "total_tokens": stats.llm_tokens,
+            "cost": self._llm_cost(stats.llm_prompt_tokens, stats.llm_completion_tokens),
+            "articles": stats.llm_articles,
+            "tokens_per_article": round(stats.llm_tokens / stats.llm_articles, 1) if stats.llm_articles else None,
+            "paused": self.llm_paused,
+        }
+
+    def _sync_profiler(self, run: CrawlRun, force: bool = False) -> None:
+        # ``profile_enabled`` can be flipped on a live run from the API or the
+        # admin; the flag is re-read at most every PROFILE_POLL_SECONDS.
+        now = time.monotonic()
+        if not force:
+            if now - self._profile_checked < PROFILE_POLL_SECONDS:
+                return
+            run.profile_enabled = bool(
+                CrawlRun.objects.filter(pk=run.pk).values_list("profile_enabled", flat=True).first()
+            )
+        self._profile_checked = now
+        if run.profile_enabled:
+            if self.sampler is None:
+                self.sampler = StackSampler(threading.get_ident())
+            self.sampler.start()
+        elif self.sampler is not None:
+            self.sampler.stop()
+
+    def _finish_profile(self, run: CrawlRun) -> None:
+        # Artifacts go to the database blob backend when offloading is disabled.
+        store = self.blob_store if self.blob_store.enabled else BlobStore(ContentBlob.BACKEND_DB)
+        profile: dict = {}
+        if self.sampler is not None:
+            self.sampler.stop()
+            profile.update(self.sampler.summary())
+            stacks = self.sampler.collapsed()
+            if stacks:
+                if run.profile_digest:
+                    store.release([run.profile_digest])
+                run.profile_digest = store.put(stacks)
+        if self.slow_pages.pages:
+            digests = store.put_many(page["html"] for page in self.slow_pages.pages)
+            profile["slow_pages"] = [
+                {key: value for key, value in page.items() if key != "html"} | {"html_digest": digest}
+                for page, digest in zip(self.slow_pages.pages, digests)
+            ]
+            profile["slow_pages_skipped"] = self.slow_pages.skipped
+        if profile:
+            profile["slow_page_cpu_seconds"] = self.slow_pages.threshold
+            run.metrics["profile"] = profile
+
+    def _mark_done(self, items: list[CrawlQueueItem], articles_by_seed: Optional[dict[str, int]] = None) -> None:
+        with transaction.atomic():
+            for item in items:
+                item.status = CrawlQueueItem.STATUS_DONE
+                item.last_error = ""
+                item.save(update_fields=["status", "last_error"])
+            record_transitions(
+                [item.seed_url for item in items],
+                CrawlQueueItem.STATUS_IN_PROGRESS,
+                CrawlQueueItem.STATUS_DONE,
+                fetched=True,
+            )
+            record_articles(articles_by_seed or {})
 
     def _log_event(
         self,
@@ -409,16 +1011,74 @@ class CrawlerService:
         meta = dict(metadata or {})
         if clip_meta:
             meta.update(clip_meta)
-        CrawlLogEvent.objects.create(
+        with self.timer.stage("log"):
+            self.log_sink.add(CrawlLogEvent(
+                run=run,
+                queue_item=item if item and item.pk else None,
+                seed_url=seed_url or "",
+                url=url or "",
+                step=step,
+                level=level,
+                message=message,
+                content=clipped_content,
+                metadata=meta,
+            ))
+
+    def _robots_allowed(self, url: str) -> bool:
+        if not self.config.respect_robots_txt or self.replaying:
+            return True
+        if self.robots.allowed(url):
+            return True
+        self.timer.count("crawler_robots_blocked_total", host=REGISTRY.host_label(url))
+        return False
+
+    def _may_enqueue(self, url: str) -> bool:
+        return self._is_useful_url(url) and self._robots_allowed(url)
+
+    def _host_delay(self, url: str) -> float:
+        delay = max(0.0, float(self.config.request_delay_seconds))
+        if self.config.respect_robots_txt:
+            crawl_delay = self.robots.crawl_delay(url)
+            if crawl_delay:
+                delay = max(delay, min(crawl_delay, self.max_crawl_delay))
+        return delay
+
+    def _wait_for_host(self, url: str, host: str) -> None:
+        if self.replaying:
+            return
+        netloc = urlparse(url).netloc
+        pause = self._host_ready.get(netloc, 0.0) - time.monotonic()
+        if pause > 0:
+            with self.timer.stage("wait", host=host):
+                time.sleep(pause)
+        self._host_ready[netloc] = time.monotonic() + self._host_delay(url)
+
+    def _fetch_page(self, item: CrawlQueueItem) -> FetchedPage:
+        if self.replay_pages is not None:
+            page = self.replay_pages.get(item.url)
+            if page is None:
+                raise RuntimeError("replay_missing_page")
+            return page
+        return stream_page(self.client, item.url, max_bytes=int(self.config.max_page_bytes))
+
+    def _archive_page(
+        self,
+        run: CrawlRun,
+        item: CrawlQueueItem,
+        seed_url: str,
+        status_code: int,
+        content_type: str,
+        html: str,
+    ) -> None:
+        PageArchive.objects.create(
             run=run,
             queue_item=item,
-            seed_url=seed_url or "",
-            url=url or "",
-            step=step,
-            level=level,
-            message=message,
-            content=clipped_content,
-            metadata=meta,
+            seed_url=seed_url,
+            url=item.url,
+            status_code=status_code,
+            content_type=content_type[:255],
+            html_digest=self.blob_store.put(html),
+            html_chars=len(html),
         )
 
     def _clip_log(self, text: str) -> tuple[str, dict]:
@@ -528,8 +1188,8 @@ class CrawlerService:
         seed_depth: dict[str, int],
     ) -> int:
         count = 0
+        entries = []
         for seed_url, url in selections:
-            seed = seed_map.get(seed_url)
             depth = seed_depth.get(seed_url, 0)
             if self.config.max_depth > 0 and depth >= self.config.max_depth:
                 continue
@@ -538,14 +1198,25 @@ class CrawlerService:
                 continue
             if not url.startswith(("http://", "https://")):
                 url = urljoin(seed_url, url)
-            _, created = CrawlQueueItem.objects.get_or_create(
-                url=url,
-                defaults={
-                    "seed": seed,
-                    "seed_url": seed_url,
-                    "depth": depth + 1,
-                },
-            )
+            if not self._robots_allowed(url):
+                continue
+            entries.append((seed_url, url, depth))
+        pruned = seen_urls(url for _, url, _ in entries)
+        for seed_url, url, depth in entries:
+            if url in pruned:
+                continue
+            seed = seed_map.get(seed_url)
+            with transaction.atomic():
+                _, created = CrawlQueueItem.objects.get_or_create(
+                    url=url,
+                    defaults={
+                        "seed": seed,
+                        "seed_url": seed_url,
+                        "depth": depth + 1,
+                    },
+                )
+                if created:
+                    record_transitions([seed_url], None, CrawlQueueItem.STATUS_PENDING)
             if created:
                 count += 1
         return count
@@ -704,18 +1375,24 @@ class CrawlerService:
             if published_at is None:
                 published_at = datetime.now(timezone.utc)
             source = (entry.get("source") or "").strip() or urlparse(url).netloc
-            article, created_flag = Article.objects.update_or_create(
-                url=url,
-                defaults={
-                    "source": source,
-                    "published_at": published_at,
-                    "fetched_at": datetime.now(timezone.utc),
-                    "title": title,
-                    "body": body,
-                    "language": "",
-                },
-            )
-            if created_flag:
+            if self.replaying:
+                if url not in self.replay_articles:
+                    created += 1
+                self.replay_articles[url] = {"title": title, "body_chars": len(body), "source": source}
+                continue
+            defaults = {
+                "source": source,
+                "published_at": published_at,
+                "fetched_at": datetime.now(timezone.utc),
+                "title": title,
+                "body": body,
+                "language": "",
+            }
+            fingerprints, _ = dedup_values({url: defaults})
+            fingerprint = fingerprints[url]
+            article, created_flag = Article.objects.update_or_create(url=url, defaults=defaults)
+            sync_fingerprints([(article.pk, fingerprint)])
+            if created_flag and article.canonical_id is None:
                 created += 1
         return created
 
@@ -766,7 +1443,7 @@ RUN_ACTIVE = False
 RUN_LAST_ERROR = ""
 
 
-def start_crawler_async(run_id: Optional[int] = None) -> bool:
+def start_crawler_async(run_id: Optional[int] = None, profile: Optional[bool] = None) -> bool:
     global RUN_THREAD, RUN_ACTIVE, RUN_LAST_ERROR
     with RUN_LOCK:
         if RUN_THREAD and RUN_THREAD.is_alive():
@@ -782,7 +1459,7 @@ def start_crawler_async(run_id: Optional[int] = None) -> bool:
                 run = None
                 if run_id is not None:
                     run = CrawlRun.objects.filter(pk=run_id).first()
-                service.run(run)
+                service.run(run, profile=profile)
             except Exception as exc:
                 RUN_LAST_ERROR = str(exc)[:2000]
             finally:
@@ -793,24 +1470,26 @@ def start_crawler_async(run_id: Optional[int] = None) -> bool:
         return True
 
 
-def crawler_live_status() -> dict:
+def crawler_live_status(include_seeds: bool = False) -> dict:
     last_run = CrawlRun.objects.first()
-    return {
+    status = {
         "running": RUN_ACTIVE,
         "last_error": RUN_LAST_ERROR,
         "last_run": {
+            "id": last_run.id,
             "status": last_run.status,
             "started_at": last_run.started_at,
             "ended_at": last_run.ended_at,
             "pages_processed": last_run.pages_processed,
             "articles_created": last_run.articles_created,
             "queued_urls": last_run.queued_urls,
+            "llm_prompt_tokens": last_run.llm_prompt_tokens,
+            "llm_completion_tokens": last_run.llm_completion_tokens,
             "last_error": last_run.last_error,
+            "profile_enabled": last_run.profile_enabled,
         } if last_run else None,
-        "queue": {
-            "pending": CrawlQueueItem.objects.filter(status=CrawlQueueItem.STATUS_PENDING).count(),
-            "in_progress": CrawlQueueItem.objects.filter(status=CrawlQueueItem.STATUS_IN_PROGRESS).count(),
-            "done": CrawlQueueItem.objects.filter(status=CrawlQueueItem.STATUS_DONE).count(),
-            "failed": CrawlQueueItem.objects.filter(status=CrawlQueueItem.STATUS_FAILED).count(),
-        },
+        "queue": queue_counts(),
     }
+    if include_seeds:
+        status["seeds"] = seed_counts()
+    return status
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+
+import httpx
+from django.test import TestCase
+
+from crawler.models import CrawlerConfig, CrawlQueueItem, CrawlRun, CrawlSeed
+from crawler.robots import _COMPILED
+from crawler.services import CrawlerService
+
+SEED_URL = "https://example.com/news"
+
+
+class RobotsBlockTests(TestCase):
+    def setUp(self):
+        _COMPILED.clear()
+        self.config = CrawlerConfig.objects.create(
+            llm_enabled=False,
+            discovery_enabled=False,
+            request_delay_seconds=0,
+            max_pages_per_run=1,
+        )
+        self.seed = CrawlSeed.objects.create(url=SEED_URL, config=self.config)
+        self.item = CrawlQueueItem.objects.create(url=SEED_URL, seed=self.seed, seed_url=SEED_URL)
+
+    def crawl(self, robots: httpx.Response) -> None:
+        def handler(request):
+            if request.url.path == "/robots.txt":
+                return robots
+            return httpx.Response(200, headers={"content-type": "text/html"}, text="<p>News</p>")
+
+        service = CrawlerService(self.config)
+        service.client.close()
+        service.client = httpx.Client(transport=httpx.MockTransport(handler))
+        service.robots.client = service.client
+        service.run(CrawlRun.objects.create())
+        self.seed.refresh_from_db()
+        self.item.refresh_from_db()
+
+    def test_unavailable_robots_defers_the_item(self):
+        self.crawl(httpx.Response(503))
+        self.assertTrue(self.seed.is_active)
+        self.assertEqual(self.item.status, CrawlQueueItem.STATUS_PENDING)
+        self.assertGreater(self.item.available_at, datetime.now(timezone.utc))
+
+    def test_disallowed_item_keeps_the_seed_active(self):
+        self.crawl(httpx.Response(200, text="User-agent: *\nDisallow: /news\n"))
+        self.assertTrue(self.seed.is_active)
+        self.assertEqual(self.item.status, CrawlQueueItem.STATUS_FAILED)
+        self.assertEqual(self.item.last_error, "robots_disallowed")
+
+
+class UnsupportedContentTests(TestCase):
+    def test_non_html_page_fails_only_the_item(self):
+        config = CrawlerConfig.objects.create(
+            llm_enabled=False,
+            discovery_enabled=False,
+            respect_robots_txt=False,
+            request_delay_seconds=0,
+            max_pages_per_run=1,
+        )
+        seed = CrawlSeed.objects.create(url=SEED_URL, config=config)
+        item = CrawlQueueItem.objects.create(url=SEED_URL, seed=seed, seed_url=SEED_URL)
+        service = CrawlerService(config)
+        service.client.close()
+        service.client = httpx.Client(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, headers={"content-type": "application/pdf"}, content=b"%PDF")
+            )
+        )
+        service.run(CrawlRun.objects.create())
+        seed.refresh_from_db()
+        item.refresh_from_db()
+        self.assertTrue(seed.is_active)
+        self.assertEqual(item.status, CrawlQueueItem.STATUS_FAILED)
+        self.assertEqual(item.last_error, "unsupported_content_type: application/pdf")
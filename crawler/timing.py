@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from crawler.metrics import REGISTRY, MetricsRegistry, summarize
+
+STAGE_SECONDS = "crawler_stage_seconds"
+DB_QUERIES = "crawler_db_queries_total"
+DB_QUERY_SECONDS = "crawler_db_query_seconds_total"
+UNSTAGED = "other"
+
+
+class StageTimer:
+    """Per-run stage timings that also feed the process-wide metrics registry."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = REGISTRY) -> None:
+        self.totals: dict[str, float] = defaultdict(float)
+        self.counts: dict[str, int] = defaultdict(int)
+        self.run_metrics = MetricsRegistry()
+        self.registry = registry
+        self.active: list[str] = []
+
+    @property
+    def current_stage(self) -> str:
+        return self.active[-1] if self.active else UNSTAGED
+
+    @contextmanager
+    def stage(self, name: str, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        self.active.append(name)
+        try:
+            yield
+        finally:
+            self.active.pop()
+            elapsed = time.perf_counter() - started
+            self.totals[name] += elapsed
+            self.counts[name] += 1
+            self.run_metrics.observe(STAGE_SECONDS, elapsed, stage=name, **labels)
+            if self.registry is not None:
+                self.registry.observe(STAGE_SECONDS, elapsed, stage=name, **labels)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        if not value:
+            return
+        self.run_metrics.inc(name, value, **labels)
+        if self.registry is not None:
+            self.registry.inc(name, value, **labels)
+
+    def report(self) -> dict[str, dict]:
+        return {
+            name: {
+                "count": self.counts[name],
+                "total_seconds": round(total, 6),
+                "avg_ms": round(total * 1000 / max(1, self.counts[name]), 3),
+            }
+            for name, total in sorted(self.totals.items(), key=lambda entry: -entry[1])
+        }
+
+    def summary(self) -> dict:
+        return {"stages": self.report(), **summarize(self.run_metrics.snapshot())}
+
+
+class QueryAccountant:
+    """``connection.execute_wrapper`` hook charging each query to the active stage.
+
+    Counts accumulate per step until ``take_step`` returns and resets them, and
+    per run for ``summary``.
+    """
+
+    def __init__(self, timer: StageTimer, budget: int = 0) -> None:
+        self.timer = timer
+        self.budget = max(0, int(budget))
+        self.step: dict[str, list] = {}
+        self.totals: dict[str, list] = {}
+        self.steps = 0
+        self.step_queries = 0
+        self.max_step_queries = 0
+        self.over_budget_steps = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            stage = self.timer.current_stage
+            for bucket in (self.step, self.totals):
+                entry = bucket.setdefault(stage, [0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+            self.timer.count(DB_QUERIES, 1, stage=stage)
+            self.timer.count(DB_QUERY_SECONDS, elapsed, stage=stage)
+
+    @staticmethod
+    def _report(bucket: dict[str, list]) -> dict:
+        return {
+            "queries": sum(entry[0] for entry in bucket.values()),
+            "seconds": round(sum(entry[1] for entry in bucket.values()), 6),
+            "by_stage": {
+                stage: {"queries": entry[0], "seconds": round(entry[1], 6)}
+                for stage, entry in sorted(bucket.items(), key=lambda item: -item[1][0])
+            },
+        }
+
+    def take_step(self) -> dict:
+        report = self._report(self.step)
+        self.step = {}
+        self.steps += 1
+        self.step_queries += report["queries"]
+        self.max_step_queries = max(self.max_step_queries, report["queries"])
+        if self.budget:
+            report["budget"] = self.budget
+            report["over_budget"] = report["queries"] > self.budget
+            self.over_budget_steps += int(report["over_budget"])
+        return report
+
+    def discard_step(self) -> None:
+        self.step = {}
+
+    def summary(self) -> dict:
+        report = self._report(self.totals)
+        report.update({
+            "steps": self.steps,
+            "queries_per_step": round(self.step_queries / self.steps, 2) if self.steps else None,
+            "max_step_queries": self.max_step_queries,
+        })
+        if self.budget:
+            report["budget"] = self.budget
+            report["over_budget_steps"] = self.over_budget_steps
+        return report
@@ -6,8 +6,16 @@ from crawler import views
 urlpatterns = [
     path("crawler/status/", views.CrawlerStatusView.as_view(), name="crawler-status"),
     path("crawler/run/", views.CrawlerRunView.as_view(), name="crawler-run"),
+    path("crawler/runs/<int:pk>/profile/", views.CrawlerRunProfileView.as_view(), name="crawler-run-profile"),
+    path(
+        "crawler/runs/<int:pk>/slow-pages/<int:index>/",
+        views.CrawlerRunSlowPageView.as_view(),
+        name="crawler-run-slow-page",
+    ),
     path("crawler/config/", views.CrawlerConfigView.as_view(), name="crawler-config"),
     path("crawler/seeds/", views.CrawlerSeedsView.as_view(), name="crawler-seeds"),
+    path("crawler/events/", views.CrawlerEventsView.as_view(), name="crawler-events"),
     path("crawler/logs/", views.CrawlerLogsView.as_view(), name="crawler-logs"),
+    path("crawler/logs/<int:pk>/", views.CrawlerLogDetailView.as_view(), name="crawler-log-detail"),
     path("crawler/export.csv", views.CrawlerExportView.as_view(), name="crawler-export"),
 ]
@@ -1,27 +1,52 @@
 from __future__ import annotations
 
-import csv
-from io import StringIO
-
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from crawler.models import CrawlSeed
+from core.pagination import KeysetPagination
+from core.query import parse_query_datetime
+from core.streaming import streaming_body
+from crawler.blobs import BlobStore
+from crawler.counters import queue_counts
+from crawler.events import crawler_event_frames, parse_last_event_id
+from crawler.export import (
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_NDJSON,
+    export_queryset,
+    iter_csv,
+    iter_gzip,
+    iter_ndjson,
+    iter_rows,
+)
+from crawler.metrics import load_snapshot, render_prometheus
+from crawler.models import CrawlRun, CrawlSeed
 from crawler.models import CrawlLogEvent
-from crawler.serializers import CrawlSeedSerializer, CrawlerConfigSerializer, CrawlLogEventSerializer
-from crawler.services import crawler_live_status, get_config, start_crawler_async, CrawlerService
+from crawler.serializers import (
+    CrawlSeedSerializer,
+    CrawlerConfigSerializer,
+    CrawlLogEventSerializer,
+    project_log_events,
+)
+from crawler.services import crawler_live_status, get_config, start_crawler_async
 
 
 class CrawlerStatusView(APIView):
     def get(self, request):
-        return Response(crawler_live_status())
+        include_seeds = _truthy(request.query_params.get("seeds", ""))
+        return Response(crawler_live_status(include_seeds=include_seeds))
+
+
+def _truthy(value) -> bool:
+    return str(value).lower() in {"1", "true", "yes"}
 
 
 class CrawlerRunView(APIView):
     def post(self, request):
-        started = start_crawler_async()
+        started = start_crawler_async(profile=_truthy(request.data.get("profile", "")))
         if not started:
             return Response({"status": "already_running"}, status=status.HTTP_409_CONFLICT)
         return Response({"status": "started"}, status=status.HTTP_202_ACCEPTED)
@@ -54,32 +79,126 @@ class CrawlerSeedsView(APIView):
 
 class CrawlerExportView(APIView):
     def get(self, request):
-        buf = StringIO()
-        writer = csv.writer(buf)
-        service = CrawlerService()
-        count = service.export_articles_csv(writer)
-        service.close()
-        resp = HttpResponse(buf.getvalue(), content_type="text/csv")
-        resp["Content-Disposition"] = 'attachment; filename="articles.csv"'
-        resp["X-Exported-Rows"] = str(count)
+        params = request.query_params
+        export_format = (params.get("output") or EXPORT_FORMAT_CSV).lower()
+        if export_format not in {EXPORT_FORMAT_CSV, EXPORT_FORMAT_NDJSON}:
+            return Response(
+                {"detail": f"Unsupported export format: {export_format}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        since = params.get("since")
+        until = params.get("until")
+        updated_after = params.get("updated_after")
+        qs, cursor = export_queryset(
+            since=parse_query_datetime(since, "since") if since else None,
+            until=parse_query_datetime(until, "until", end_of_day=True) if until else None,
+            sources=[s.strip() for s in params.get("source", "").split(",") if s.strip()],
+            updated_after=parse_query_datetime(updated_after, "updated_after") if updated_after else None,
+        )
+        rows = iter_rows(qs)
+        if export_format == EXPORT_FORMAT_NDJSON:
+            chunks, content_type, filename = iter_ndjson(rows), "application/x-ndjson", "articles.ndjson"
+        else:
+            chunks, content_type, filename = iter_csv(rows), "text/csv", "articles.csv"
+        if params.get("gzip", "").lower() in {"1", "true", "yes"}:
+            chunks, content_type, filename = iter_gzip(chunks), "application/gzip", f"{filename}.gz"
+        resp = StreamingHttpResponse(streaming_body(request, chunks), content_type=content_type)
+        resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+        if cursor is not None:
+            resp["X-Export-Cursor"] = cursor.isoformat()
+        return resp
+
+
+class CrawlerEventsView(View):
+    def get(self, request):
+        last_id = parse_last_event_id(
+            request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+        )
+        run_id = request.GET.get("run_id", "")
+        resp = StreamingHttpResponse(
+            streaming_body(request, crawler_event_frames(last_id, int(run_id) if run_id.isdigit() else None)),
+            content_type="text/event-stream",
+        )
+        resp["Cache-Control"] = "no-cache"
+        resp["X-Accel-Buffering"] = "no"
         return resp
 
 
+class CrawlLogPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 50
+    max_page_size = 200
+
+
 class CrawlerLogsView(APIView):
     def get(self, request):
-        qs = CrawlLogEvent.objects.order_by("-created_at")
-        run_id = request.query_params.get("run_id")
+        qs = CrawlLogEvent.objects.all()
+        params = request.query_params
+        run_id = params.get("run_id")
         if run_id:
-            qs = qs.filter(run_id=run_id)
-        step = request.query_params.get("step")
+            if not run_id.isdigit():
+                return Response({"detail": "run_id must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+            qs = qs.filter(run_id=int(run_id))
+        step = params.get("step")
         if step:
             qs = qs.filter(step=step)
-        limit_raw = request.query_params.get("limit", "50")
-        try:
-            limit = int(limit_raw)
-        except ValueError:
-            limit = 50
-        limit = max(1, min(limit, 200))
-        logs = qs[:limit]
-        serializer = CrawlLogEventSerializer(logs, many=True)
-        return Response({"results": serializer.data, "limit": limit})
+        level = params.get("level")
+        if level:
+            qs = qs.filter(level=level)
+        since = params.get("since")
+        if since:
+            qs = qs.filter(created_at__gte=parse_query_datetime(since, "since"))
+        paginator = CrawlLogPagination()
+        rows = paginator.paginate_queryset(project_log_events(qs), request, view=self)
+        return paginator.get_paginated_response(rows)
+
+
+class CrawlerLogDetailView(APIView):
+    def get(self, request, pk: int):
+        log = CrawlLogEvent.objects.filter(pk=pk).first()
+        if log is None:
+            raise NotFound()
+        return Response(CrawlLogEventSerializer(log).data)
+
+
+class CrawlerRunProfileView(APIView):
+    def get(self, request, pk: int):
+        run = CrawlRun.objects.filter(pk=pk).only("id", "profile_digest").first()
+        stacks = BlobStore().get(run.profile_digest) if run and run.profile_digest else None
+        if stacks is None:
+            raise NotFound()
+        response = HttpResponse(stacks, content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="crawl-run-{run.id}.folded"'
+        return response
+
+    def post(self, request, pk: int):
+        enabled = _truthy(request.data.get("enabled", "true"))
+        if not CrawlRun.objects.filter(pk=pk).update(profile_enabled=enabled):
+            raise NotFound()
+        return Response({"id": pk, "profile_enabled": enabled})
+
+
+class CrawlerRunSlowPageView(APIView):
+    def get(self, request, pk: int, index: int):
+        metrics = CrawlRun.objects.filter(pk=pk).values_list("metrics", flat=True).first() or {}
+        pages = metrics.get("profile", {}).get("slow_pages", [])
+        if index >= len(pages):
+            raise NotFound()
+        html = BlobStore().get(pages[index]["html_digest"])
+        if html is None:
+            raise NotFound()
+        # Served as plain text so pathological markup is not rendered.
+        response = HttpResponse(html, content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="crawl-run-{pk}-slow-page-{index}.html"'
+        return response
+
+
+class CrawlerMetricsView(View):
+    def get(self, request):
+        last_run = CrawlRun.objects.values("status", "pages_processed", "articles_created").first()
+        gauges = {
+            "crawler_queue_items": [({"status": name}, value) for name, value in queue_counts().items()],
+            "crawler_run_active": [({}, 1 if last_run and last_run["status"] == CrawlRun.STATUS_RUNNING else 0)],
+        }
+        body = render_prometheus(load_snapshot(), gauges)
+        return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")